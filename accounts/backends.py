@@ -0,0 +1,33 @@
+from django.conf import settings
+from django.contrib.auth.backends import ModelBackend
+from django.core.cache import cache
+
+
+def get_user_cache_key(user_id) -> str:
+    return f"accounts:user:{user_id}"
+
+
+def invalidate_cached_user(user_id):
+    cache.delete(get_user_cache_key(user_id))
+
+
+class CachedModelBackend(ModelBackend):
+    """
+    세션의 user id로 User를 조회할 때 캐시를 먼저 확인하는 인증 백엔드.
+
+    AUTH_USER_CACHE_TIMEOUT이 0이면 캐시를 사용하지 않고 ModelBackend와 동일하게 동작합니다.
+    User 저장/삭제 시에 accounts.signals에서 캐시를 무효화합니다.
+    """
+
+    def get_user(self, user_id):
+        timeout = settings.AUTH_USER_CACHE_TIMEOUT
+        if not timeout:
+            return super().get_user(user_id)
+
+        cache_key = get_user_cache_key(user_id)
+        user = cache.get(cache_key)
+        if user is None:
+            user = super().get_user(user_id)
+            if user is not None:
+                cache.set(cache_key, user, timeout)
+        return user
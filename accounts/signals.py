@@ -0,0 +1,11 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from accounts.backends import invalidate_cached_user
+from accounts.models import User
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def on_user_changed(sender, instance: User, **kwargs):
+    # 비밀번호 변경(set_password 후 save)도 post_save로 전달됩니다.
+    invalidate_cached_user(instance.pk)
@@ -1,3 +1,44 @@
-from django.test import TestCase
+from django.conf import settings
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from accounts.backends import CachedModelBackend
+from accounts.models import User
 
-# Create your tests here.
+
+class CachedModelBackendTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(
+            username="buyer", password="password", email="buyer@example.com"
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.backend = CachedModelBackend()
+
+    def test_default_backends(self):
+        # 캐시를 사용하지 않는 기본 설정에서는 기존 세션의 백엔드 경로를 그대로 사용합니다.
+        self.assertEqual(
+            settings.AUTHENTICATION_BACKENDS,
+            ["django.contrib.auth.backends.ModelBackend"],
+        )
+
+    def test_disabled(self):
+        for _ in range(2):
+            with self.assertNumQueries(1):
+                self.assertEqual(self.backend.get_user(self.user.pk), self.user)
+
+    @override_settings(AUTH_USER_CACHE_TIMEOUT=60)
+    def test_cache_hit_and_invalidation(self):
+        with self.assertNumQueries(1):
+            self.backend.get_user(self.user.pk)
+        with self.assertNumQueries(0):
+            self.assertEqual(self.backend.get_user(self.user.pk), self.user)
+
+        self.user.first_name = "변경"
+        self.user.save()
+        with self.assertNumQueries(1):
+            self.assertEqual(self.backend.get_user(self.user.pk).first_name, "변경")
+
+        self.user.delete()
+        self.assertIsNone(self.backend.get_user(self.user.pk))
@@ -0,0 +1,34 @@
+from django.contrib import admin
+from archive.models import ArchivedOrder, ArchivedOrderedProduct, ArchivedOrderPayment
+from mall.admin import PerformanceModeAdmin
+
+
+class ReadOnlyAdminMixin:
+    def has_add_permission(self, request, obj=None):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def has_delete_permission(self, request, obj=None):
+        return False
+
+
+class ArchivedOrderedProductInline(ReadOnlyAdminMixin, admin.TabularInline):
+    model = ArchivedOrderedProduct
+    fields = ["product", "name", "price", "quantity"]
+    raw_id_fields = ["product"]
+
+
+class ArchivedOrderPaymentInline(ReadOnlyAdminMixin, admin.TabularInline):
+    model = ArchivedOrderPayment
+    fields = ["uid", "desired_amount", "pay_status", "is_paid_ok", "created_at"]
+
+
+@admin.register(ArchivedOrder)
+class ArchivedOrderAdmin(ReadOnlyAdminMixin, PerformanceModeAdmin):
+    list_display = ["pk", "name", "user", "total_amount", "status", "created_at"]
+    list_select_related = ["user"]
+    list_filter = ["status"]
+    raw_id_fields = ["user"]
+    inlines = [ArchivedOrderedProductInline, ArchivedOrderPaymentInline]
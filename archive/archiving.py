@@ -0,0 +1,66 @@
+from datetime import datetime
+from django.db import router, transaction
+from archive.models import ArchivedOrder, ArchivedOrderedProduct, ArchivedOrderPayment
+from mall.models import Order, OrderedProduct, OrderPayment
+
+# 더 이상 상태가 바뀌지 않는 주문만 보관합니다.
+ARCHIVE_STATUS_LIST = [Order.Status.DELIVERED, Order.Status.CANCELLED]
+
+
+def get_attname_list(model_cls):
+    return [field.attname for field in model_cls._meta.concrete_fields]
+
+
+def get_archivable_qs(before: datetime):
+    return Order.objects.filter(status__in=ARCHIVE_STATUS_LIST, updated_at__lt=before)
+
+
+def archive_orders(before: datetime, batch_size: int = 500) -> int:
+    """
+    before 이전에 마지막으로 변경된 배송완료/주문취소 주문을 주문상품, 결제내역과 함께
+    보관 테이블로 옮깁니다. batch_size 개씩 각각의 트랜잭션으로 처리하며 옮긴 주문 수를 반환합니다.
+    """
+    order_fields = get_attname_list(Order)
+    ordered_product_fields = get_attname_list(OrderedProduct)
+    payment_fields = get_attname_list(OrderPayment)
+
+    count = 0
+    while True:
+        with transaction.atomic(using=router.db_for_write(Order)):
+            pk_list = list(
+                get_archivable_qs(before)
+                .select_for_update()
+                .order_by("pk")
+                .values_list("pk", flat=True)[:batch_size]
+            )
+            if not pk_list:
+                break
+
+            order_qs = Order.annotate_name(Order.objects.filter(pk__in=pk_list))
+            archived_order_list = []
+            for order in order_qs.only(*order_fields):
+                archived_order_list.append(
+                    ArchivedOrder(
+                        name=order.name,
+                        **{name: getattr(order, name) for name in order_fields},
+                    )
+                )
+            ArchivedOrder.objects.bulk_create(archived_order_list)
+
+            ordered_product_qs = OrderedProduct.objects.filter(order__in=pk_list)
+            ArchivedOrderedProduct.objects.bulk_create(
+                ArchivedOrderedProduct(**row)
+                for row in ordered_product_qs.values(*ordered_product_fields)
+            )
+            payment_qs = OrderPayment.objects.filter(order__in=pk_list)
+            ArchivedOrderPayment.objects.bulk_create(
+                ArchivedOrderPayment(**row)
+                for row in payment_qs.values(*payment_fields)
+            )
+
+            # 주문상품/결제에는 삭제 시그널과 하위 관계가 없어, delete() 도 조회 없이 DELETE 1회로 처리됩니다.
+            ordered_product_qs.delete()
+            payment_qs.delete()
+            Order.objects.filter(pk__in=pk_list).delete()
+        count += len(pk_list)
+    return count
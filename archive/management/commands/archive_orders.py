@@ -0,0 +1,29 @@
+from datetime import timedelta
+from django.conf import settings
+from django.core.management import BaseCommand
+from django.utils import timezone
+from archive.archiving import archive_orders, get_archivable_qs
+
+
+class Command(BaseCommand):
+    help = "오래된 배송완료/주문취소 주문을 주문상품, 결제내역과 함께 보관 테이블로 옮깁니다."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--days",
+            type=int,
+            default=settings.ORDER_ARCHIVE_AFTER_DAYS,
+            help=f"마지막 변경 후 지정 일수가 지난 주문을 보관합니다. (기본: {settings.ORDER_ARCHIVE_AFTER_DAYS})",
+        )
+        parser.add_argument("--batch-size", type=int, default=500)
+        parser.add_argument("--dry-run", action="store_true", help="보관 대상 주문 수만 출력합니다.")
+
+    def handle(self, *args, **options):
+        before = timezone.now() - timedelta(days=options["days"])
+        if options["dry_run"]:
+            count = get_archivable_qs(before).count()
+            self.stdout.write(f"보관 대상 주문: {count}건")
+            return
+
+        count = archive_orders(before, batch_size=options["batch_size"])
+        self.stdout.write(self.style.SUCCESS(f"{count}개의 주문을 보관했습니다."))
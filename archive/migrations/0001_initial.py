@@ -0,0 +1,174 @@
+# Generated by Django 5.1 on 2026-10-19 13:37
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ("mall", "0010_orderpayment_created_at"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ArchivedOrder",
+            fields=[
+                ("id", models.BigIntegerField(primary_key=True, serialize=False)),
+                ("uid", models.UUIDField(editable=False, unique=True)),
+                (
+                    "name",
+                    models.CharField(
+                        help_text="보관 시점의 주문명을 저장합니다.",
+                        max_length=200,
+                        verbose_name="주문명",
+                    ),
+                ),
+                ("total_amount", models.PositiveIntegerField(verbose_name="결제금액")),
+                (
+                    "status",
+                    models.CharField(
+                        choices=[
+                            ("requested", "주문요청"),
+                            ("failed_payment", "결제실패"),
+                            ("paid", "결제완료"),
+                            ("prepared_product", "상품준비중"),
+                            ("shipped", "배송중"),
+                            ("delivered", "배송완료"),
+                            ("cancelled", "주문취소"),
+                        ],
+                        max_length=20,
+                        verbose_name="진행상태",
+                    ),
+                ),
+                ("created_at", models.DateTimeField()),
+                ("updated_at", models.DateTimeField()),
+                ("archived_at", models.DateTimeField(auto_now_add=True)),
+                (
+                    "user",
+                    models.ForeignKey(
+                        db_constraint=False,
+                        on_delete=django.db.models.deletion.DO_NOTHING,
+                        related_name="+",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "보관된 주문",
+                "verbose_name_plural": "보관된 주문",
+                "ordering": ["-pk"],
+            },
+        ),
+        migrations.CreateModel(
+            name="ArchivedOrderedProduct",
+            fields=[
+                ("id", models.BigIntegerField(primary_key=True, serialize=False)),
+                ("name", models.CharField(max_length=100, verbose_name="상품명")),
+                ("price", models.PositiveIntegerField(verbose_name="가격")),
+                ("quantity", models.PositiveIntegerField(verbose_name="수량")),
+                ("created_at", models.DateTimeField()),
+                ("updated_at", models.DateTimeField()),
+                (
+                    "order",
+                    models.ForeignKey(
+                        db_constraint=False,
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="orderedproduct_set",
+                        to="archive.archivedorder",
+                    ),
+                ),
+                (
+                    "product",
+                    models.ForeignKey(
+                        db_constraint=False,
+                        on_delete=django.db.models.deletion.DO_NOTHING,
+                        related_name="+",
+                        to="mall.product",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "보관된 주문 상품",
+                "verbose_name_plural": "보관된 주문 상품",
+            },
+        ),
+        migrations.CreateModel(
+            name="ArchivedOrderPayment",
+            fields=[
+                ("id", models.BigIntegerField(primary_key=True, serialize=False)),
+                (
+                    "meta",
+                    models.JSONField(
+                        default=dict, editable=False, verbose_name="포트원 결제내역"
+                    ),
+                ),
+                (
+                    "uid",
+                    models.UUIDField(
+                        editable=False, unique=True, verbose_name="쇼핑몰 결제식별자"
+                    ),
+                ),
+                ("name", models.CharField(max_length=200, verbose_name="결제명")),
+                (
+                    "desired_amount",
+                    models.PositiveIntegerField(editable=False, verbose_name="결제금액"),
+                ),
+                (
+                    "buyer_name",
+                    models.CharField(
+                        editable=False, max_length=100, verbose_name="구매자 이름"
+                    ),
+                ),
+                (
+                    "buyer_email",
+                    models.EmailField(
+                        editable=False, max_length=254, verbose_name="구매자 이메일"
+                    ),
+                ),
+                (
+                    "pay_method",
+                    models.CharField(
+                        choices=[("card", "신용카드")], max_length=20, verbose_name="결제수단"
+                    ),
+                ),
+                (
+                    "pay_status",
+                    models.CharField(
+                        choices=[
+                            ("ready", "결제 준비"),
+                            ("paid", "결제 완료"),
+                            ("cancelled", "결제 취소"),
+                            ("failed", "결제 실패"),
+                        ],
+                        max_length=20,
+                        verbose_name="결제상태",
+                    ),
+                ),
+                (
+                    "is_paid_ok",
+                    models.BooleanField(
+                        default=False, editable=False, verbose_name="결제성공 여부"
+                    ),
+                ),
+                ("created_at", models.DateTimeField()),
+                (
+                    "order",
+                    models.ForeignKey(
+                        db_constraint=False,
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="orderpayment_set",
+                        to="archive.archivedorder",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "보관된 주문 결제",
+                "verbose_name_plural": "보관된 주문 결제",
+            },
+        ),
+    ]
@@ -0,0 +1,98 @@
+from django.db import models
+from django.urls import reverse
+from mall.models import AbstractPortonePayment, Order, Product
+
+
+class ArchivedOrder(models.Model):
+    """
+    보관 처리된 주문. pk 를 포함해 원본 Order 의 값을 그대로 보존하므로
+    주문 상세 URL 이 바뀌지 않고, 템플릿에서 Order 와 같은 방식으로 사용할 수 있습니다.
+    """
+
+    id = models.BigIntegerField(primary_key=True)
+    uid = models.UUIDField(editable=False, unique=True)
+    user = models.ForeignKey(
+        "accounts.User",
+        on_delete=models.DO_NOTHING,
+        db_constraint=False,
+        related_name="+",
+    )
+    name = models.CharField("주문명", max_length=200, help_text="보관 시점의 주문명을 저장합니다.")
+    total_amount = models.PositiveIntegerField("결제금액")
+    status = models.CharField(
+        "진행상태",
+        choices=Order.Status.choices,
+        max_length=20,
+    )
+    created_at = models.DateTimeField()
+    updated_at = models.DateTimeField()
+    archived_at = models.DateTimeField(auto_now_add=True)
+
+    is_archived = True
+
+    def get_absolute_url(self):
+        return reverse("order_detail", args=[self.pk])
+
+    class Meta:
+        ordering = ["-pk"]
+        verbose_name_plural = verbose_name = "보관된 주문"
+
+
+class ArchivedOrderedProduct(models.Model):
+    id = models.BigIntegerField(primary_key=True)
+    # Order 와 같은 이름으로 접근할 수 있도록 related_name 을 맞춥니다.
+    order = models.ForeignKey(
+        ArchivedOrder,
+        on_delete=models.CASCADE,
+        db_constraint=False,
+        related_name="orderedproduct_set",
+    )
+    product = models.ForeignKey(
+        Product,
+        on_delete=models.DO_NOTHING,
+        db_constraint=False,
+        related_name="+",
+    )
+    name = models.CharField("상품명", max_length=100)
+    price = models.PositiveIntegerField("가격")
+    quantity = models.PositiveIntegerField("수량")
+    created_at = models.DateTimeField()
+    updated_at = models.DateTimeField()
+
+    class Meta:
+        verbose_name_plural = verbose_name = "보관된 주문 상품"
+
+
+class ArchivedOrderPayment(models.Model):
+    id = models.BigIntegerField(primary_key=True)
+    order = models.ForeignKey(
+        ArchivedOrder,
+        on_delete=models.CASCADE,
+        db_constraint=False,
+        related_name="orderpayment_set",
+    )
+    meta = models.JSONField("포트원 결제내역", default=dict, editable=False)
+    uid = models.UUIDField("쇼핑몰 결제식별자", editable=False, unique=True)
+    name = models.CharField("결제명", max_length=200)
+    desired_amount = models.PositiveIntegerField("결제금액", editable=False)
+    buyer_name = models.CharField("구매자 이름", max_length=100, editable=False)
+    buyer_email = models.EmailField("구매자 이메일", editable=False)
+    pay_method = models.CharField(
+        "결제수단",
+        max_length=20,
+        choices=AbstractPortonePayment.PayMethod.choices,
+    )
+    pay_status = models.CharField(
+        "결제상태",
+        max_length=20,
+        choices=AbstractPortonePayment.PayStatus.choices,
+    )
+    is_paid_ok = models.BooleanField("결제성공 여부", default=False, editable=False)
+    created_at = models.DateTimeField()
+
+    @property
+    def merchant_uid(self) -> str:
+        return str(self.uid)
+
+    class Meta:
+        verbose_name_plural = verbose_name = "보관된 주문 결제"
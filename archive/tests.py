@@ -0,0 +1,111 @@
+from datetime import timedelta
+from io import StringIO
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from accounts.models import User
+from archive.archiving import archive_orders
+from archive.models import ArchivedOrder, ArchivedOrderedProduct, ArchivedOrderPayment
+from mall.models import (
+    CartProduct,
+    Category,
+    Order,
+    OrderedProduct,
+    OrderPayment,
+    Product,
+)
+
+
+class ArchiveOrdersTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(
+            username="buyer", password="password", email="buyer@example.com"
+        )
+        category = Category.objects.create(name="분류")
+        cls.product_list = [
+            Product.objects.create(
+                category=category,
+                name=f"상품 {i}",
+                price=1000 * (i + 1),
+                status=Product.Status.ACTIVE,
+            )
+            for i in range(2)
+        ]
+
+    def create_order(self, status: str = Order.Status.REQUESTED) -> Order:
+        for product in self.product_list:
+            CartProduct.objects.create(user=self.user, product=product)
+        order = Order.create_from_cart(
+            self.user, CartProduct.objects.filter(user=self.user)
+        )
+        CartProduct.objects.filter(user=self.user).delete()
+        OrderPayment.create_by_order(order)
+        Order.objects.filter(pk=order.pk).update(
+            status=status, updated_at=timezone.now() - timedelta(days=100)
+        )
+        return order
+
+    def test_archive_orders(self):
+        delivered = self.create_order(Order.Status.DELIVERED)
+        cancelled = self.create_order(Order.Status.CANCELLED)
+        requested = self.create_order()
+        recent = self.create_order(Order.Status.DELIVERED)
+        Order.objects.filter(pk=recent.pk).update(updated_at=timezone.now())
+
+        stdout = StringIO()
+        call_command("archive_orders", "--dry-run", days=30, stdout=stdout)
+        self.assertIn("2건", stdout.getvalue())
+        self.assertFalse(ArchivedOrder.objects.exists())
+
+        self.assertEqual(archive_orders(timezone.now() - timedelta(days=30), 1), 2)
+        self.assertEqual(
+            set(Order.objects.values_list("pk", flat=True)), {requested.pk, recent.pk}
+        )
+        archived_pk_list = [delivered.pk, cancelled.pk]
+        self.assertEqual(
+            set(ArchivedOrder.objects.values_list("pk", flat=True)),
+            set(archived_pk_list),
+        )
+        self.assertEqual(
+            ArchivedOrder.objects.get(pk=delivered.pk).name, delivered.name
+        )
+        self.assertEqual(
+            ArchivedOrderedProduct.objects.filter(order__in=archived_pk_list).count(), 4
+        )
+        self.assertEqual(
+            ArchivedOrderPayment.objects.filter(order__in=archived_pk_list).count(), 2
+        )
+        self.assertFalse(
+            OrderedProduct.objects.filter(order__in=archived_pk_list).exists()
+        )
+        self.assertFalse(
+            OrderPayment.objects.filter(order__in=archived_pk_list).exists()
+        )
+
+    @override_settings(ORDER_LIST_PAGE_SIZE=2)
+    def test_order_list(self):
+        order_list = [self.create_order(Order.Status.CANCELLED) for _ in range(2)]
+        order_list += [self.create_order() for _ in range(2)]
+        archive_orders(timezone.now())
+        # 보관된 주문과 보관되지 않은 주문이 섞이도록 합니다.
+        order_list.append(self.create_order(Order.Status.CANCELLED))
+        order_list.append(self.create_order())
+        archive_orders(timezone.now())
+        expected = sorted((order.pk for order in order_list), reverse=True)
+
+        self.client.force_login(self.user)
+        pk_list = []
+        for page in [1, 2, 3]:
+            response = self.client.get(reverse("order_list"), {"page": page})
+            self.assertEqual(response.status_code, 200)
+            page_list = response.context["order_list"]
+            self.assertEqual(len(page_list), 2)
+            pk_list += [order.pk for order in page_list]
+        self.assertEqual(pk_list, expected)
+        self.assertTrue(page_list[0].is_archived)
+        self.assertContains(response, order_list[0].name)
+
+        response = self.client.get(reverse("order_detail", args=[order_list[0].pk]))
+        self.assertEqual(response.status_code, 200)
@@ -0,0 +1,16 @@
+from django.contrib import admin
+from jobs.models import Job
+
+
+@admin.register(Job)
+class JobAdmin(admin.ModelAdmin):
+    list_display = [
+        "pk",
+        "name",
+        "status",
+        "attempts",
+        "run_at",
+        "updated_at",
+    ]
+    list_filter = ["status", "name"]
+    readonly_fields = ["last_error"]
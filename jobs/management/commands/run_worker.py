@@ -0,0 +1,70 @@
+import multiprocessing
+import signal
+from django.core.management import BaseCommand
+from django.db import connections
+from django.conf import settings
+from jobs.worker import Worker
+
+
+def run_worker_process(worker_options, burst):
+    # spawn 방식으로 시작된 경우 장고 설정을 다시 로딩합니다.
+    import django
+
+    django.setup()
+    worker = Worker(**worker_options)
+
+    def stop(signum, frame):
+        worker.is_stopped = True
+
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+    worker.run(burst=burst)
+
+
+class Command(BaseCommand):
+    help = "작업 테이블의 작업을 실행하는 worker를 시작합니다."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--processes", type=int, default=1)
+        parser.add_argument("--batch-size", type=int, default=1)
+        parser.add_argument(
+            "--visibility-timeout",
+            type=int,
+            default=settings.JOBS_VISIBILITY_TIMEOUT,
+            help="실행중인 작업을 다른 worker가 다시 가져가기까지의 시간(초)",
+        )
+        parser.add_argument("--sleep", type=float, default=1.0)
+        parser.add_argument(
+            "--burst",
+            action="store_true",
+            help="대기중인 작업이 없으면 종료합니다.",
+        )
+
+    def handle(self, *args, **options):
+        worker_options = dict(
+            batch_size=options["batch_size"],
+            visibility_timeout=options["visibility_timeout"],
+            sleep=options["sleep"],
+        )
+        if options["processes"] == 1:
+            run_worker_process(worker_options, options["burst"])
+            return
+
+        # 부모 프로세스의 DB 연결을 자식 프로세스와 공유하지 않도록 닫습니다.
+        connections.close_all()
+        process_list = [
+            multiprocessing.Process(
+                target=run_worker_process,
+                args=(worker_options, options["burst"]),
+            )
+            for _ in range(options["processes"])
+        ]
+        for process in process_list:
+            process.start()
+        try:
+            for process in process_list:
+                process.join()
+        except KeyboardInterrupt:
+            for process in process_list:
+                process.terminate()
+                process.join()
@@ -0,0 +1,79 @@
+# Generated by Django 5.1 on 2026-10-19 14:02
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = []
+
+    operations = [
+        migrations.CreateModel(
+            name="Job",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("name", models.CharField(max_length=200, verbose_name="작업명")),
+                ("kwargs", models.JSONField(default=dict, verbose_name="인자")),
+                (
+                    "status",
+                    models.CharField(
+                        choices=[
+                            ("queued", "대기"),
+                            ("running", "실행중"),
+                            ("done", "완료"),
+                            ("failed", "실패"),
+                        ],
+                        default="queued",
+                        max_length=10,
+                        verbose_name="상태",
+                    ),
+                ),
+                (
+                    "attempts",
+                    models.PositiveIntegerField(default=0, verbose_name="시도횟수"),
+                ),
+                (
+                    "max_attempts",
+                    models.PositiveIntegerField(default=3, verbose_name="최대 시도횟수"),
+                ),
+                (
+                    "run_at",
+                    models.DateTimeField(
+                        default=django.utils.timezone.now, verbose_name="실행예정일시"
+                    ),
+                ),
+                (
+                    "locked_until",
+                    models.DateTimeField(
+                        blank=True,
+                        help_text="실행중인 작업이 이 시각까지 끝나지 않으면 다른 worker가 다시 가져갑니다.",
+                        null=True,
+                        verbose_name="점유만료일시",
+                    ),
+                ),
+                ("last_error", models.TextField(blank=True, verbose_name="마지막 오류")),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                "verbose_name": "작업",
+                "verbose_name_plural": "작업",
+                "indexes": [
+                    models.Index(
+                        fields=["status", "run_at"], name="jobs_status_run_at_idx"
+                    )
+                ],
+            },
+        ),
+    ]
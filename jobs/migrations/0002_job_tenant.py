@@ -0,0 +1,23 @@
+# Generated by Django 5.1 on 2026-10-19 13:45
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("jobs", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="job",
+            name="tenant",
+            field=models.CharField(
+                blank=True,
+                help_text="작업을 등록한 테넌트. worker 는 이 테넌트의 DB/캐시/PortOne 인증정보로 실행합니다.",
+                max_length=50,
+                verbose_name="테넌트",
+            ),
+        ),
+    ]
@@ -0,0 +1,55 @@
+from django.db import models
+from django.db.models import Q, QuerySet
+from django.utils import timezone
+
+
+class Job(models.Model):
+    class Status(models.TextChoices):
+        QUEUED = "queued", "대기"
+        RUNNING = "running", "실행중"
+        DONE = "done", "완료"
+        FAILED = "failed", "실패"
+
+    name = models.CharField("작업명", max_length=200)
+    kwargs = models.JSONField("인자", default=dict)
+    tenant = models.CharField(
+        "테넌트",
+        max_length=50,
+        blank=True,
+        help_text="작업을 등록한 테넌트. worker 는 이 테넌트의 DB/캐시/PortOne 인증정보로 실행합니다.",
+    )
+    status = models.CharField(
+        "상태",
+        max_length=10,
+        choices=Status.choices,
+        default=Status.QUEUED,
+    )
+    attempts = models.PositiveIntegerField("시도횟수", default=0)
+    max_attempts = models.PositiveIntegerField("최대 시도횟수", default=3)
+    run_at = models.DateTimeField("실행예정일시", default=timezone.now)
+    locked_until = models.DateTimeField(
+        "점유만료일시",
+        null=True,
+        blank=True,
+        help_text="실행중인 작업이 이 시각까지 끝나지 않으면 다른 worker가 다시 가져갑니다.",
+    )
+    last_error = models.TextField("마지막 오류", blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"<{self.pk}> {self.name}"
+
+    @classmethod
+    def get_claimable_qs(cls) -> QuerySet["Job"]:
+        now = timezone.now()
+        return cls.objects.filter(
+            Q(status=cls.Status.QUEUED, run_at__lte=now)
+            | Q(status=cls.Status.RUNNING, locked_until__lt=now)
+        ).order_by("run_at", "pk")
+
+    class Meta:
+        verbose_name = verbose_name_plural = "작업"
+        indexes = [
+            models.Index(fields=["status", "run_at"], name="jobs_status_run_at_idx"),
+        ]
@@ -0,0 +1,60 @@
+from typing import Callable, Dict, Optional
+from django.conf import settings
+from django.db import transaction
+from jobs.models import Job
+from mall.tenants import get_current_tenant
+
+
+class Task:
+    def __init__(self, func: Callable, name: str, max_attempts: int):
+        self.func = func
+        self.name = name
+        self.max_attempts = max_attempts
+
+    def __call__(self, **kwargs):
+        return self.func(**kwargs)
+
+    def delay(self, **kwargs) -> Optional[Job]:
+        """
+        JOBS_ASYNC=True 이면 작업 테이블에 등록하고 바로 반환합니다.
+        False 이면 기존처럼 즉시 실행합니다. 인자는 JSON 으로 직렬화할 수 있어야 합니다.
+
+        트랜잭션 안에서 호출하면 커밋된 후에 등록합니다. worker 가 아직 커밋되지 않은(또는 롤백된)
+        주문/결제를 조회하지 않도록 하기 위함이며, 이때는 등록 전이므로 None 을 반환합니다.
+        """
+        if not settings.JOBS_ASYNC:
+            self.func(**kwargs)
+            return None
+
+        tenant = get_current_tenant()
+        job_list = []
+
+        def enqueue():
+            job_list.append(
+                Job.objects.create(
+                    name=self.name,
+                    kwargs=kwargs,
+                    tenant=tenant.slug,
+                    max_attempts=self.max_attempts,
+                )
+            )
+
+        # 호출한 쪽의 데이터는 테넌트 DB 에 있으므로, 그 DB 의 트랜잭션 커밋을 기다립니다.
+        transaction.on_commit(enqueue, using=tenant.database_alias)
+        return job_list[0] if job_list else None
+
+
+_task_dict: Dict[str, Task] = {}
+
+
+def task(name: str = None, max_attempts: int = 3):
+    def decorator(func):
+        task_name = name or f"{func.__module__}.{func.__name__}"
+        _task_dict[task_name] = Task(func, task_name, max_attempts)
+        return _task_dict[task_name]
+
+    return decorator
+
+
+def get_task(name: str) -> Task:
+    return _task_dict[name]
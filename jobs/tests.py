@@ -0,0 +1,94 @@
+from datetime import timedelta
+from django.db import transaction
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from jobs.models import Job
+from jobs.tasks import task
+from jobs.worker import Worker
+
+call_list = []
+
+
+@task(name="jobs.tests.record")
+def record(value):
+    call_list.append(value)
+
+
+@task(name="jobs.tests.fail", max_attempts=2)
+def fail():
+    raise ValueError("실패")
+
+
+class TaskTest(TestCase):
+    def setUp(self):
+        call_list.clear()
+
+    def test_sync(self):
+        self.assertIsNone(record.delay(value=1))
+        self.assertEqual(call_list, [1])
+        self.assertFalse(Job.objects.exists())
+
+    @override_settings(JOBS_ASYNC=True)
+    def test_enqueue_on_commit(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            with transaction.atomic():
+                self.assertIsNone(record.delay(value=1))
+                # 커밋 전에는 worker 가 가져갈 수 없도록 등록하지 않습니다.
+                self.assertFalse(Job.objects.exists())
+        job = Job.objects.get()
+        self.assertEqual((job.name, job.kwargs), ("jobs.tests.record", {"value": 1}))
+
+    @override_settings(JOBS_ASYNC=True)
+    def test_rollback(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            try:
+                with transaction.atomic():
+                    record.delay(value=1)
+                    raise ValueError
+            except ValueError:
+                pass
+        self.assertFalse(Job.objects.exists())
+
+
+class WorkerTest(TestCase):
+    def setUp(self):
+        call_list.clear()
+        self.worker = Worker(batch_size=10, retry_delay=10)
+
+    def test_run(self):
+        Job.objects.create(name="jobs.tests.record", kwargs={"value": 1})
+        Job.objects.create(
+            name="jobs.tests.record",
+            kwargs={"value": 2},
+            run_at=timezone.now() + timedelta(minutes=1),
+        )
+        self.assertEqual(self.worker.run_once(), 1)
+        self.assertEqual(call_list, [1])
+        self.assertEqual(
+            list(Job.objects.order_by("pk").values_list("status", flat=True)),
+            [Job.Status.DONE, Job.Status.QUEUED],
+        )
+
+    def test_retry_and_fail(self):
+        job = Job.objects.create(name="jobs.tests.fail", max_attempts=2)
+        self.worker.run_once()
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.attempts), (Job.Status.QUEUED, 1))
+        self.assertGreater(job.run_at, timezone.now())
+        self.assertEqual(job.last_error, "ValueError: 실패")
+
+        Job.objects.filter(pk=job.pk).update(run_at=timezone.now())
+        self.worker.run_once()
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.attempts), (Job.Status.FAILED, 2))
+
+    def test_reclaim_expired(self):
+        # 점유만료일시가 지난 실행중 작업은 다른 worker 가 다시 가져갑니다.
+        Job.objects.create(
+            name="jobs.tests.record",
+            kwargs={"value": 1},
+            status=Job.Status.RUNNING,
+            locked_until=timezone.now() - timedelta(seconds=1),
+        )
+        self.assertEqual(self.worker.run_once(), 1)
+        self.assertEqual(call_list, [1])
@@ -0,0 +1,101 @@
+import logging
+import time
+from datetime import timedelta
+from typing import List
+from django.db import connection, transaction
+from django.db.models import F
+from django.utils import timezone
+from jobs.models import Job
+from jobs.tasks import get_task
+from mall.tenants import tenant_registry, use_tenant
+
+
+logger = logging.getLogger(__name__)
+
+
+class Worker:
+    def __init__(
+        self,
+        batch_size: int = 1,
+        visibility_timeout: int = 300,
+        retry_delay: int = 10,
+        sleep: float = 1.0,
+    ):
+        self.batch_size = batch_size
+        self.visibility_timeout = visibility_timeout
+        self.retry_delay = retry_delay
+        self.sleep = sleep
+        self.is_stopped = False
+
+    def claim(self) -> List[Job]:
+        """
+        실행할 작업을 점유합니다. PostgreSQL 등에서는 SELECT ... FOR UPDATE SKIP LOCKED 로,
+        이를 지원하지 않는 SQLite 에서는 상태/점유만료일시를 조건으로 한 UPDATE(compare-and-set)로 점유합니다.
+        """
+        locked_until = timezone.now() + timedelta(seconds=self.visibility_timeout)
+        claim_values = dict(
+            status=Job.Status.RUNNING,
+            locked_until=locked_until,
+            attempts=F("attempts") + 1,
+        )
+
+        if connection.features.has_select_for_update_skip_locked:
+            with transaction.atomic():
+                job_list = list(
+                    Job.get_claimable_qs().select_for_update(skip_locked=True)[
+                        : self.batch_size
+                    ]
+                )
+                Job.objects.filter(pk__in=[job.pk for job in job_list]).update(
+                    **claim_values
+                )
+        else:
+            job_list = []
+            for job in Job.get_claimable_qs()[: self.batch_size]:
+                is_claimed = Job.objects.filter(
+                    pk=job.pk, status=job.status, locked_until=job.locked_until
+                ).update(**claim_values)
+                if is_claimed:
+                    job_list.append(job)
+
+        for job in job_list:
+            job.status = Job.Status.RUNNING
+            job.locked_until = locked_until
+            job.attempts += 1
+        return job_list
+
+    def run_job(self, job: Job):
+        try:
+            with use_tenant(tenant_registry.get(job.tenant)):
+                get_task(job.name)(**job.kwargs)
+        except Exception as e:
+            logger.exception("작업 실행 실패: %s", job)
+            if job.attempts >= job.max_attempts:
+                values = dict(status=Job.Status.FAILED)
+            else:
+                delay = self.retry_delay * 2 ** (job.attempts - 1)
+                values = dict(
+                    status=Job.Status.QUEUED,
+                    run_at=timezone.now() + timedelta(seconds=delay),
+                )
+            values["last_error"] = f"{e.__class__.__name__}: {e}"
+        else:
+            values = dict(status=Job.Status.DONE)
+
+        # 점유만료 후 다른 worker가 가져간 작업이면 결과를 덮어쓰지 않습니다.
+        Job.objects.filter(pk=job.pk, locked_until=job.locked_until).update(
+            locked_until=None, updated_at=timezone.now(), **values
+        )
+
+    def run_once(self) -> int:
+        job_list = self.claim()
+        for job in job_list:
+            self.run_job(job)
+        return len(job_list)
+
+    def run(self, burst: bool = False):
+        while not self.is_stopped:
+            if self.run_once() == 0:
+                if burst:
+                    break
+                time.sleep(self.sleep)
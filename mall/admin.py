@@ -1,28 +1,107 @@
+from django.conf import settings
 from django.contrib import admin
-from mall.models import Category, Product, OrderedProduct, Order
+from django.contrib.admin.views.main import ChangeList
+from mall.models import Category, Product, OrderedProduct, Order, PaymentEvent
+from mall.paginators import EstimatedCountPaginator
+from mall.tasks import cancel_order, update_order
+
+
+class PerformanceChangeList(ChangeList):
+    def get_queryset(self, request, exclude_parameters=None):
+        qs = super().get_queryset(request, exclude_parameters)
+        if self.model_admin.list_only_fields:
+            qs = qs.only(*self.model_admin.list_only_fields)
+        return qs
+
+
+class PerformanceModeAdmin(admin.ModelAdmin):
+    """
+    행이 계속 늘어나는 테이블을 위한 목록 페이지 설정.
+    전체 COUNT(*) 대신 추정치를 사용하고, 목록에 필요한 필드만 조회합니다.
+    """
+
+    show_full_result_count = False
+    paginator = EstimatedCountPaginator
+    list_only_fields = None
+
+    def get_changelist(self, request, **kwargs):
+        return PerformanceChangeList
 
 
 @admin.register(Order)
-class OrderAdmin(admin.ModelAdmin):
+class OrderAdmin(PerformanceModeAdmin):
     list_display = [
         "pk",
-        "name",
+        "display_name",
+        "user",
+        "total_amount",
+        "status",
+        "created_at",
+    ]
+    list_select_related = ["user"]
+    list_only_fields = [
+        "pk",
+        "user__username",
         "total_amount",
         "status",
+        "created_at",
+    ]
+    list_filter = ["status"]
+    raw_id_fields = ["user"]
+    actions = [
+        "make_cancel",
+        "update",
+        "make_prepared_product",
+        "make_shipped",
+        "make_delivered",
     ]
-    actions = ["make_cancel", "update"]
+
+    def get_queryset(self, request):
+        return Order.annotate_name(super().get_queryset(request))
+
+    @admin.display(description="주문명")
+    def display_name(self, order):
+        return order.name
 
     @admin.display(description="지정 주문 결제를 취소합니다.")
     def make_cancel(self, request, queryset):
         for order in queryset:
-            order.cancel("관리자가 주문결제를 취소했습니다.")
-        self.message_user(request, f"{queryset.count()}개의 주문 결제를 취소했습니다.")
+            cancel_order.delay(
+                order_pk=order.pk,
+                reason="관리자가 주문결제를 취소했습니다.",
+            )
+        self.message_task(request, f"{queryset.count()}개의 주문 결제", "취소")
 
     @admin.display(description="지정 주문의 결제 상태를 갱신합니다.")
     def update(self, request, queryset):
         for order in queryset:
-            order.update()
-        self.message_user(request, f"{queryset.count()}개의 주문 결제 상태를 갱신했습니다.")
+            update_order.delay(order_pk=order.pk)
+        self.message_task(request, f"{queryset.count()}개의 주문 결제 상태", "갱신")
+
+    def message_task(self, request, target: str, action: str):
+        # JOBS_ASYNC 이면 작업을 등록만 했으므로, 처리가 끝난 것처럼 안내하지 않습니다.
+        if settings.JOBS_ASYNC:
+            self.message_user(request, f"{target} {action} 작업을 등록했습니다. 잠시 후 처리됩니다.")
+        else:
+            self.message_user(request, f"{target}를 {action}했습니다.")
+
+    def bulk_transition(self, request, queryset, status):
+        count = Order.bulk_transition(queryset, status)
+        self.message_user(
+            request, f"{count}개의 주문을 {Order.Status(status).label} 상태로 변경했습니다."
+        )
+
+    @admin.display(description="지정 주문을 상품준비중 상태로 변경합니다.")
+    def make_prepared_product(self, request, queryset):
+        self.bulk_transition(request, queryset, Order.Status.PREPARED_PRODUCT)
+
+    @admin.display(description="지정 주문을 배송중 상태로 변경합니다.")
+    def make_shipped(self, request, queryset):
+        self.bulk_transition(request, queryset, Order.Status.SHIPPED)
+
+    @admin.display(description="지정 주문을 배송완료 상태로 변경합니다.")
+    def make_delivered(self, request, queryset):
+        self.bulk_transition(request, queryset, Order.Status.DELIVERED)
 
 
 @admin.register(Category)
@@ -50,7 +129,7 @@ class ProductAdmin(admin.ModelAdmin):
 
     @admin.display(description=f"지정 상품을 {Product.Status.ACTIVE.label} 상태로 변경합니다.")
     def make_active(self, request, queryset):
-        count = queryset.update(status=Product.Status.ACTIVE)
+        count = Product.change_status(queryset, Product.Status.ACTIVE)
         self.message_user(
             request,
             f"{count}개의 상품을 {Product.Status.ACTIVE.label} 상태로 변경했습니다.",
@@ -58,5 +137,50 @@ class ProductAdmin(admin.ModelAdmin):
 
 
 @admin.register(OrderedProduct)
-class OrderedProductAdmin(admin.ModelAdmin):
-    pass
+class OrderedProductAdmin(PerformanceModeAdmin):
+    list_display = [
+        "pk",
+        "order",
+        "name",
+        "price",
+        "quantity",
+        "created_at",
+    ]
+    list_select_related = ["order"]
+    list_only_fields = [
+        "pk",
+        "order__id",
+        "name",
+        "price",
+        "quantity",
+        "created_at",
+    ]
+    raw_id_fields = ["order", "product"]
+
+
+@admin.register(PaymentEvent)
+class PaymentEventAdmin(PerformanceModeAdmin):
+    list_display = [
+        "pk",
+        "kind",
+        "merchant_uid",
+        "imp_uid",
+        "status",
+        "amount",
+        "created_at",
+    ]
+    list_filter = ["kind", "status"]
+    list_only_fields = list_display
+    search_fields = ["=merchant_uid", "=imp_uid"]
+    readonly_fields = ["payload"]
+    exclude = ["compressed_payload"]
+
+    # 추가 전용 로그이므로 조회만 허용합니다.
+    def has_add_permission(self, request, obj=None):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def has_delete_permission(self, request, obj=None):
+        return False
@@ -0,0 +1,173 @@
+import base64
+import hashlib
+import json
+import logging
+from typing import Dict, Iterable, List, Optional, Sequence
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import QuerySet
+from django.urls import reverse
+from sorl.thumbnail import get_thumbnail
+
+from mall.snapshots import get_version
+
+
+logger = logging.getLogger(__name__)
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def encode_cursor(pk: int) -> str:
+    return base64.urlsafe_b64encode(str(pk).encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> int:
+    try:
+        padding = "=" * (-len(cursor) % 4)
+        return int(base64.urlsafe_b64decode(cursor + padding).decode())
+    except (ValueError, UnicodeDecodeError):
+        raise InvalidCursor(cursor)
+
+
+class ProductCardStore:
+    """
+    상품 카드 JSON 에 들어갈 값을 (pk, updated_at) 키로 캐시합니다.
+
+    썸네일 URL 은 sorl-thumbnail 조회(필요하면 이미지 생성)가 필요하므로 카드 캐시 미스일 때만 계산하고,
+    make_product_thumbnail 작업에서 warm() 으로 미리 채워둡니다.
+    """
+
+    key_prefix = "mall:product-card"
+    field_list = ("id", "name", "price", "category", "thumbnail_url", "cart_url")
+    thumbnail_geometry = "300x300"
+    thumbnail_options = {"crop": "center"}
+
+    def __init__(self, timeout: int = 3600, cache_alias="default"):
+        self.timeout = timeout
+        self.cache_alias = cache_alias
+
+    @property
+    def cache(self):
+        return caches[self.cache_alias]
+
+    def make_key(self, product) -> str:
+        return f"{self.key_prefix}:{product.pk}:{get_version(product.updated_at)}"
+
+    def get_thumbnail_url(self, product) -> Optional[str]:
+        if not product.photo:
+            return None
+        try:
+            return get_thumbnail(
+                product.photo, self.thumbnail_geometry, **self.thumbnail_options
+            ).url
+        except Exception:
+            logger.exception("상품 썸네일 생성 실패 (product_pk=%s)", product.pk)
+            return None
+
+    def make_card(self, product) -> dict:
+        return {
+            "id": product.pk,
+            "name": product.name,
+            "price": product.price,
+            "category": product.category.name,
+            "thumbnail_url": self.get_thumbnail_url(product),
+            "cart_url": reverse("add_to_cart", args=[product.pk]),
+        }
+
+    def warm(self, product) -> dict:
+        card = self.make_card(product)
+        if product.photo and card["thumbnail_url"] is None:
+            return card  # 썸네일 생성에 실패한 카드는 캐시하지 않고 다음 요청에서 재시도합니다.
+        self.cache.set(self.make_key(product), card, self.timeout)
+        return card
+
+    def get_many(self, product_list: Iterable) -> List[dict]:
+        product_list = list(product_list)
+        key_list = [self.make_key(product) for product in product_list]
+        cached_dict = self.cache.get_many(key_list)
+        return [
+            cached_dict.get(key) or self.warm(product)
+            for key, product in zip(key_list, product_list)
+        ]
+
+
+class ProductPageCache:
+    """
+    목록 버전(활성 상품의 최종 수정시각, 개수) + 요청 파라미터를 키로, 직렬화를 마친 JSON 응답 본문을 캐시합니다.
+    상품이 수정되면 목록 버전이 바뀌므로 별도의 무효화가 필요 없습니다.
+    """
+
+    key_prefix = "mall:product-page"
+
+    def __init__(
+        self, card_store: ProductCardStore, timeout: int = 60, cache_alias="default"
+    ):
+        self.card_store = card_store
+        self.timeout = timeout
+        self.cache_alias = cache_alias
+
+    @property
+    def cache(self):
+        return caches[self.cache_alias]
+
+    def parse_fields(self, fields: str) -> Sequence[str]:
+        """sparse fieldset: 알 수 없는 필드는 무시하고, 지정하지 않으면 전체 필드를 반환합니다."""
+        field_set = {name.strip() for name in fields.split(",") if name.strip()}
+        field_list = [name for name in self.card_store.field_list if name in field_set]
+        return field_list or self.card_store.field_list
+
+    def make_key(self, list_version, query, cursor, limit, field_list) -> str:
+        value = "|".join(
+            str(part)
+            for part in (list_version, query, cursor, limit, ",".join(field_list))
+        )
+        return f"{self.key_prefix}:{hashlib.md5(value.encode(), usedforsecurity=False).hexdigest()}"
+
+    def get_payload(
+        self,
+        product_qs: QuerySet,
+        list_version,
+        query: str = "",
+        cursor: str = "",
+        limit: int = 12,
+        fields: str = "",
+    ) -> bytes:
+        field_list = self.parse_fields(fields)
+        key = self.make_key(list_version, query, cursor, limit, field_list)
+        payload = self.cache.get(key)
+        if payload is None:
+            payload = self.render(product_qs, cursor, limit, field_list)
+            self.cache.set(key, payload, self.timeout)
+        return payload
+
+    def render(
+        self, product_qs: QuerySet, cursor: str, limit: int, field_list
+    ) -> bytes:
+        if cursor:
+            product_qs = product_qs.filter(pk__lt=decode_cursor(cursor))
+        # limit + 1 개를 조회해 다음 페이지 존재 여부를 COUNT 쿼리 없이 판단합니다.
+        product_list = list(product_qs.order_by("-pk")[: limit + 1])
+        has_next = len(product_list) > limit
+        product_list = product_list[:limit]
+
+        card_list = self.card_store.get_many(product_list)
+        result_list: List[Dict] = [
+            {name: card[name] for name in field_list} for card in card_list
+        ]
+        next_cursor = encode_cursor(product_list[-1].pk) if has_next else None
+        return json.dumps(
+            {"results": result_list, "next_cursor": next_cursor},
+            cls=DjangoJSONEncoder,
+            ensure_ascii=False,
+            separators=(",", ":"),
+        ).encode()
+
+
+product_card_store = ProductCardStore(timeout=settings.PRODUCT_CARD_TIMEOUT)
+product_page_cache = ProductPageCache(
+    product_card_store, timeout=settings.PRODUCT_API_CACHE_TIMEOUT
+)
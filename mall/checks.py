@@ -0,0 +1,90 @@
+from django.conf import settings
+from django.core.checks import Error, Info, register
+from django.core.exceptions import ImproperlyConfigured
+from django.db import connections
+
+
+@register("database_connections")
+def check_database_connections(app_configs, **kwargs):
+    """적용된 persistent connection/pool 설정을 보고하고, 잘못된 pool 설정을 알립니다."""
+    messages = []
+    for alias in connections:
+        db_config = connections.settings[alias]
+        pool_options = db_config.get("OPTIONS", {}).get("pool")
+        conn_max_age = db_config.get("CONN_MAX_AGE", 0)
+        health_checks = db_config.get("CONN_HEALTH_CHECKS", False)
+
+        if settings.DATABASE_POOL and not pool_options:
+            messages.append(
+                Error(
+                    f"'{alias}' 데이터베이스는 connection pool 을 지원하지 않습니다.",
+                    hint="DATABASE_POOL 은 PostgreSQL(psycopg 3) 에서만 사용할 수 있습니다.",
+                    id="mall.E001",
+                )
+            )
+        if pool_options:
+            try:
+                import psycopg_pool  # noqa: F401
+            except ImportError:
+                messages.append(
+                    Error(
+                        "psycopg_pool 모듈을 찾을 수 없습니다.",
+                        hint="pip install 'psycopg[pool]'",
+                        id="mall.E002",
+                    )
+                )
+
+        if pool_options or conn_max_age or health_checks:
+            messages.append(
+                Info(
+                    f"'{alias}' 연결 설정: CONN_MAX_AGE={conn_max_age}, "
+                    f"CONN_HEALTH_CHECKS={health_checks}, pool={pool_options or None}",
+                    id="mall.I001",
+                )
+            )
+
+        sqlite_options = db_config.get("OPTIONS", {})
+        if db_config["ENGINE"] == "django.db.backends.sqlite3" and (
+            "init_command" in sqlite_options
+        ):
+            messages.append(
+                Info(
+                    f"'{alias}' SQLite 프로필: "
+                    f"transaction_mode={sqlite_options.get('transaction_mode')}, "
+                    f"{sqlite_options['init_command']}",
+                    id="mall.I002",
+                )
+            )
+    return messages
+
+
+@register("tenants")
+def check_tenants(app_configs, **kwargs):
+    """settings.TENANTS 설정을 확인하고, 등록된 테넌트를 보고합니다."""
+    from mall.tenants import tenant_registry
+
+    tenant_registry.reset()
+    try:
+        tenant_registry.build()
+    except ImproperlyConfigured as e:
+        return [Error(str(e), id="mall.E003")]
+
+    messages = []
+    for slug in settings.TENANTS:
+        tenant = tenant_registry.get(slug)
+        if not (tenant.portone_api_key and tenant.portone_api_secret):
+            messages.append(
+                Error(
+                    f"'{slug}' 테넌트의 PortOne 인증정보가 없습니다.",
+                    hint="portone_api_key, portone_api_secret 을 지정해주세요.",
+                    id="mall.E004",
+                )
+            )
+        messages.append(
+            Info(
+                f"'{slug}' 테넌트: hosts={', '.join(tenant.host_list)}, "
+                f"database={tenant.database_alias}",
+                id="mall.I003",
+            )
+        )
+    return messages
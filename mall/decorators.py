@@ -1,26 +1,105 @@
 import functools
+from ipaddress import ip_address, ip_network
+from typing import Iterable, Optional
+from django.conf import settings
 from django.http import HttpRequest, HttpResponseForbidden
 
 
-def deny_from_untrusted_hosts(allowed_ip_list):
-    def get_client_ip(request: HttpRequest) -> str:
-        x_forwarded_for = request.META.get("HTTP_X_FORWARDED_FOR")
+class IPAllowList:
+    """
+    허용 IP 목록을 한 번만 컴파일해두고 요청마다 빠르게 조회합니다.
 
-        if x_forwarded_for:
-            ip = x_forwarded_for.split(",")[0]
-        else:
-            ip = request.META.get("REMOTE_ADDR")
+    단일 IP는 frozenset 으로, CIDR 대역은 prefix 길이별 네트워크 주소 frozenset 으로 보관하므로
+    조회 비용은 목록 크기와 무관하게 (서로 다른 prefix 길이 수) 만큼의 set 조회입니다.
+    """
 
-        return ip
+    def __init__(self, allowed_ip_list: Iterable[str]):
+        ip_set = set()
+        prefix_dict = {}
+        for value in allowed_ip_list:
+            network = ip_network(value.strip(), strict=False)
+            if network.num_addresses == 1:
+                ip_set.add(network.network_address)
+            else:
+                key = (network.version, network.prefixlen)
+                prefix_dict.setdefault(key, set()).add(int(network.network_address))
+        self.ip_set = frozenset(ip_set)
+        self.prefix_list = tuple(
+            (version, prefixlen, frozenset(address_set))
+            for (version, prefixlen), address_set in prefix_dict.items()
+        )
+
+    def __contains__(self, ip) -> bool:
+        if ip is None:
+            return False
+        try:
+            address = ip_address(ip)
+        except ValueError:
+            return False
+        if address in self.ip_set:
+            return True
+
+        address_int = int(address)
+        for version, prefixlen, address_set in self.prefix_list:
+            if version != address.version:
+                continue
+            host_bits = address.max_prefixlen - prefixlen
+            if (address_int >> host_bits) << host_bits in address_set:
+                return True
+        return False
+
+
+def get_client_ip(request: HttpRequest, trusted_proxy_count: int = 0) -> Optional[str]:
+    """
+    신뢰하는 프록시 수(trusted_proxy_count)만큼만 X-Forwarded-For 를 거슬러 올라갑니다.
+    0 이면 X-Forwarded-For 를 무시합니다. 헤더의 hop 수가 부족하면 위조로 보고 None 을 반환합니다.
+    """
+    if trusted_proxy_count <= 0:
+        return request.META.get("REMOTE_ADDR")
+
+    x_forwarded_for = request.META.get("HTTP_X_FORWARDED_FOR", "")
+    hop_list = [hop.strip() for hop in x_forwarded_for.split(",") if hop.strip()]
+    if len(hop_list) < trusted_proxy_count:
+        return None
+    return hop_list[-trusted_proxy_count]
+
+
+def deny_from_untrusted_hosts(allowed_ip_list, trusted_proxy_count=None):
+    allow_list = IPAllowList(allowed_ip_list)
+    if trusted_proxy_count is None:
+        trusted_proxy_count = settings.TRUSTED_PROXY_COUNT
 
     def decorator(view_function):
         @functools.wraps(view_function)
         def _wrapped_view(request, *args, **kwargs):
-            ip = get_client_ip(request)
-            if ip not in allowed_ip_list:
+            ip = get_client_ip(request, trusted_proxy_count)
+            if ip not in allow_list:
                 return HttpResponseForbidden("허용되지 않은 IP에서의 요청입니다.")
             return view_function(request, *args, **kwargs)
 
         return _wrapped_view
 
     return decorator
+
+
+class IPAllowListMiddleware:
+    """
+    settings.IP_ALLOWLIST_PATHS 의 {경로 prefix: 허용 IP/CIDR 목록} 규칙을
+    뷰 데코레이터 대신 미들웨어로 적용합니다.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.rule_list = [
+            (path_prefix, IPAllowList(allowed_ip_list))
+            for path_prefix, allowed_ip_list in settings.IP_ALLOWLIST_PATHS.items()
+        ]
+
+    def __call__(self, request):
+        for path_prefix, allow_list in self.rule_list:
+            if request.path.startswith(path_prefix):
+                ip = get_client_ip(request, settings.TRUSTED_PROXY_COUNT)
+                if ip not in allow_list:
+                    return HttpResponseForbidden("허용되지 않은 IP에서의 요청입니다.")
+                break
+        return self.get_response(request)
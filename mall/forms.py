@@ -1,4 +1,7 @@
 from django import forms
+from django.core.exceptions import ValidationError
+from django.db import router, transaction
+from django.forms import BaseModelFormSet, modelformset_factory
 from mall.models import CartProduct
 
 
@@ -6,3 +9,95 @@ class CartProductForm(forms.ModelForm):
     class Meta:
         model = CartProduct
         fields = ["quantity"]
+
+
+class PrefetchedModelChoiceField(forms.ModelChoiceField):
+    """미리 조회해둔 인스턴스 사전에서 값을 찾아, 폼마다 조회 쿼리가 발생하지 않도록 합니다."""
+
+    def __init__(self, instance_dict, *args, **kwargs):
+        self.instance_dict = instance_dict
+        super().__init__(*args, **kwargs)
+
+    def to_python(self, value):
+        if value in self.empty_values:
+            return None
+        try:
+            return self.instance_dict[int(value)]
+        except (KeyError, TypeError, ValueError):
+            raise ValidationError(
+                self.error_messages["invalid_choice"],
+                code="invalid_choice",
+                params={"value": value},
+            )
+
+
+class BaseCartProductFormSet(BaseModelFormSet):
+    """
+    장바구니 일괄 수정 폼셋.
+
+    유효성 검사는 formset queryset을 1회 조회한 결과만으로 메모리에서 수행하고,
+    저장은 트랜잭션 안에서 1회의 bulk_update와 1회의 DELETE로 처리합니다.
+    장바구니 상품 수와 무관하게 쿼리 수가 일정합니다.
+    """
+
+    def get_instance_dict(self):
+        if not hasattr(self, "_instance_dict"):
+            self._instance_dict = {obj.pk: obj for obj in self.get_queryset()}
+        return self._instance_dict
+
+    def _existing_object(self, pk):
+        return self.get_instance_dict().get(pk)
+
+    def add_fields(self, form, index):
+        super().add_fields(form, index)
+        pk_name = self._pk_field.name
+        pk_field = form.fields[pk_name]
+        form.fields[pk_name] = PrefetchedModelChoiceField(
+            self.get_instance_dict(),
+            queryset=pk_field.queryset,
+            initial=pk_field.initial,
+            required=False,
+            widget=pk_field.widget,
+        )
+
+    def save(self, commit=True):
+        if not commit:
+            return super().save(commit=False)
+
+        self.new_objects = []
+        self.changed_objects = []
+        self.deleted_objects = []
+
+        forms_to_delete = self.deleted_forms
+        for form in self.initial_forms:
+            obj = form.instance
+            if obj.pk is None:
+                continue
+            if form in forms_to_delete:
+                self.deleted_objects.append(obj)
+            elif form.has_changed():
+                self.changed_objects.append((obj, form.changed_data))
+
+        update_fields = sorted(
+            {name for _, changed_data in self.changed_objects for name in changed_data}
+        )
+        changed_list = [obj for obj, _ in self.changed_objects]
+
+        with transaction.atomic(using=router.db_for_write(self.model)):
+            if changed_list:
+                self.model._default_manager.bulk_update(changed_list, update_fields)
+            if self.deleted_objects:
+                self.model._default_manager.filter(
+                    pk__in=[obj.pk for obj in self.deleted_objects]
+                ).delete()
+            saved_instances = changed_list + self.save_new_objects(commit=True)
+        return saved_instances
+
+
+CartProductFormSet = modelformset_factory(
+    model=CartProduct,
+    form=CartProductForm,
+    formset=BaseCartProductFormSet,
+    can_delete=True,
+    extra=0,
+)
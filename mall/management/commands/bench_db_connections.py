@@ -0,0 +1,49 @@
+import time
+from django.core.management import BaseCommand
+from django.db import connections, DEFAULT_DB_ALIAS
+
+
+class Command(BaseCommand):
+    help = "요청마다 새 연결을 맺을 때와 연결을 재사용할 때의 요청당 DB 비용을 비교합니다."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--requests", type=int, default=200)
+        parser.add_argument("--database", default=DEFAULT_DB_ALIAS)
+
+    def handle(self, *args, **options):
+        connection = connections[options["database"]]
+        request_count = options["requests"]
+        settings_dict = connection.settings_dict
+        original_conn_max_age = settings_dict["CONN_MAX_AGE"]
+
+        try:
+            result_dict = {}
+            for label, conn_max_age in [("new connection", 0), ("persistent", None)]:
+                # close_at 은 연결 시점의 CONN_MAX_AGE 로 계산되므로 먼저 닫습니다.
+                connection.close()
+                settings_dict["CONN_MAX_AGE"] = conn_max_age
+                result_dict[label] = self.run(connection, request_count)
+        finally:
+            connection.close()
+            settings_dict["CONN_MAX_AGE"] = original_conn_max_age
+
+        for label, elapsed in result_dict.items():
+            self.stdout.write(
+                f"{label:>15}: {elapsed * 1000 / request_count:.3f} ms/request"
+            )
+        saved = result_dict["new connection"] - result_dict["persistent"]
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"saved per request: {saved * 1000 / request_count:.3f} ms"
+            )
+        )
+
+    def run(self, connection, request_count: int) -> float:
+        started_at = time.perf_counter()
+        for _ in range(request_count):
+            # request_started/request_finished 시그널의 close_old_connections 와 동일하게 동작합니다.
+            connection.close_if_unusable_or_obsolete()
+            with connection.cursor() as cursor:
+                cursor.execute("SELECT 1")
+            connection.close_if_unusable_or_obsolete()
+        return time.perf_counter() - started_at
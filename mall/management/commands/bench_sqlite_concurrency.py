@@ -0,0 +1,144 @@
+import sqlite3
+import tempfile
+import threading
+import time
+from pathlib import Path
+from django.conf import settings
+from django.core.management import BaseCommand
+
+
+class Command(BaseCommand):
+    help = (
+        "SQLite 기본 설정과 운영 프로필(settings.SQLITE_PRAGMAS + BEGIN IMMEDIATE)에서 "
+        "장바구니 담기와 같은 읽기-후-쓰기 트랜잭션의 동시 처리량을 비교합니다."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--writers", type=int, default=8)
+        parser.add_argument("--readers", type=int, default=4)
+        parser.add_argument("--seconds", type=float, default=3.0)
+        parser.add_argument("--rows", type=int, default=10, help="경합하는 row 수")
+
+    def handle(self, *args, **options):
+        profile_list = [
+            ("default", [], "DEFERRED", 5.0),
+            (
+                "production",
+                [f"PRAGMA {k}={v}" for k, v in settings.SQLITE_PRAGMAS.items()],
+                "IMMEDIATE",
+                settings.SQLITE_PRAGMAS["busy_timeout"] / 1000,
+            ),
+        ]
+
+        self.stdout.write(
+            f"{'profile':<11} {'commits/s':>10} {'reads/s':>10} {'p99 ms':>8} "
+            f"{'locked':>7} {'lost':>5}"
+        )
+        for label, pragma_list, transaction_mode, timeout in profile_list:
+            with tempfile.TemporaryDirectory() as temp_dir:
+                result = self.run(
+                    Path(temp_dir) / "bench.sqlite3",
+                    pragma_list,
+                    transaction_mode,
+                    timeout,
+                    options,
+                )
+            self.stdout.write(
+                f"{label:<11} {result['commits'] / options['seconds']:>10.1f} "
+                f"{result['reads'] / options['seconds']:>10.1f} "
+                f"{result['p99'] * 1000:>8.1f} {result['locked']:>7} {result['lost']:>5}"
+            )
+
+    def connect(self, path, pragma_list, timeout):
+        conn = sqlite3.connect(
+            path, timeout=timeout, isolation_level=None, check_same_thread=False
+        )
+        for pragma in pragma_list:
+            conn.execute(pragma)
+        return conn
+
+    def run(self, path, pragma_list, transaction_mode, timeout, options) -> dict:
+        conn = self.connect(path, pragma_list, timeout)
+        conn.execute("CREATE TABLE cart (id INTEGER PRIMARY KEY, quantity INTEGER)")
+        conn.execute(
+            "CREATE TABLE orders (id INTEGER PRIMARY KEY, cart_id INTEGER, created_at REAL)"
+        )
+        conn.executemany(
+            "INSERT INTO cart (id, quantity) VALUES (?, 0)",
+            [(i,) for i in range(options["rows"])],
+        )
+
+        lock = threading.Lock()
+        result = {"commits": 0, "reads": 0, "locked": 0, "durations": []}
+        deadline = time.monotonic() + options["seconds"]
+
+        def writer(index):
+            thread_conn = self.connect(path, pragma_list, timeout)
+            commits, locked, duration_list = 0, 0, []
+            i = index
+            while time.monotonic() < deadline:
+                row_id = i % options["rows"]
+                i += 1
+                started_at = time.perf_counter()
+                try:
+                    thread_conn.execute(f"BEGIN {transaction_mode}")
+                    (quantity,) = thread_conn.execute(
+                        "SELECT quantity FROM cart WHERE id = ?", (row_id,)
+                    ).fetchone()
+                    thread_conn.execute(
+                        "UPDATE cart SET quantity = ? WHERE id = ?",
+                        (quantity + 1, row_id),
+                    )
+                    thread_conn.execute(
+                        "INSERT INTO orders (cart_id, created_at) VALUES (?, ?)",
+                        (row_id, time.time()),
+                    )
+                    thread_conn.execute("COMMIT")
+                    commits += 1
+                except sqlite3.OperationalError as e:
+                    if thread_conn.in_transaction:
+                        thread_conn.execute("ROLLBACK")
+                    if "locked" not in str(e) and "busy" not in str(e):
+                        raise
+                    locked += 1
+                duration_list.append(time.perf_counter() - started_at)
+            thread_conn.close()
+            with lock:
+                result["commits"] += commits
+                result["locked"] += locked
+                result["durations"] += duration_list
+
+        def reader():
+            thread_conn = self.connect(path, pragma_list, timeout)
+            reads = 0
+            while time.monotonic() < deadline:
+                try:
+                    thread_conn.execute("SELECT SUM(quantity) FROM cart").fetchone()
+                    thread_conn.execute("SELECT COUNT(*) FROM orders").fetchone()
+                    reads += 1
+                except sqlite3.OperationalError:
+                    with lock:
+                        result["locked"] += 1
+            thread_conn.close()
+            with lock:
+                result["reads"] += reads
+
+        thread_list = [
+            threading.Thread(target=writer, args=(i,))
+            for i in range(options["writers"])
+        ] + [threading.Thread(target=reader) for _ in range(options["readers"])]
+        for thread in thread_list:
+            thread.start()
+        for thread in thread_list:
+            thread.join()
+
+        # 커밋된 트랜잭션 수와 누적 수량이 다르면 읽기-후-쓰기 사이에 갱신이 유실된 것입니다.
+        (total_quantity,) = conn.execute("SELECT SUM(quantity) FROM cart").fetchone()
+        conn.close()
+
+        duration_list = sorted(result["durations"])
+        result["p99"] = (
+            duration_list[int(len(duration_list) * 0.99) - 1] if duration_list else 0
+        )
+        result["lost"] = result["commits"] - total_quantity
+        return result
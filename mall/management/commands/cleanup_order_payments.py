@@ -0,0 +1,123 @@
+from collections import Counter
+from datetime import timedelta
+from django.core.management import BaseCommand
+from django.db.models import Exists, OuterRef
+from django.utils import timezone
+from mall.models import OrderPayment, PaymentEvent
+from mall.portone import PortoneUnavailable
+
+
+class Command(BaseCommand):
+    help = (
+        "결제되지 않고 남은 오래된 READY 결제 시도를 일괄 삭제합니다. "
+        "같은 주문에 결제완료된 다른 결제가 없으면 PortOne 에서 결제되지 않았음을 확인한 후에만 삭제합니다."
+    )
+
+    # PortOne 에서 이 상태이면 결제되지 않은 시도로 보고 삭제합니다.
+    # ready 는 가상계좌 입금 대기일 수 있으므로 삭제하지 않습니다.
+    deletable_status_list = [
+        OrderPayment.PayStatus.FAILED,
+        OrderPayment.PayStatus.CANCELLED,
+    ]
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--hours",
+            type=int,
+            default=24,
+            help="생성 후 지정 시간이 지난 READY 결제를 삭제합니다. (기본: 24)",
+        )
+        parser.add_argument("--batch-size", type=int, default=1000)
+        parser.add_argument(
+            "--skip-portone",
+            action="store_true",
+            help="PortOne 을 조회하지 않고, 결제완료된 다른 결제가 있는 주문의 시도만 삭제합니다.",
+        )
+        parser.add_argument(
+            "--dry-run", action="store_true", help="삭제하지 않고 대상 수만 출력합니다."
+        )
+
+    def handle(self, *args, **options):
+        deleted_before = timezone.now() - timedelta(hours=options["hours"])
+        qs = (
+            OrderPayment.objects.filter(
+                pay_status=OrderPayment.PayStatus.READY,
+                is_paid_ok=False,
+                created_at__lt=deleted_before,
+            )
+            .annotate(
+                has_paid_sibling=Exists(
+                    OrderPayment.objects.filter(
+                        order=OuterRef("order"), is_paid_ok=True
+                    )
+                )
+            )
+            .select_related("order")
+            .order_by("pk")
+        )
+
+        self.stats = Counter()
+        self.dry_run = options["dry_run"]
+        last_pk = 0
+        while True:
+            payment_list = list(qs.filter(pk__gt=last_pk)[: options["batch_size"]])
+            if not payment_list:
+                break
+            last_pk = payment_list[-1].pk
+
+            pk_list = [
+                payment.pk
+                for payment in payment_list
+                if payment.has_paid_sibling
+                or (not options["skip_portone"] and self.is_unpaid(payment))
+            ]
+            if pk_list and not options["dry_run"]:
+                OrderPayment.objects.filter(pk__in=pk_list).delete()
+            self.stats["deleted"] += len(pk_list)
+
+        verb = "삭제 대상" if options["dry_run"] else "삭제"
+        self.stdout.write(
+            self.style.SUCCESS(f"{verb}: {self.stats['deleted']}개의 결제 시도")
+        )
+        if self.stats["reconciled"]:
+            self.stdout.write(
+                self.style.WARNING(
+                    f"PortOne 에서 결제완료된 {self.stats['reconciled']}개의 결제를 반영했습니다."
+                )
+            )
+        if self.stats["kept"] or self.stats["unverified"]:
+            self.stdout.write(
+                f"유지: 결제 대기 {self.stats['kept']}개, 확인 실패 {self.stats['unverified']}개"
+            )
+
+    def is_unpaid(self, payment: OrderPayment) -> bool:
+        """PortOne 에서 결제되지 않은 것이 확인되면 True. 결제되었으면 반영하고 False 를 반환합니다."""
+        from iamport import Iamport
+
+        try:
+            response = payment.api.find(merchant_uid=payment.merchant_uid)
+        except Iamport.HttpError as e:
+            if e.code == 404:
+                # 결제창을 열기만 하고 결제를 요청하지 않은 시도입니다.
+                return True
+            self.stats["unverified"] += 1
+            return False
+        except Iamport.ResponseError:
+            # 인증 실패/점검 등 PortOne 의 업무 오류 응답은 결제되지 않았다는 확인이 아닙니다.
+            self.stats["unverified"] += 1
+            return False
+        except PortoneUnavailable:
+            self.stats["unverified"] += 1
+            return False
+
+        PaymentEvent.record(PaymentEvent.Kind.RESPONSE, response)
+        if response.get("status") in self.deletable_status_list:
+            return True
+        if response.get("status") == OrderPayment.PayStatus.PAID:
+            # 결제 확인/웹훅이 누락된 결제입니다. 삭제하지 않고 결제완료로 반영합니다.
+            if not self.dry_run:
+                payment.update(response=response)
+            self.stats["reconciled"] += 1
+            return False
+        self.stats["kept"] += 1
+        return False
@@ -0,0 +1,80 @@
+import subprocess
+import sys
+from collections import defaultdict
+from django.core.management import BaseCommand, CommandError
+
+
+SETUP_CODE = """
+import time
+started_at = time.perf_counter()
+import django
+django.setup()
+if {urls!r}:
+    from django.urls import get_resolver
+    get_resolver().url_patterns
+for name in {module_list!r}:
+    __import__(name)
+print(time.perf_counter() - started_at)
+"""
+
+
+class Command(BaseCommand):
+    help = (
+        "새 파이썬 프로세스에서 python -X importtime 으로 django.setup() 을 실행해 "
+        "패키지별 import 시간을 보고합니다. 관리 명령/워커의 시작 시간을 줄일 때 사용합니다."
+    )
+    # 측정 대상 프로세스와 별개로, 이 명령 자체의 시스템 체크는 필요하지 않습니다.
+    requires_system_checks = []
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "module",
+            nargs="*",
+            help="django.setup() 후에 추가로 import 할 모듈 (예: mall.views)",
+        )
+        parser.add_argument(
+            "--urls",
+            action="store_true",
+            help="ROOT_URLCONF 와 모든 뷰 모듈까지 import 합니다. (runserver, check 와 같은 조건)",
+        )
+        parser.add_argument("--limit", type=int, default=20)
+        parser.add_argument("--repeat", type=int, default=3, help="측정 횟수 (최솟값 사용)")
+
+    def handle(self, *args, **options):
+        code = SETUP_CODE.format(urls=options["urls"], module_list=options["module"])
+        best = None
+        for _ in range(max(options["repeat"], 1)):
+            result = subprocess.run(
+                [sys.executable, "-X", "importtime", "-c", code],
+                capture_output=True,
+                text=True,
+            )
+            if result.returncode != 0:
+                raise CommandError(result.stderr.strip().splitlines()[-1])
+            elapsed = float(result.stdout.strip().splitlines()[-1])
+            if best is None or elapsed < best[0]:
+                best = (elapsed, result.stderr)
+
+        elapsed, stderr = best
+        package_dict = defaultdict(int)
+        module_list = []
+        for line in stderr.splitlines():
+            if not line.startswith("import time:") or "self [us]" in line:
+                continue
+            self_us, cumulative_us, name = line.split(":", 1)[1].split("|")
+            module_name = name.strip()
+            package_dict[module_name.split(".")[0]] += int(self_us)
+            module_list.append((int(cumulative_us), module_name))
+
+        self.stdout.write(f"django.setup() 까지 소요시간: {elapsed * 1000:.1f} ms")
+        self.stdout.write("\n패키지별 import 시간 (self 합계)")
+        for package, self_us in sorted(
+            package_dict.items(), key=lambda item: item[1], reverse=True
+        )[: options["limit"]]:
+            self.stdout.write(f"{self_us / 1000:>9.1f} ms  {package}")
+
+        self.stdout.write("\n모듈별 import 시간 (cumulative)")
+        for cumulative_us, module_name in sorted(module_list, reverse=True)[
+            : options["limit"]
+        ]:
+            self.stdout.write(f"{cumulative_us / 1000:>9.1f} ms  {module_name}")
@@ -2,7 +2,7 @@ import requests
 from django.core.management import BaseCommand
 from dataclasses import dataclass
 from mall.models import Category, Product
-from django.core.files.base import ContentFile
+from mall.tasks import download_product_photo
 from tqdm import tqdm
 
 
@@ -46,10 +46,4 @@ class Command(BaseCommand):
             )
             if is_created:
                 photo_url = BASE_URL + item.photo_path
-                file_name = photo_url.rsplit("/", 1)[-1]
-                photo_data = requests.get(photo_url).content
-                product.photo.save(
-                    name=file_name,
-                    content=ContentFile(photo_data),
-                    save=True,
-                )
+                download_product_photo.delay(product_pk=product.pk, photo_url=photo_url)
@@ -0,0 +1,290 @@
+import math
+import random
+import threading
+import time
+from collections import Counter, defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List
+from unittest import mock
+
+from django.core.management import BaseCommand, CommandError
+from django.db import OperationalError, connections
+from django.test import Client
+from django.urls import reverse
+from django.utils import timezone
+from accounts.models import User
+from mall.models import AbstractPortonePayment, Category, Order, OrderPayment, Product
+from mall.portone_client import PortoneClient
+from reports import rollups
+
+
+class FakePortoneClient(PortoneClient):
+    """실제 PortOne 대신, 요청한 금액 그대로 결제 완료된 것처럼 응답합니다."""
+
+    latency = 0.0
+
+    def find(self, **kwargs):
+        def fake_find(merchant_uid):
+            time.sleep(self.latency)
+            payment = OrderPayment.objects.get(uid=merchant_uid)
+            return {
+                "merchant_uid": merchant_uid,
+                "status": "paid",
+                "amount": payment.desired_amount,
+            }
+
+        return self.call("find", fake_find, **kwargs)
+
+    def cancel(self, reason, **kwargs):
+        return self.call("cancel", lambda **_: {"status": "cancelled"}, **kwargs)
+
+
+class EndpointStats:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.duration_dict: Dict[str, List[float]] = defaultdict(list)
+        self.error_dict: Dict[str, int] = defaultdict(int)
+        self.lock_error_dict: Dict[str, int] = defaultdict(int)
+        # {endpoint: {예외 클래스명: 횟수}}
+        self.exception_dict: Dict[str, Counter] = defaultdict(Counter)
+
+    def request(self, client: Client, endpoint: str, method: str, url: str):
+        """
+        요청 1회의 응답 시간과 결과를 기록합니다. 뷰에서 발생한 예외도 엔드포인트별로 기록하고
+        None 을 반환하므로, 한 요청의 실패로 가상 사용자의 스레드가 중단되지 않습니다.
+        """
+        started_at = time.perf_counter()
+        response = None
+        exception_name = None
+        try:
+            response = getattr(client, method)(url)
+        except OperationalError as e:
+            # SQLite: database is locked / database table is locked
+            kind = "lock" if "locked" in str(e) else "error"
+            exception_name = type(e).__name__
+        except Exception as e:
+            kind = "error"
+            exception_name = type(e).__name__
+        else:
+            kind = "error" if response.status_code >= 400 else None
+        duration = time.perf_counter() - started_at
+
+        with self._lock:
+            self.duration_dict[endpoint].append(duration)
+            if kind == "lock":
+                self.lock_error_dict[endpoint] += 1
+            elif kind == "error":
+                self.error_dict[endpoint] += 1
+            if exception_name and kind != "lock":
+                self.exception_dict[endpoint][exception_name] += 1
+        return response if kind is None else None
+
+
+def percentile(sorted_list: List[float], p: float) -> float:
+    if not sorted_list:
+        return 0.0
+    return sorted_list[max(math.ceil(p * len(sorted_list)) - 1, 0)]
+
+
+class Command(BaseCommand):
+    help = (
+        "add_to_cart -> order_new -> order_pay -> order_check 흐름을 N명의 가상 사용자로 동시에 실행합니다. "
+        "PortOne 은 가짜 클라이언트로 대체합니다. 테스트 데이터를 생성/삭제하므로 운영 DB에서 실행하지 마세요."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--users", type=int, default=20, help="동시 사용자 수")
+        parser.add_argument("--iterations", type=int, default=3, help="사용자별 주문 반복 횟수")
+        parser.add_argument(
+            "--scenario",
+            choices=["flash-sale", "spread"],
+            default="flash-sale",
+            help="flash-sale: 모든 사용자가 같은 상품을 주문 / spread: 여러 상품에 분산",
+        )
+        parser.add_argument("--products", type=int, default=20, help="spread 상품 수")
+        parser.add_argument(
+            "--clicks",
+            type=int,
+            default=2,
+            help="장바구니 담기 버튼을 동시에 누르는 횟수 (중복 클릭)",
+        )
+        parser.add_argument(
+            "--portone-latency", type=float, default=0.05, help="가짜 PortOne 응답 지연(초)"
+        )
+        parser.add_argument(
+            "--host", default="localhost", help="ALLOWED_HOSTS 에 포함된 호스트"
+        )
+        parser.add_argument("--keep-data", action="store_true")
+
+    def handle(self, *args, **options):
+        if options["users"] < 1 or options["clicks"] < 1:
+            raise CommandError("--users 와 --clicks 는 1 이상이어야 합니다.")
+
+        self.options = options
+        self.stats = EndpointStats()
+        self.lost_update_dict: Dict[str, int] = defaultdict(int)
+        self.checkout_count = 0
+        self.count_lock = threading.Lock()
+
+        user_list, product_list = self.setup_data()
+        FakePortoneClient.latency = options["portone_latency"]
+        fake_api = mock.patch.object(
+            AbstractPortonePayment,
+            "api",
+            property(lambda payment: FakePortoneClient(imp_key="", imp_secret="")),
+        )
+        try:
+            with fake_api:
+                started_at = time.perf_counter()
+                with ThreadPoolExecutor(max_workers=len(user_list)) as executor:
+                    for future in [
+                        executor.submit(self.run_user, user, product_list)
+                        for user in user_list
+                    ]:
+                        future.result()
+                elapsed = time.perf_counter() - started_at
+        finally:
+            if not options["keep_data"]:
+                self.teardown_data(user_list, product_list)
+
+        self.report(elapsed)
+
+    def setup_data(self):
+        prefix = f"loadtest-{int(time.time())}"
+        category, _ = Category.objects.get_or_create(name="loadtest")
+        product_count = (
+            1 if self.options["scenario"] == "flash-sale" else self.options["products"]
+        )
+        product_list = [
+            Product.objects.create(
+                category=category,
+                name=f"{prefix}-{i}",
+                price=1000 * (i + 1),
+                status=Product.Status.ACTIVE,
+            )
+            for i in range(product_count)
+        ]
+        user_list = [
+            User.objects.create_user(
+                username=f"{prefix}-{i}", email=f"{prefix}-{i}@example.com"
+            )
+            for i in range(self.options["users"])
+        ]
+        return user_list, product_list
+
+    def teardown_data(self, user_list, product_list):
+        order_qs = Order.objects.filter(user__in=user_list)
+        date_list = sorted(
+            {
+                timezone.localdate(created_at)
+                for created_at in order_qs.values_list("created_at", flat=True)
+            }
+        )
+        order_qs.delete()
+        User.objects.filter(pk__in=[user.pk for user in user_list]).delete()
+        Product.objects.filter(pk__in=[product.pk for product in product_list]).delete()
+        # 테스트 주문이 반영된 날짜의 일별 매출 집계를 남은 주문으로 다시 만듭니다.
+        if date_list:
+            rollups.rebuild(date_list=date_list)
+
+    def make_client(self, user) -> Client:
+        client = Client(HTTP_HOST=self.options["host"], raise_request_exception=True)
+        client.force_login(user)
+        return client
+
+    def add_to_cart(self, user, product) -> int:
+        client = self.make_client(user)
+        try:
+            url = reverse("add_to_cart", args=[product.pk])
+            response = self.stats.request(client, "add_to_cart", "post", url)
+            return 1 if response is not None else 0
+        finally:
+            connections.close_all()
+
+    def run_user(self, user, product_list):
+        try:
+            client = self.make_client(user)
+            for _ in range(self.options["iterations"]):
+                product = random.choice(product_list)
+                # 동시에 여러 번 누른 장바구니 담기 중 성공 응답을 받은 횟수만큼 수량이 늘어야 합니다.
+                with ThreadPoolExecutor(max_workers=self.options["clicks"]) as executor:
+                    added = sum(
+                        executor.map(
+                            lambda _: self.add_to_cart(user, product),
+                            range(self.options["clicks"]),
+                        )
+                    )
+                if added == 0:
+                    continue
+                self.checkout(client, user, added)
+        finally:
+            connections.close_all()
+
+    def checkout(self, client: Client, user, added: int):
+        response = self.stats.request(client, "order_new", "get", reverse("order_new"))
+        if response is None:
+            return
+        order = Order.objects.filter(user=user).order_by("-pk").first()
+        ordered_quantity = sum(
+            order.orderedproduct_set.values_list("quantity", flat=True)
+        )
+        if ordered_quantity != added:
+            self.add_lost_update("add_to_cart")
+
+        response = self.stats.request(
+            client, "order_pay", "get", reverse("order_pay", args=[order.pk])
+        )
+        if response is None:
+            return
+        payment = OrderPayment.objects.filter(order=order).order_by("-pk").first()
+
+        check_url = reverse("order_check", args=[order.pk, payment.pk])
+        response = self.stats.request(client, "order_check", "get", check_url)
+        if response is None:
+            return
+        order.refresh_from_db()
+        if order.status != Order.Status.PAID:
+            self.add_lost_update("order_check")
+        with self.count_lock:
+            self.checkout_count += 1
+
+    def add_lost_update(self, endpoint: str):
+        with self.count_lock:
+            self.lost_update_dict[endpoint] += 1
+
+    def report(self, elapsed: float):
+        self.stdout.write(
+            f"scenario={self.options['scenario']} users={self.options['users']} "
+            f"iterations={self.options['iterations']} clicks={self.options['clicks']} "
+            f"elapsed={elapsed:.2f}s"
+        )
+        self.stdout.write(
+            f"{'endpoint':<12} {'count':>6} {'req/s':>8} {'p50 ms':>8} {'p99 ms':>8} "
+            f"{'errors':>6} {'locked':>6} {'lost':>6}"
+        )
+        for endpoint in ("add_to_cart", "order_new", "order_pay", "order_check"):
+            duration_list = sorted(self.stats.duration_dict[endpoint])
+            self.stdout.write(
+                f"{endpoint:<12} {len(duration_list):>6} "
+                f"{len(duration_list) / elapsed:>8.1f} "
+                f"{percentile(duration_list, 0.5) * 1000:>8.1f} "
+                f"{percentile(duration_list, 0.99) * 1000:>8.1f} "
+                f"{self.stats.error_dict[endpoint]:>6} "
+                f"{self.stats.lock_error_dict[endpoint]:>6} "
+                f"{self.lost_update_dict[endpoint]:>6}"
+            )
+        for endpoint, counter in self.stats.exception_dict.items():
+            self.stdout.write(
+                self.style.ERROR(
+                    f"{endpoint} exceptions: "
+                    + ", ".join(
+                        f"{name}={count}" for name, count in counter.most_common()
+                    )
+                )
+            )
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"completed checkouts: {self.checkout_count} "
+                f"({self.checkout_count / elapsed:.1f}/s)"
+            )
+        )
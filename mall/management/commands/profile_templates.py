@@ -0,0 +1,33 @@
+from django.core.management import BaseCommand
+from django.test import Client
+from accounts.models import User
+from mall.templating import profile
+
+
+class Command(BaseCommand):
+    help = "지정 URL 을 렌더링하면서 템플릿별/태그별 렌더링 시간을 측정합니다."
+
+    def add_arguments(self, parser):
+        parser.add_argument("url", nargs="+")
+        parser.add_argument("--username", help="로그인이 필요한 페이지를 측정할 사용자")
+        parser.add_argument(
+            "--host", default="localhost", help="ALLOWED_HOSTS 에 포함된 호스트"
+        )
+        parser.add_argument("--repeat", type=int, default=10)
+        parser.add_argument("--limit", type=int, default=20)
+
+    def handle(self, *args, **options):
+        client = Client(HTTP_HOST=options["host"])
+        if options["username"]:
+            client.force_login(User.objects.get(username=options["username"]))
+
+        for url in options["url"]:
+            # 첫 요청은 템플릿 컴파일 비용이 포함되므로 측정에서 제외합니다.
+            client.get(url)
+            with profile() as result:
+                for _ in range(options["repeat"]):
+                    response = client.get(url)
+            self.stdout.write(
+                f"{url} ({response.status_code}, {options['repeat']} 회 합계)"
+            )
+            self.stdout.write(result.report(limit=options["limit"]))
@@ -0,0 +1,163 @@
+import contextvars
+import logging
+from collections import Counter
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import List
+from uuid import UUID
+
+from django.core.management import BaseCommand, CommandError
+from django.db import connections
+from django.http import Http404
+
+from mall.models import OrderPayment, PaymentEvent
+from mall.portone import PortoneUnavailable
+from mall.tenants import tenant_registry, use_tenant
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    help = (
+        "결제 이벤트 로그를 지정한 offset(이벤트 번호)부터 읽어 결제별로 다시 처리합니다. "
+        "저장된 결제내역 조회 응답으로 충분하면 PortOne 을 다시 호출하지 않습니다."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--offset", type=int, default=1, help="시작 이벤트 번호(포함)")
+        parser.add_argument("--until", type=int, help="마지막 이벤트 번호(포함)")
+        parser.add_argument("--batch-size", type=int, default=200)
+        parser.add_argument("--workers", type=int, default=4, help="동시에 처리할 배치 수")
+        parser.add_argument(
+            "--offline",
+            action="store_true",
+            help="저장된 응답이 없거나 오래된 결제는 PortOne 을 호출하지 않고 건너뜁니다.",
+        )
+        parser.add_argument("--tenant", default="", help="테넌트 (기본: 기본 테넌트)")
+        parser.add_argument(
+            "--dry-run", action="store_true", help="처리 방법별 결제 수만 출력합니다."
+        )
+
+    def handle(self, *args, **options):
+        if options["batch_size"] < 1 or options["workers"] < 1:
+            raise CommandError("--batch-size 와 --workers 는 1 이상이어야 합니다.")
+        try:
+            tenant = tenant_registry.get(options["tenant"])
+        except KeyError:
+            raise CommandError(f"등록되지 않은 테넌트입니다. ({options['tenant']})")
+
+        self.options = options
+        with use_tenant(tenant):
+            stats, last_pk = self.replay()
+
+        self.stdout.write(
+            f"저장된 응답으로 처리: {stats['payload']}건, PortOne 조회 후 처리: {stats['portone']}건, "
+            f"건너뜀: {stats['skipped']}건, 결제 없음: {stats['missing']}건, 실패: {stats['failed']}건"
+        )
+        if last_pk is not None:
+            self.stdout.write(f"다음 offset: {last_pk + 1}")
+
+    def get_event_qs(self):
+        qs = PaymentEvent.objects.all()
+        if self.options["until"] is not None:
+            qs = qs.filter(pk__lte=self.options["until"])
+        return qs
+
+    def iter_batches(self):
+        """
+        (마지막 이벤트 번호, 결제 목록)을 배치 단위로 반환합니다.
+        결제별 최종 상태만 다시 반영하면 되므로, 같은 결제는 범위 안의 마지막 이벤트가 있는 배치에서만
+        한 번 반환합니다. 이전 배치의 결제 목록을 기억하지 않으므로 범위가 커도 메모리 사용량이 일정합니다.
+        """
+        qs = self.get_event_qs().order_by("pk")
+        last_pk = self.options["offset"] - 1
+        while True:
+            row_list = list(
+                qs.filter(pk__gt=last_pk).values_list("pk", "merchant_uid")[
+                    : self.options["batch_size"]
+                ]
+            )
+            if not row_list:
+                return
+            last_pk = row_list[-1][0]
+            merchant_uid_list = list(
+                dict.fromkeys(merchant_uid for _, merchant_uid in row_list)
+            )
+            later_set = set(
+                self.get_event_qs()
+                .filter(pk__gt=last_pk, merchant_uid__in=merchant_uid_list)
+                .values_list("merchant_uid", flat=True)
+                .distinct()
+            )
+            yield last_pk, [
+                merchant_uid
+                for merchant_uid in merchant_uid_list
+                if merchant_uid not in later_set
+            ]
+
+    def replay(self):
+        stats = Counter()
+        last_pk = None
+        with ThreadPoolExecutor(max_workers=self.options["workers"]) as executor:
+            pending_set = set()
+            for last_pk, merchant_uid_list in self.iter_batches():
+                if not merchant_uid_list:
+                    continue
+                if len(pending_set) >= self.options["workers"] * 2:
+                    done_set, pending_set = wait(
+                        pending_set, return_when=FIRST_COMPLETED
+                    )
+                    for future in done_set:
+                        stats.update(future.result())
+                # 작업 스레드에서도 같은 테넌트(DB/캐시/PortOne 인증정보)를 사용하도록 context 를 복사합니다.
+                pending_set.add(
+                    executor.submit(
+                        contextvars.copy_context().run,
+                        self.replay_batch,
+                        merchant_uid_list,
+                    )
+                )
+            for future in pending_set:
+                stats.update(future.result())
+        return stats, last_pk
+
+    def replay_batch(self, merchant_uid_list: List[str]) -> Counter:
+        stats = Counter()
+        try:
+            uid_list = []
+            for merchant_uid in merchant_uid_list:
+                try:
+                    uid_list.append(UUID(merchant_uid))
+                except ValueError:
+                    pass
+            payment_dict = {
+                payment.merchant_uid: payment
+                for payment in OrderPayment.objects.filter(
+                    uid__in=uid_list
+                ).select_related("order")
+            }
+            response_dict = PaymentEvent.get_replay_response_dict(list(payment_dict))
+
+            for merchant_uid in merchant_uid_list:
+                payment = payment_dict.get(merchant_uid)
+                if payment is None:
+                    stats["missing"] += 1
+                    continue
+                response = response_dict[merchant_uid]
+                kind = "portone" if response is None else "payload"
+                if response is None and self.options["offline"]:
+                    stats["skipped"] += 1
+                    continue
+                if self.options["dry_run"]:
+                    stats[kind] += 1
+                    continue
+                try:
+                    payment.update(response=response)
+                except (Http404, PortoneUnavailable) as e:
+                    logger.warning("결제 이벤트 재처리 실패: %s (%s)", merchant_uid, e)
+                    stats["failed"] += 1
+                else:
+                    stats[kind] += 1
+        finally:
+            # 작업 스레드의 DB 연결은 스레드가 끝나도 닫히지 않으므로 직접 닫습니다.
+            connections.close_all()
+        return stats
@@ -0,0 +1,54 @@
+# Generated by Django 5.1 on 2026-10-19 13:20
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("mall", "0008_alter_order_status_alter_orderpayment_pay_status"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ProductChangeLog",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "status",
+                    models.CharField(
+                        choices=[
+                            ("a", "정상"),
+                            ("s", "품절"),
+                            ("o", "단종"),
+                            ("i", "비활성화"),
+                        ],
+                        max_length=1,
+                    ),
+                ),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                (
+                    "product",
+                    models.ForeignKey(
+                        db_constraint=False,
+                        on_delete=django.db.models.deletion.DO_NOTHING,
+                        related_name="+",
+                        to="mall.product",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "상품 변경 기록",
+                "verbose_name_plural": "상품 변경 기록",
+            },
+        ),
+    ]
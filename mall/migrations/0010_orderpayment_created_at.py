@@ -0,0 +1,24 @@
+# Generated by Django 5.1 on 2026-10-19 13:45
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("mall", "0009_productchangelog"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="orderpayment",
+            name="created_at",
+            field=models.DateTimeField(
+                auto_now_add=True,
+                db_index=True,
+                default=django.utils.timezone.now,
+            ),
+            preserve_default=False,
+        ),
+    ]
@@ -0,0 +1,44 @@
+# Generated by Django 5.1 on 2026-10-19 13:38
+
+import mall.storage
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("mall", "0010_orderpayment_created_at"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="StoredFile",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("name", models.CharField(max_length=255, unique=True)),
+                ("size", models.PositiveBigIntegerField()),
+                ("ref_count", models.PositiveIntegerField(default=0)),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                "verbose_name": "저장 파일",
+                "verbose_name_plural": "저장 파일",
+            },
+        ),
+        migrations.AlterField(
+            model_name="product",
+            name="photo",
+            field=models.ImageField(
+                storage=mall.storage.get_product_photo_storage,
+                upload_to="mall/product/photo",
+            ),
+        ),
+    ]
@@ -0,0 +1,63 @@
+# Generated by Django 5.1 on 2026-10-19 13:46
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("mall", "0011_storedfile_alter_product_photo"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="PaymentEvent",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "kind",
+                    models.CharField(
+                        choices=[("webhook", "웹훅"), ("response", "결제내역 조회")],
+                        max_length=10,
+                        verbose_name="종류",
+                    ),
+                ),
+                (
+                    "merchant_uid",
+                    models.CharField(
+                        db_index=True, max_length=40, verbose_name="쇼핑몰 결제식별자"
+                    ),
+                ),
+                (
+                    "imp_uid",
+                    models.CharField(
+                        blank=True, max_length=40, verbose_name="포트원 결제식별자"
+                    ),
+                ),
+                (
+                    "status",
+                    models.CharField(blank=True, max_length=20, verbose_name="결제상태"),
+                ),
+                (
+                    "amount",
+                    models.PositiveIntegerField(
+                        blank=True, null=True, verbose_name="결제금액"
+                    ),
+                ),
+                ("compressed_payload", models.BinaryField(verbose_name="원본(zlib)")),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                "verbose_name": "결제 이벤트",
+                "verbose_name_plural": "결제 이벤트",
+            },
+        ),
+    ]
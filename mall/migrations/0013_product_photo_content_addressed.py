@@ -0,0 +1,22 @@
+# Generated by Django 5.1 on 2026-10-19 14:06
+
+import mall.storage
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("mall", "0012_paymentevent"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="product",
+            name="photo",
+            field=mall.storage.ContentAddressedImageField(
+                storage=mall.storage.get_product_photo_storage,
+                upload_to="mall/product/photo",
+            ),
+        ),
+    ]
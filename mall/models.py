@@ -1,15 +1,21 @@
-from typing import List
-from django.db import models
+import json
+import zlib
+from datetime import timedelta
+from operator import attrgetter
+from typing import Dict, List, Optional
+from django.db import models, router, transaction
 from django.core.validators import MinValueValidator
-from django.db.models import UniqueConstraint, QuerySet
+from django.db.models import UniqueConstraint, QuerySet, F, Count, OuterRef, Subquery
 from django.conf import settings
 from uuid import uuid4
 
 from django.http import Http404
 from django.urls import reverse
 from accounts.models import User
-from iamport import Iamport
+from mall.signals import order_status_bulk_changed, order_status_changed
+from mall.storage import ContentAddressedImageField, get_product_photo_storage
 from django.utils.functional import cached_property
+from django.utils import timezone
 import logging
 
 
@@ -46,18 +52,123 @@ class Product(models.Model):
         choices=Status.choices,
         default=Status.INACTIVE,
     )
-    photo = models.ImageField(upload_to="mall/product/photo/%Y/%m/%d")
+    photo = ContentAddressedImageField(
+        upload_to="mall/product/photo", storage=get_product_photo_storage
+    )
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
     def __str__(self):
         return f"<{self.pk}> {self.name}"
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # 사진이 교체되었는지 저장할 때 다시 조회하지 않고 비교할 수 있도록 기억합니다. (mall.signals)
+        if "photo" in instance.__dict__:
+            instance._loaded_photo_name = instance.__dict__["photo"]
+        return instance
+
+    @classmethod
+    def get_active_qs(cls, query: str = "") -> QuerySet["Product"]:
+        qs = cls.objects.filter(status=cls.Status.ACTIVE).select_related("category")
+        if query:
+            qs = qs.filter(name__icontains=query)
+        return qs
+
+    @classmethod
+    def change_status(
+        cls, product_qs: QuerySet["Product"], status: str, chunk_size: int = 500
+    ) -> int:
+        """
+        상품 상태를 chunk 단위로 일괄 변경하고, 실제로 변경된 상품마다 ProductChangeLog를 남깁니다.
+        queryset.update()는 시그널과 auto_now를 우회하므로 updated_at도 함께 갱신합니다.
+        """
+        pk_list = list(
+            product_qs.exclude(status=status).order_by().values_list("pk", flat=True)
+        )
+        count = 0
+        for i in range(0, len(pk_list), chunk_size):
+            chunk = pk_list[i : i + chunk_size]
+            with transaction.atomic(using=router.db_for_write(cls)):
+                # 목록 조회 이후에 다른 곳에서 상태가 바뀌었을 수 있으므로, 트랜잭션 안에서 잠그고 다시 확인해
+                # 실제로 변경하는 상품만 UPDATE 하고 기록합니다.
+                changed_pk_list = list(
+                    cls.objects.select_for_update()
+                    .filter(pk__in=chunk)
+                    .exclude(status=status)
+                    .values_list("pk", flat=True)
+                )
+                if not changed_pk_list:
+                    continue
+                cls.objects.filter(pk__in=changed_pk_list).exclude(
+                    status=status
+                ).update(status=status, updated_at=timezone.now())
+                ProductChangeLog.objects.bulk_create(
+                    ProductChangeLog(product_id=pk, status=status)
+                    for pk in changed_pk_list
+                )
+            count += len(changed_pk_list)
+        return count
+
     class Meta:
         verbose_name = verbose_name_plural = "상품"
         ordering = ["-pk"]
 
 
+class ProductChangeLog(models.Model):
+    """
+    상품 변경 피드. pk가 순번(sequence)이며, 캐시 무효화/검색 색인 등의 소비자는
+    마지막으로 처리한 순번 이후의 항목만 poll 합니다.
+
+    autoincrement 순번은 커밋 순서와 다를 수 있습니다. 앞 순번의 트랜잭션이 늦게 커밋되면 순번 사이에
+    빈 자리가 생기므로, poll 은 빈 자리 앞까지만 반환하고 다음 poll 에서 다시 확인합니다.
+    롤백으로 생긴 빈 자리는 채워지지 않으므로, 그 뒤의 항목이 PRODUCT_CHANGE_FEED_GAP_TIMEOUT 초보다
+    오래되었으면 건너뜁니다.
+    """
+
+    product = models.ForeignKey(
+        Product,
+        on_delete=models.DO_NOTHING,
+        db_constraint=False,
+        related_name="+",
+    )
+    status = models.CharField(max_length=1, choices=Product.Status.choices)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    @classmethod
+    def poll(cls, after_seq: int = 0, limit: int = 1000) -> List["ProductChangeLog"]:
+        settled_before = timezone.now() - timedelta(
+            seconds=settings.PRODUCT_CHANGE_FEED_GAP_TIMEOUT
+        )
+        log_list = []
+        next_seq = after_seq + 1
+        for log in cls.objects.filter(pk__gt=after_seq).order_by("pk")[:limit]:
+            if log.pk != next_seq and log.created_at > settled_before:
+                break
+            log_list.append(log)
+            next_seq = log.pk + 1
+        return log_list
+
+    class Meta:
+        verbose_name = verbose_name_plural = "상품 변경 기록"
+
+
+class StoredFile(models.Model):
+    """mall.storage.ContentAddressedStorage 에 저장된 파일별 참조 수"""
+
+    name = models.CharField(max_length=255, unique=True)
+    size = models.PositiveBigIntegerField()
+    ref_count = models.PositiveIntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return self.name
+
+    class Meta:
+        verbose_name = verbose_name_plural = "저장 파일"
+
+
 class CartProduct(models.Model):
     user = models.ForeignKey(
         "accounts.User",
@@ -80,7 +191,34 @@ class CartProduct(models.Model):
 
     @property
     def amount(self):
-        return self.product.price * self.quantity
+        snapshot = getattr(self, "product_snapshot", None)
+        price = self.product.price if snapshot is None else snapshot.price
+        return price * self.quantity
+
+    @classmethod
+    def list_with_snapshot(
+        cls, cart_product_qs: QuerySet["CartProduct"]
+    ) -> List["CartProduct"]:
+        """
+        장바구니 상품 목록에 상품 스냅샷을 1회의 일괄 조회로 붙여서 반환합니다.
+        두 조회 사이에 삭제된 상품은 스냅샷이 없으므로 목록에서 제외합니다.
+        """
+        from mall.snapshots import product_snapshot_store
+
+        cart_product_list = list(
+            cart_product_qs.annotate(product_updated_at=F("product__updated_at"))
+        )
+        snapshot_dict = product_snapshot_store.get_many(
+            {cp.product_id: cp.product_updated_at for cp in cart_product_list}
+        )
+        result_list = []
+        for cart_product in cart_product_list:
+            snapshot = snapshot_dict.get(cart_product.product_id)
+            if snapshot is None:
+                continue
+            cart_product.product_snapshot = snapshot
+            result_list.append(cart_product)
+        return result_list
 
     class Meta:
         verbose_name_plural = verbose_name = "장바구니 상품"
@@ -102,6 +240,24 @@ class Order(models.Model):
         DELIVERED = "delivered", "배송완료"
         CANCELLED = "cancelled", "주문취소"
 
+    # 현재 상태 -> 전이할 수 있는 상태 목록
+    TRANSITION_DICT = {
+        Status.REQUESTED: {Status.FAILED_PAYMENT, Status.PAID, Status.CANCELLED},
+        Status.FAILED_PAYMENT: {Status.PAID, Status.CANCELLED},
+        Status.PAID: {Status.PREPARED_PRODUCT, Status.CANCELLED},
+        Status.PREPARED_PRODUCT: {Status.SHIPPED, Status.CANCELLED},
+        Status.SHIPPED: {Status.DELIVERED},
+        Status.DELIVERED: set(),
+        Status.CANCELLED: set(),
+    }
+    # 결제가 완료된 이후의 상태
+    PAID_STATUS_SET = {
+        Status.PAID,
+        Status.PREPARED_PRODUCT,
+        Status.SHIPPED,
+        Status.DELIVERED,
+    }
+
     uid = models.UUIDField(default=uuid4, editable=False, unique=True)
     user = models.ForeignKey(
         "accounts.User",
@@ -126,13 +282,38 @@ class Order(models.Model):
 
     @property
     def name(self):
-        first_product = self.product_set.first()
-        if first_product is None:
+        if hasattr(self, "first_product_name"):
+            # annotate_name() 으로 조회한 경우에는 추가 쿼리가 없습니다.
+            first_product_name = self.first_product_name
+            size = self.product_count
+        else:
+            first_product = self.product_set.first()
+            first_product_name = first_product and first_product.name
+            size = self.product_set.all().count()
+
+        if first_product_name is None:
             return "등록된 상품이 없습니다."
-        size = self.product_set.all().count()
         if size < 2:
-            return first_product.name
-        return f"{first_product.name} 외 {size - 1}건"
+            return first_product_name
+        return f"{first_product_name} 외 {size - 1}건"
+
+    @classmethod
+    def annotate_name(cls, order_qs: QuerySet["Order"]) -> QuerySet["Order"]:
+        """목록에서 주문마다 name 을 계산하는 2번의 쿼리를 서브쿼리로 대신합니다."""
+        return order_qs.annotate(
+            first_product_name=Subquery(
+                Product.objects.filter(orderedproduct__order=OuterRef("pk"))
+                .order_by("-pk")
+                .values("name")[:1]
+            ),
+            product_count=Subquery(
+                OrderedProduct.objects.filter(order=OuterRef("pk"))
+                .order_by()
+                .values("order")
+                .annotate(count=Count("pk"))
+                .values("count")
+            ),
+        )
 
     def get_absolute_url(self):
         return reverse("order_detail", args=[self.pk])
@@ -140,6 +321,93 @@ class Order(models.Model):
     def can_pay(self) -> bool:
         return self.status in (self.Status.REQUESTED, self.Status.FAILED_PAYMENT)
 
+    @classmethod
+    def get_source_status_list(cls, status: str) -> List[str]:
+        return [
+            source_status
+            for source_status, status_set in cls.TRANSITION_DICT.items()
+            if status in status_set
+        ]
+
+    def can_transition(self, status: str) -> bool:
+        return status in self.TRANSITION_DICT.get(self.status, ())
+
+    def transition(self, status: str) -> bool:
+        """
+        허용된 전이일 때만 상태를 변경합니다. 조회 없이 현재 인스턴스의 status 를 기대값으로
+        UPDATE ... WHERE status = <기대값> 1회로 처리하므로, 그 사이 다른 요청(웹훅 등)이 상태를
+        바꿨다면 덮어쓰지 않고 False 를 반환합니다.
+        queryset.update()는 auto_now를 우회하므로 ETag 에 사용하는 updated_at도 함께 갱신합니다.
+        """
+        old_status = self.status
+        if not self.can_transition(status):
+            return False
+
+        updated_at = timezone.now()
+        # 상태 변경과 매출 집계(order_status_changed 수신)가 함께 커밋되도록 합니다.
+        with transaction.atomic(using=router.db_for_write(Order)):
+            is_updated = Order.objects.filter(pk=self.pk, status=old_status).update(
+                status=status, updated_at=updated_at
+            )
+            if not is_updated:
+                return False
+
+            order_status_changed.send(
+                sender=self.__class__,
+                order=self,
+                old_status=old_status,
+                new_status=status,
+            )
+        self.status = status
+        self.updated_at = updated_at
+        return True
+
+    @classmethod
+    def bulk_transition(
+        cls, order_qs: QuerySet["Order"], status: str, chunk_size: int = 500
+    ) -> int:
+        """
+        창고 작업(상품준비/배송/배송완료)용 일괄 전이. chunk 마다 트랜잭션 안에서
+        전이 가능한 주문을 잠금 조회한 뒤 1회의 UPDATE 로 변경하고, 변경된 주문 목록으로
+        order_status_bulk_changed 시그널을 1회 보냅니다. 변경된 주문 수를 반환합니다.
+        """
+        source_status_list = cls.get_source_status_list(status)
+        pk_list = list(
+            order_qs.filter(status__in=source_status_list)
+            .order_by()
+            .values_list("pk", flat=True)
+        )
+
+        count = 0
+        for i in range(0, len(pk_list), chunk_size):
+            chunk = pk_list[i : i + chunk_size]
+            with transaction.atomic(using=router.db_for_write(cls)):
+                order_list = list(
+                    cls.objects.select_for_update()
+                    .filter(pk__in=chunk, status__in=source_status_list)
+                    .only("pk", "status", "total_amount", "created_at")
+                    .order_by()
+                )
+                if not order_list:
+                    continue
+
+                updated_at = timezone.now()
+                cls.objects.filter(
+                    pk__in=[order.pk for order in order_list],
+                    status__in=source_status_list,
+                ).update(status=status, updated_at=updated_at)
+
+                transition_list = []
+                for order in order_list:
+                    transition_list.append((order, order.status, status))
+                    order.status = status
+                    order.updated_at = updated_at
+                order_status_bulk_changed.send(
+                    sender=cls, transition_list=transition_list
+                )
+            count += len(order_list)
+        return count
+
     def cancel(self, reason=""):
         for payment in self.orderpayment_set.all():
             payment.cancel(reason=reason)
@@ -152,25 +420,42 @@ class Order(models.Model):
     def create_from_cart(
         cls, user: User, cart_product_qs: QuerySet[CartProduct]
     ) -> "Order":
-        cart_product_list: List[CartProduct] = list(cart_product_qs)
+        cart_product_list = CartProduct.list_with_snapshot(cart_product_qs)
         total_amount = sum(cart_product.amount for cart_product in cart_product_list)
-        order = cls.objects.create(
-            user=user,
-            total_amount=total_amount,
-        )
 
-        ordered_product_list = []
-        for cart_product in cart_product_list:
-            product = cart_product.product
-            ordered_product = OrderedProduct(
+        # 주문/주문상품 INSERT 와 매출 집계(order_status_changed 수신)가 함께 커밋되도록 합니다.
+        with transaction.atomic(using=router.db_for_write(cls)):
+            order = cls.objects.create(
+                user=user,
+                total_amount=total_amount,
+            )
+
+            ordered_product_list = []
+            for cart_product in cart_product_list:
+                snapshot = cart_product.product_snapshot
+                ordered_product = OrderedProduct(
+                    order=order,
+                    product_id=snapshot.pk,
+                    name=snapshot.name,
+                    price=snapshot.price,
+                    quantity=cart_product.quantity,
+                )
+                ordered_product_list.append(ordered_product)
+            OrderedProduct.objects.bulk_create(ordered_product_list)
+
+            order_status_changed.send(
+                sender=cls,
                 order=order,
-                product=product,
-                name=product.name,
-                price=product.price,
-                quantity=cart_product.quantity,
+                old_status=None,
+                new_status=order.status,
             )
-            ordered_product_list.append(ordered_product)
-        OrderedProduct.objects.bulk_create(ordered_product_list)
+
+        # annotate_name() 과 같은 값을 채워 두어, 바로 이어지는 결제 생성에서 name 조회 쿼리가 없도록 합니다.
+        first_ordered_product = max(
+            ordered_product_list, key=attrgetter("product_id"), default=None
+        )
+        order.first_product_name = first_ordered_product and first_ordered_product.name
+        order.product_count = len(ordered_product_list)
         return order
 
     class Meta:
@@ -220,17 +505,22 @@ class AbstractPortonePayment(models.Model):
 
     @cached_property
     def api(self):
-        return Iamport(
-            imp_key=settings.PORTONE_API_KEY, imp_secret=settings.PORTONE_API_SECRET
-        )
+        # iamport/requests 는 실제로 PortOne 을 호출할 때만 불러옵니다.
+        from mall.portone_client import get_portone_client
+
+        return get_portone_client()
 
     def update(self, response=None):
+        from iamport import Iamport
+
         if response is None:
             try:
                 self.meta = self.api.find(merchant_uid=self.merchant_uid)
             except (Iamport.ResponseError, Iamport.HttpError) as e:
                 logger.error(str(e), exc_info=e)
                 raise Http404("포트원에서 결제내역을 찾을 수 없습니다.")
+            # 웹훅 재처리 시에 PortOne 을 다시 호출하지 않도록 조회 결과를 남깁니다.
+            PaymentEvent.record(PaymentEvent.Kind.RESPONSE, self.meta)
         else:
             self.meta = response
 
@@ -240,6 +530,8 @@ class AbstractPortonePayment(models.Model):
         self.save()
 
     def cancel(self, reason=""):
+        from iamport import Iamport
+
         try:
             response = self.api.cancel(reason, merchant_uid=self.merchant_uid)
         except Iamport.ResponseError:
@@ -251,20 +543,68 @@ class AbstractPortonePayment(models.Model):
 
 class OrderPayment(AbstractPortonePayment):
     order = models.ForeignKey(Order, on_delete=models.CASCADE, db_constraint=False)
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True)
 
     def update(self, response=None):
         super().update(response)
         if self.is_paid_ok:
-            self.order.status = Order.Status.PAID
-            self.order.save()
-            # 다수의 결제시도
-            self.order.orderpayment_set.exclude(pk=self.pk).delete()
+            if self.transition_order(Order.Status.PAID):
+                # 다수의 결제시도 중 결제되지 않은 나머지 시도를 정리합니다.
+                self.order.orderpayment_set.exclude(pk=self.pk).filter(
+                    is_paid_ok=False
+                ).delete()
+            elif self.order.status not in Order.PAID_STATUS_SET:
+                # 취소된 주문 등에 결제가 완료되었습니다. 환불이 필요합니다.
+                logger.error(
+                    "주문을 결제완료로 변경하지 못했습니다. (order=%s, status=%s, payment=%s)",
+                    self.order.pk,
+                    self.order.status,
+                    self.pk,
+                )
+            elif (
+                self.order.orderpayment_set.exclude(pk=self.pk)
+                .filter(is_paid_ok=True)
+                .exists()
+            ):
+                logger.error(
+                    "이미 결제완료된 주문에 중복 결제되었습니다. (order=%s, payment=%s)",
+                    self.order.pk,
+                    self.pk,
+                )
         elif self.pay_status == self.PayStatus.FAILED:
-            self.order.status = Order.Status.FAILED_PAYMENT
-            self.order.save()
+            self.transition_order(Order.Status.FAILED_PAYMENT)
         elif self.pay_status == self.PayStatus.CANCELLED:
-            self.order.status = Order.Status.CANCELLED
-            self.order.save()
+            self.transition_order(Order.Status.CANCELLED)
+
+    def transition_order(self, status: str) -> bool:
+        """
+        주문 상태를 변경합니다. 메모리의 주문 상태가 오래되어 실패했다면 DB 의 상태를 다시 읽어 1회 재시도합니다.
+        실패하면 self.order.status 는 DB 의 현재 상태입니다.
+        """
+        if self.order.transition(status):
+            return True
+        self.order.refresh_from_db(fields=["status", "updated_at"])
+        return self.order.transition(status)
+
+    @classmethod
+    def get_or_create_by_order(cls, order: Order) -> "OrderPayment":
+        """결제 페이지를 새로고침할 때마다 결제 row가 생성되지 않도록, 유효한 READY 결제를 재사용합니다."""
+        valid_after = timezone.now() - timedelta(
+            seconds=settings.ORDER_PAYMENT_READY_TIMEOUT
+        )
+        payment = (
+            cls.objects.filter(
+                order=order,
+                pay_status=cls.PayStatus.READY,
+                desired_amount=order.total_amount,
+                created_at__gte=valid_after,
+            )
+            .order_by("-pk")
+            .first()
+        )
+        if payment is None:
+            payment = cls.create_by_order(order)
+        return payment
 
     @classmethod
     def create_by_order(cls, order: Order) -> "OrderPayment":
@@ -276,3 +616,104 @@ class OrderPayment(AbstractPortonePayment):
             buyer_name=user.get_full_name() or user.username,
             buyer_email=user.email,
         )
+
+
+class PaymentEvent(models.Model):
+    """
+    포트원 웹훅 요청과 결제내역 조회 응답을 받은 순서대로 쌓는 추가 전용(append-only) 로그.
+
+    조회용 컬럼만 두고 원본은 zlib 으로 압축해 저장합니다.
+    웹훅 처리가 잘못 배포되었을 때 replay_payment_events 명령으로 저장된 응답을 이용해 다시 처리합니다.
+    """
+
+    class Kind(models.TextChoices):
+        WEBHOOK = "webhook", "웹훅"
+        RESPONSE = "response", "결제내역 조회"
+
+    kind = models.CharField("종류", max_length=10, choices=Kind.choices)
+    merchant_uid = models.CharField("쇼핑몰 결제식별자", max_length=40, db_index=True)
+    imp_uid = models.CharField("포트원 결제식별자", max_length=40, blank=True)
+    status = models.CharField("결제상태", max_length=20, blank=True)
+    amount = models.PositiveIntegerField("결제금액", null=True, blank=True)
+    compressed_payload = models.BinaryField("원본(zlib)")
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    # amount 컬럼(PositiveIntegerField)에 저장할 수 있는 최댓값
+    max_amount = 2**31 - 1
+
+    def __str__(self):
+        return (
+            f"<{self.pk}> {self.get_kind_display()} {self.merchant_uid} {self.status}"
+        )
+
+    @property
+    def payload(self) -> dict:
+        return json.loads(zlib.decompress(self.compressed_payload))
+
+    def save(self, *args, **kwargs):
+        if not self._state.adding:
+            raise ValueError("결제 이벤트는 수정할 수 없습니다.")
+        super().save(*args, **kwargs)
+
+    @classmethod
+    def get_lookup_value(cls, payload: dict, field_name: str) -> str:
+        # 웹훅 요청 본문은 검증 전의 값이므로 컬럼 길이에 맞게 자릅니다. 원본은 compressed_payload 에 남습니다.
+        value = payload.get(field_name) or ""
+        return str(value)[: cls._meta.get_field(field_name).max_length]
+
+    @classmethod
+    def record(cls, kind: str, payload: dict) -> "PaymentEvent":
+        data = json.dumps(payload, ensure_ascii=False, separators=(",", ":"))
+        amount = payload.get("amount")
+        return cls.objects.create(
+            kind=kind,
+            merchant_uid=cls.get_lookup_value(payload, "merchant_uid"),
+            imp_uid=cls.get_lookup_value(payload, "imp_uid"),
+            status=cls.get_lookup_value(payload, "status"),
+            amount=(
+                amount
+                if isinstance(amount, int) and 0 <= amount <= cls.max_amount
+                else None
+            ),
+            compressed_payload=zlib.compress(data.encode()),
+        )
+
+    @classmethod
+    def get_replay_response_dict(
+        cls, merchant_uid_list: List[str]
+    ) -> Dict[str, Optional[dict]]:
+        """
+        결제별로 다시 처리할 때 사용할 저장된 결제내역 조회 응답을 반환합니다.
+        저장된 응답이 없거나, 그 이후에 다른 상태의 웹훅을 받았다면 None 이므로 PortOne 을 다시 조회해야 합니다.
+        """
+        latest_dict = {}
+        for merchant_uid, kind, status, pk in (
+            cls.objects.filter(merchant_uid__in=merchant_uid_list)
+            .order_by("pk")
+            .values_list("merchant_uid", "kind", "status", "pk")
+        ):
+            latest_dict[(merchant_uid, kind)] = (status, pk)
+
+        response_pk_dict = {}
+        for merchant_uid in merchant_uid_list:
+            response = latest_dict.get((merchant_uid, cls.Kind.RESPONSE))
+            webhook = latest_dict.get((merchant_uid, cls.Kind.WEBHOOK))
+            if response is None:
+                continue
+            if webhook is None or response[1] > webhook[1] or response[0] == webhook[0]:
+                response_pk_dict[merchant_uid] = response[1]
+
+        event_dict = cls.objects.only("compressed_payload").in_bulk(
+            response_pk_dict.values()
+        )
+        return {
+            merchant_uid: (
+                event_dict[response_pk_dict[merchant_uid]].payload
+                if merchant_uid in response_pk_dict
+                else None
+            )
+            for merchant_uid in merchant_uid_list
+        }
+
+    class Meta:
+        verbose_name = verbose_name_plural = "결제 이벤트"
@@ -0,0 +1,63 @@
+from typing import Optional
+from django.core.paginator import Paginator
+from django.db import DatabaseError, connections
+from django.db.models import QuerySet
+from django.utils.functional import cached_property
+
+
+def get_estimated_count(queryset: QuerySet) -> Optional[int]:
+    """
+    테이블 전체의 추정 row 수를 통계 정보에서 읽습니다. 추정할 수 없으면 None 을 반환합니다.
+    PostgreSQL 은 pg_class.reltuples, SQLite 는 ANALYZE 결과(sqlite_stat1) 또는 MAX(rowid) 를 사용합니다.
+    """
+    connection = connections[queryset.db]
+    table_name = queryset.model._meta.db_table
+    try:
+        with connection.cursor() as cursor:
+            if connection.vendor == "postgresql":
+                cursor.execute(
+                    "SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass",
+                    [connection.ops.quote_name(table_name)],
+                )
+                row = cursor.fetchone()
+                # ANALYZE 가 한번도 수행되지 않은 테이블은 -1 입니다.
+                return row[0] if row and row[0] >= 0 else None
+            elif connection.vendor == "sqlite":
+                try:
+                    cursor.execute(
+                        "SELECT stat FROM sqlite_stat1 WHERE tbl = %s LIMIT 1",
+                        [table_name],
+                    )
+                    row = cursor.fetchone()
+                except DatabaseError:
+                    row = None
+                if row:
+                    return int(row[0].split()[0])
+                cursor.execute(
+                    f"SELECT MAX(rowid) FROM {connection.ops.quote_name(table_name)}"
+                )
+                return cursor.fetchone()[0] or 0
+    except DatabaseError:
+        return None
+    return None
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+    필터가 없는 큰 테이블은 COUNT(*) 대신 추정 row 수를 사용합니다.
+    필터가 있거나 추정치가 exact_count_threshold 이하이면 정확한 COUNT(*) 를 사용합니다.
+    """
+
+    exact_count_threshold = 10_000
+
+    @cached_property
+    def count(self):
+        queryset = self.object_list
+        if isinstance(queryset, QuerySet) and not queryset.query.where:
+            estimated_count = get_estimated_count(queryset)
+            if (
+                estimated_count is not None
+                and estimated_count > self.exact_count_threshold
+            ):
+                return estimated_count
+        return super().count
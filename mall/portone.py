@@ -0,0 +1,161 @@
+import threading
+import time
+from bisect import bisect_left
+from collections import defaultdict
+from typing import Dict, List, Tuple
+
+from django.conf import settings
+
+
+# 뷰에서 import 하는 모듈이므로 requests/iamport 를 불러오지 않습니다. (클라이언트는 mall.portone_client)
+
+
+class PortoneUnavailable(Exception):
+    """PortOne 호출이 시간초과/네트워크 오류로 실패했거나, circuit breaker 가 열려 호출하지 않았습니다."""
+
+
+class PortoneMetrics:
+    """
+    테넌트/엔드포인트별 PortOne 호출 소요시간 histogram 과 오류 횟수. 프로세스 단위로 집계합니다.
+    테넌트마다 PortOne 계정이 다르므로 tenant 레이블로 구분합니다.
+    """
+
+    buckets = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.bucket_counts: Dict[Tuple[str, str], List[int]] = defaultdict(
+                lambda: [0] * (len(self.buckets) + 1)
+            )
+            self.duration_sum: Dict[Tuple[str, str], float] = defaultdict(float)
+            self.error_counts: Dict[Tuple[str, str, str], int] = defaultdict(int)
+
+    def observe(self, tenant_slug: str, endpoint: str, duration: float):
+        key = (tenant_slug, endpoint)
+        with self._lock:
+            self.bucket_counts[key][bisect_left(self.buckets, duration)] += 1
+            self.duration_sum[key] += duration
+
+    def add_error(self, tenant_slug: str, endpoint: str, kind: str):
+        with self._lock:
+            self.error_counts[(tenant_slug, endpoint, kind)] += 1
+
+    def export(self, circuit_breakers: "CircuitBreakerRegistry") -> str:
+        """Prometheus text exposition format 으로 변환합니다."""
+        name = "portone_request_duration_seconds"
+        line_list = [
+            f"# HELP {name} PortOne API request latency.",
+            f"# TYPE {name} histogram",
+        ]
+        with self._lock:
+            for (tenant_slug, endpoint), count_list in sorted(
+                self.bucket_counts.items()
+            ):
+                labels = f'tenant="{tenant_slug}",endpoint="{endpoint}"'
+                cumulative = 0
+                for le, count in zip(self.buckets + ("+Inf",), count_list):
+                    cumulative += count
+                    line_list.append(
+                        f'{name}_bucket{{{labels},le="{le}"}} {cumulative}'
+                    )
+                line_list.append(
+                    f"{name}_sum{{{labels}}} {self.duration_sum[(tenant_slug, endpoint)]}"
+                )
+                line_list.append(f"{name}_count{{{labels}}} {cumulative}")
+
+            line_list += [
+                "# HELP portone_request_errors_total PortOne API request errors.",
+                "# TYPE portone_request_errors_total counter",
+            ]
+            for (tenant_slug, endpoint, kind), count in sorted(
+                self.error_counts.items()
+            ):
+                line_list.append(
+                    f"portone_request_errors_total"
+                    f'{{tenant="{tenant_slug}",endpoint="{endpoint}",kind="{kind}"}} {count}'
+                )
+
+        line_list += [
+            "# HELP portone_circuit_open 1 if the PortOne circuit breaker is open.",
+            "# TYPE portone_circuit_open gauge",
+        ]
+        for tenant_slug, circuit_breaker in circuit_breakers.items():
+            line_list.append(
+                f'portone_circuit_open{{tenant="{tenant_slug}"}} {int(circuit_breaker.is_open())}'
+            )
+        return "\n".join(line_list) + "\n"
+
+
+class CircuitBreaker:
+    """
+    연속 failure_threshold 회 실패하면 reset_timeout 초 동안 호출을 차단합니다(open).
+    reset_timeout 이 지나면 1회의 시험 호출을 허용하고(half-open), 성공하면 다시 닫습니다.
+    """
+
+    def __init__(self, failure_threshold: int, reset_timeout: float):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failure_count = 0
+        self.opened_at = None
+        self._lock = threading.Lock()
+
+    def is_open(self) -> bool:
+        return self.opened_at is not None
+
+    def allow_request(self) -> bool:
+        with self._lock:
+            if self.opened_at is None:
+                return True
+            if time.monotonic() - self.opened_at >= self.reset_timeout:
+                # half-open: 다음 시험 호출 결과가 나올 때까지 다른 호출은 계속 차단합니다.
+                self.opened_at = time.monotonic()
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self.failure_count = 0
+            self.opened_at = None
+
+    def record_failure(self):
+        with self._lock:
+            self.failure_count += 1
+            if self.failure_count >= self.failure_threshold:
+                self.opened_at = time.monotonic()
+
+
+class CircuitBreakerRegistry:
+    """
+    테넌트별 circuit breaker. 테넌트마다 PortOne 계정이 다르므로, 한 테넌트의 장애(인증 오류 등)로
+    다른 테넌트의 결제 확인까지 차단하지 않습니다.
+    """
+
+    def __init__(self, failure_threshold: int, reset_timeout: float):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._lock = threading.Lock()
+        self._circuit_breaker_dict: Dict[str, CircuitBreaker] = {}
+
+    def get(self, tenant_slug: str) -> CircuitBreaker:
+        with self._lock:
+            circuit_breaker = self._circuit_breaker_dict.get(tenant_slug)
+            if circuit_breaker is None:
+                circuit_breaker = self._circuit_breaker_dict[
+                    tenant_slug
+                ] = CircuitBreaker(self.failure_threshold, self.reset_timeout)
+            return circuit_breaker
+
+    def items(self) -> List[Tuple[str, CircuitBreaker]]:
+        with self._lock:
+            return sorted(self._circuit_breaker_dict.items())
+
+
+metrics = PortoneMetrics()
+circuit_breakers = CircuitBreakerRegistry(
+    failure_threshold=settings.PORTONE_CIRCUIT_FAILURE_THRESHOLD,
+    reset_timeout=settings.PORTONE_CIRCUIT_RESET_TIMEOUT,
+)
@@ -0,0 +1,140 @@
+import threading
+import time
+from typing import Dict
+
+import requests
+from django.conf import settings
+from iamport import Iamport
+
+from mall.portone import PortoneUnavailable, circuit_breakers, metrics
+from mall.tenants import DEFAULT_TENANT_SLUG, Tenant, get_current_tenant
+
+
+class TimeoutSession(requests.Session):
+    def __init__(self, timeout: float):
+        super().__init__()
+        self.timeout = timeout
+
+    def request(self, method, url, **kwargs):
+        kwargs.setdefault("timeout", self.timeout)
+        return super().request(method, url, **kwargs)
+
+
+class PortoneClient(Iamport):
+    """
+    모든 PortOne 호출에 timeout 을 적용하고, 엔드포인트별 소요시간/오류를 기록하며,
+    circuit breaker 가 열려 있으면 호출하지 않고 바로 PortoneUnavailable 예외를 발생시킵니다.
+    access token 은 만료 전까지 재사용하므로, 테넌트별로 하나의 클라이언트를 공유합니다. (get_portone_client)
+    """
+
+    # 만료 직전의 토큰으로 호출하지 않도록 두는 여유(초)
+    token_expire_margin = 60
+
+    def __init__(self, imp_key, imp_secret, tenant_slug=DEFAULT_TENANT_SLUG, **kwargs):
+        super().__init__(imp_key, imp_secret, **kwargs)
+        # circuit breaker 와 지표는 테넌트별로 구분합니다.
+        self.tenant_slug = tenant_slug
+        self.circuit_breaker = circuit_breakers.get(tenant_slug)
+        session = TimeoutSession(timeout=settings.PORTONE_TIMEOUT)
+        # 재시도가 timeout 을 배로 늘리지 않도록 연결 실패에 대해서만 1회 재시도합니다.
+        session.mount("https://", requests.adapters.HTTPAdapter(max_retries=1))
+        self.requests_session = session
+        self._token = None
+        self._token_expires_at = 0.0
+        self._token_lock = threading.Lock()
+
+    def call(self, endpoint: str, func, *args, **kwargs):
+        if not self.circuit_breaker.allow_request():
+            metrics.add_error(self.tenant_slug, endpoint, "circuit_open")
+            raise PortoneUnavailable(f"PortOne circuit breaker is open ({endpoint})")
+
+        started_at = time.perf_counter()
+        try:
+            result = func(*args, **kwargs)
+        except requests.Timeout as e:
+            self._record_failure(endpoint, "timeout")
+            raise PortoneUnavailable(str(e)) from e
+        except requests.RequestException as e:
+            self._record_failure(endpoint, "network")
+            raise PortoneUnavailable(str(e)) from e
+        except Iamport.HttpError as e:
+            if e.code == 401:
+                # 다른 곳에서 토큰을 새로 발급받아 기존 토큰이 만료되었을 수 있습니다.
+                self.clear_token()
+            if e.code is not None and e.code >= 500:
+                self._record_failure(endpoint, "http_5xx")
+            else:
+                self.circuit_breaker.record_success()
+                metrics.add_error(self.tenant_slug, endpoint, "http_4xx")
+            raise
+        except Iamport.ResponseError:
+            # PortOne 이 정상 응답한 업무 오류(결제내역 없음 등)는 장애로 보지 않습니다.
+            self.circuit_breaker.record_success()
+            metrics.add_error(self.tenant_slug, endpoint, "response")
+            raise
+        else:
+            self.circuit_breaker.record_success()
+            return result
+        finally:
+            metrics.observe(
+                self.tenant_slug, endpoint, time.perf_counter() - started_at
+            )
+
+    def _record_failure(self, endpoint: str, kind: str):
+        self.circuit_breaker.record_failure()
+        metrics.add_error(self.tenant_slug, endpoint, kind)
+
+    def clear_token(self):
+        with self._token_lock:
+            self._token = None
+
+    def _get_token(self):
+        with self._token_lock:
+            if self._token is not None and time.time() < self._token_expires_at:
+                return self._token
+
+            # 토큰 발급은 find/cancel 호출 안에서 일어나므로, 오류와 circuit breaker 는
+            # 바깥 엔드포인트에서 처리하고 여기서는 소요시간만 기록합니다.
+            started_at = time.perf_counter()
+            try:
+                response = self.requests_session.post(
+                    f"{self.imp_url}users/getToken",
+                    json={"imp_key": self.imp_key, "imp_secret": self.imp_secret},
+                )
+                result = self.get_response(response)
+            finally:
+                metrics.observe(
+                    self.tenant_slug, "get_token", time.perf_counter() - started_at
+                )
+
+            # 만료시각은 PortOne 서버 시각 기준이므로 남은 시간으로 바꿔 저장합니다.
+            lifetime = result.get("expired_at", 0) - result.get("now", 0)
+            self._token = result["access_token"]
+            self._token_expires_at = time.time() + lifetime - self.token_expire_margin
+            return self._token
+
+    def find(self, **kwargs):
+        return self.call("find", super().find, **kwargs)
+
+    def cancel(self, reason, **kwargs):
+        return self.call("cancel", super().cancel, reason, **kwargs)
+
+
+_client_dict: Dict[Tenant, PortoneClient] = {}
+_client_lock = threading.Lock()
+
+
+def get_portone_client(tenant: Tenant = None) -> PortoneClient:
+    """테넌트의 PortOne 인증정보로 만든 클라이언트를 반환합니다. 지정하지 않으면 현재 테넌트입니다."""
+    tenant = tenant or get_current_tenant()
+    client = _client_dict.get(tenant)
+    if client is None:
+        with _client_lock:
+            client = _client_dict.get(tenant)
+            if client is None:
+                client = _client_dict[tenant] = PortoneClient(
+                    imp_key=tenant.portone_api_key,
+                    imp_secret=tenant.portone_api_secret,
+                    tenant_slug=tenant.slug,
+                )
+    return client
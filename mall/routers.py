@@ -0,0 +1,91 @@
+import functools
+import time
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS
+
+# read_from_replica 로 지정한 뷰 안에서만 읽기 쿼리를 replica 로 보냅니다.
+_read_replica = ContextVar("read_replica", default=False)
+# 최근에 쓰기를 한 사용자는 복제 지연 동안 primary 에서 읽습니다.
+_primary_pinned = ContextVar("primary_pinned", default=False)
+_wrote = ContextVar("wrote", default=False)
+
+
+def read_from_replica(view_function):
+    """
+    읽기 전용 카탈로그/이력 뷰에 지정합니다.
+    TemplateResponse는 뷰 밖에서 렌더링되므로, 여기서 렌더링까지 마쳐 쿼리가 replica 로 가도록 합니다.
+    """
+
+    @functools.wraps(view_function)
+    def _wrapped_view(request, *args, **kwargs):
+        token = _read_replica.set(True)
+        try:
+            response = view_function(request, *args, **kwargs)
+            if callable(getattr(response, "render", None)):
+                response.render()
+            return response
+        finally:
+            _read_replica.reset(token)
+
+    return _wrapped_view
+
+
+class ReplicaRouter:
+    """settings.DATABASE_REPLICA_ALIAS 가 지정되었을 때 DATABASE_ROUTERS에 추가됩니다."""
+
+    def db_for_read(self, model, **hints):
+        instance = hints.get("instance")
+        if instance is not None and instance._state.db:
+            return instance._state.db
+        if _read_replica.get() and not _primary_pinned.get():
+            return settings.DATABASE_REPLICA_ALIAS
+        return DEFAULT_DB_ALIAS
+
+    def db_for_write(self, model, **hints):
+        _primary_pinned.set(True)
+        _wrote.set(True)
+        # None을 반환하면 instance._state.db(replica일 수 있음)로 쓰게 되므로 명시합니다.
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        db_set = {DEFAULT_DB_ALIAS, settings.DATABASE_REPLICA_ALIAS}
+        if obj1._state.db in db_set and obj2._state.db in db_set:
+            return True
+        return None
+
+
+class ReplicaStickinessMiddleware:
+    """
+    쓰기가 발생한 응답에 쿠키를 남겨, DATABASE_REPLICA_STICKY_SECONDS 동안
+    해당 사용자의 읽기를 primary 로 고정합니다.
+    """
+
+    cookie_name = "primary_db_until"
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        try:
+            until = float(request.COOKIES.get(self.cookie_name, 0))
+        except ValueError:
+            until = 0
+        pinned_token = _primary_pinned.set(until > time.time())
+        wrote_token = _wrote.set(False)
+        try:
+            response = self.get_response(request)
+            if _wrote.get():
+                sticky_seconds = settings.DATABASE_REPLICA_STICKY_SECONDS
+                response.set_cookie(
+                    self.cookie_name,
+                    str(time.time() + sticky_seconds),
+                    max_age=sticky_seconds,
+                    httponly=True,
+                    samesite="Lax",
+                )
+            return response
+        finally:
+            _wrote.reset(wrote_token)
+            _primary_pinned.reset(pinned_token)
@@ -0,0 +1,48 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import Signal, receiver
+from mall.storage import ContentAddressedStorage
+
+# 주문 상태가 바뀔 때 전달됩니다. 주문 생성 시에는 old_status 가 None 입니다.
+# 인자: order, old_status, new_status
+order_status_changed = Signal()
+
+# Order.bulk_transition 으로 여러 주문의 상태가 한 번에 바뀔 때 chunk 마다 1회 전달됩니다.
+# 인자: transition_list - [(order, old_status, new_status), ...]
+order_status_bulk_changed = Signal()
+
+
+def release_photo(storage, name: str, using: str):
+    # 롤백되면 참조가 유지되어야 하므로 커밋 후에 참조를 해제합니다.
+    if name and isinstance(storage, ContentAddressedStorage):
+        transaction.on_commit(lambda: storage.delete(name), using=using)
+
+
+@receiver(pre_save, sender="mall.Product")
+def on_product_photo_replaced(sender, instance, using, update_fields, **kwargs):
+    if instance.pk is None:
+        return
+    if update_fields is not None and "photo" not in update_fields:
+        return
+    if hasattr(instance, "_loaded_photo_name"):
+        # Product.from_db 에서 기억한 조회 시점의 경로
+        old_name = instance._loaded_photo_name
+    else:
+        old_name = (
+            sender.objects.filter(pk=instance.pk)
+            .values_list("photo", flat=True)
+            .first()
+        )
+    if old_name != instance.photo.name:
+        release_photo(instance.photo.storage, old_name, using)
+
+
+@receiver(post_save, sender="mall.Product")
+def on_product_saved(sender, instance, update_fields, **kwargs):
+    if update_fields is None or "photo" in update_fields:
+        instance._loaded_photo_name = instance.photo.name
+
+
+@receiver(post_delete, sender="mall.Product")
+def on_product_deleted(sender, instance, using, **kwargs):
+    release_photo(instance.photo.storage, instance.photo.name, using)
@@ -0,0 +1,132 @@
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Dict, Iterable, Optional, Tuple
+
+from django.apps import apps
+from django.conf import settings
+from django.core.cache import caches
+
+from mall.tenants import get_current_tenant
+
+
+@dataclass(frozen=True)
+class ProductSnapshot:
+    pk: int
+    name: str
+    price: int
+    status: str
+    updated_at: datetime
+
+    @property
+    def version(self) -> int:
+        return get_version(self.updated_at)
+
+
+def get_version(updated_at: datetime) -> int:
+    return int(updated_at.timestamp() * 1_000_000)
+
+
+class ProductSnapshotStore:
+    """
+    상품의 가격/이름/상태 스냅샷 저장소.
+
+    (pk, updated_at) 을 키로 사용하므로 상품이 수정되면 자연스럽게 새 키로 조회되어,
+    별도의 무효화 없이도 오래된 가격으로 주문이 생성되지 않습니다.
+    프로세스 내 LRU(TTL) → 캐시 프레임워크 → DB 순으로 조회하며, DB 조회는 1회로 묶습니다.
+    테넌트마다 DB 가 다를 수 있으므로 LRU 키에도 테넌트를 포함합니다.
+    """
+
+    key_prefix = "mall:product-snapshot"
+    fields = ("pk", "name", "price", "status", "updated_at")
+
+    def __init__(self, maxsize: int = 1024, timeout: int = 300, cache_alias="default"):
+        self.maxsize = maxsize
+        self.timeout = timeout
+        self.cache_alias = cache_alias
+        self._lru: "OrderedDict[Tuple[str, int, int], Tuple[float, ProductSnapshot]]" = (
+            OrderedDict()
+        )
+        self._lock = threading.Lock()
+
+    @property
+    def cache(self):
+        return caches[self.cache_alias]
+
+    def make_key(self, pk: int, version: int) -> str:
+        return f"{self.key_prefix}:{pk}:{version}"
+
+    def clear(self):
+        with self._lock:
+            self._lru.clear()
+
+    def _lru_get(self, key: Tuple[str, int, int]) -> Optional[ProductSnapshot]:
+        with self._lock:
+            item = self._lru.get(key)
+            if item is None:
+                return None
+            expires_at, snapshot = item
+            if expires_at < time.monotonic():
+                del self._lru[key]
+                return None
+            self._lru.move_to_end(key)
+            return snapshot
+
+    def _lru_set(self, tenant_slug: str, snapshot: ProductSnapshot):
+        key = (tenant_slug, snapshot.pk, snapshot.version)
+        expires_at = time.monotonic() + self.timeout
+        with self._lock:
+            self._lru[key] = (expires_at, snapshot)
+            self._lru.move_to_end(key)
+            while len(self._lru) > self.maxsize:
+                self._lru.popitem(last=False)
+
+    def get_many(self, version_dict: Dict[int, datetime]) -> Dict[int, ProductSnapshot]:
+        """{상품 pk: updated_at} 사전을 받아 {상품 pk: ProductSnapshot} 사전을 반환합니다."""
+        snapshot_dict: Dict[int, ProductSnapshot] = {}
+        tenant_slug = get_current_tenant().slug
+
+        missing_key_dict = {}
+        for pk, updated_at in version_dict.items():
+            version = get_version(updated_at)
+            snapshot = self._lru_get((tenant_slug, pk, version))
+            if snapshot is None:
+                missing_key_dict[self.make_key(pk, version)] = pk
+            else:
+                snapshot_dict[pk] = snapshot
+
+        if missing_key_dict:
+            for key, snapshot in self.cache.get_many(list(missing_key_dict)).items():
+                self._lru_set(tenant_slug, snapshot)
+                snapshot_dict[missing_key_dict[key]] = snapshot
+
+        missing_pk_set = set(version_dict) - set(snapshot_dict)
+        if missing_pk_set:
+            Product = apps.get_model("mall", "Product")
+            qs = Product.objects.filter(pk__in=missing_pk_set).values_list(*self.fields)
+            fetched_list = [ProductSnapshot(*row) for row in qs]
+            self.cache.set_many(
+                {self.make_key(s.pk, s.version): s for s in fetched_list},
+                self.timeout,
+            )
+            for snapshot in fetched_list:
+                self._lru_set(tenant_slug, snapshot)
+                snapshot_dict[snapshot.pk] = snapshot
+
+        return snapshot_dict
+
+    def get_many_by_pk(self, pk_list: Iterable[int]) -> Dict[int, ProductSnapshot]:
+        """updated_at을 모를 때 사용합니다. 버전 확인을 위한 가벼운 쿼리가 1회 추가됩니다."""
+        Product = apps.get_model("mall", "Product")
+        version_dict = dict(
+            Product.objects.filter(pk__in=set(pk_list)).values_list("pk", "updated_at")
+        )
+        return self.get_many(version_dict)
+
+
+product_snapshot_store = ProductSnapshotStore(
+    maxsize=settings.PRODUCT_SNAPSHOT_MAXSIZE,
+    timeout=settings.PRODUCT_SNAPSHOT_TIMEOUT,
+)
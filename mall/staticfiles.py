@@ -0,0 +1,134 @@
+import gzip
+import mimetypes
+import os
+from django.conf import settings
+from django.contrib.staticfiles.storage import (
+    ManifestStaticFilesStorage,
+    staticfiles_storage,
+)
+from django.core.exceptions import SuspiciousFileOperation
+from django.core.files.base import ContentFile
+from django.http import FileResponse, HttpResponseNotFound, HttpResponseNotModified
+from django.utils._os import safe_join
+from django.utils.http import http_date
+from django.views.static import was_modified_since
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+
+class CompressedManifestStaticFilesStorage(ManifestStaticFilesStorage):
+    """
+    collectstatic 시 해시 파일명(manifest)으로 저장하고, 텍스트 파일은 .gz/.br 압축본을 미리 만들어 둡니다.
+    brotli 패키지가 없으면 .gz 만 만듭니다.
+    """
+
+    compress_extensions = (
+        ".css",
+        ".js",
+        ".mjs",
+        ".map",
+        ".svg",
+        ".json",
+        ".txt",
+        ".html",
+    )
+    compress_min_size = 256
+
+    def post_process(self, paths, dry_run=False, **options):
+        yield from super().post_process(paths, dry_run, **options)
+        if dry_run:
+            return
+
+        for hashed_name in set(self.hashed_files.values()):
+            if not hashed_name.endswith(self.compress_extensions):
+                continue
+            with self.open(hashed_name) as f:
+                data = f.read()
+            if len(data) < self.compress_min_size:
+                continue
+            for compressed_name in self.compress(hashed_name, data):
+                yield hashed_name, compressed_name, True
+
+    def compress(self, name, data):
+        compressor_list = [(".gz", lambda d: gzip.compress(d, 9, mtime=0))]
+        if brotli is not None:
+            compressor_list.append((".br", lambda d: brotli.compress(d, quality=11)))
+
+        for suffix, compress in compressor_list:
+            compressed_data = compress(data)
+            # 압축 효과가 거의 없으면 원본을 그대로 응답하도록 만들지 않습니다.
+            if len(compressed_data) >= len(data) * 0.95:
+                continue
+            compressed_name = name + suffix
+            if self.exists(compressed_name):
+                self.delete(compressed_name)
+            self._save(compressed_name, ContentFile(compressed_data))
+            yield compressed_name
+
+
+class StaticFilesMiddleware:
+    """
+    settings.STATIC_SERVE 일 때 collectstatic 결과(STATIC_ROOT)를 앱에서 직접 응답합니다.
+    세션/인증 등 나머지 미들웨어를 거치지 않고, FileResponse 로 응답하므로 WSGI 서버의
+    wsgi.file_wrapper(sendfile)를 통해 복사 없이 전송됩니다.
+    해시 파일명은 내용이 바뀌면 이름도 바뀌므로 1년간 캐시하도록 immutable 로 응답합니다.
+    """
+
+    immutable_cache_control = "public, max-age=31536000, immutable"
+    encoding_list = [("br", ".br"), ("gzip", ".gz")]
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.prefix = "/" + settings.STATIC_URL.lstrip("/")
+        self.root = str(settings.STATIC_ROOT)
+        self.immutable_name_set = set(
+            getattr(staticfiles_storage, "hashed_files", {}).values()
+        )
+
+    def __call__(self, request):
+        if request.method in ("GET", "HEAD") and request.path.startswith(self.prefix):
+            return self.serve(request, request.path[len(self.prefix) :])
+        return self.get_response(request)
+
+    def serve(self, request, name):
+        try:
+            path = safe_join(self.root, name)
+        except SuspiciousFileOperation:
+            return HttpResponseNotFound()
+        if not os.path.isfile(path):
+            return HttpResponseNotFound()
+
+        content_type, _ = mimetypes.guess_type(name)
+        accept_encoding = request.headers.get("Accept-Encoding", "")
+        content_encoding = None
+        for encoding, suffix in self.encoding_list:
+            if encoding in accept_encoding and os.path.isfile(path + suffix):
+                path += suffix
+                content_encoding = encoding
+                break
+
+        stat = os.stat(path)
+        if name in self.immutable_name_set:
+            cache_control = self.immutable_cache_control
+        else:
+            cache_control = f"public, max-age={settings.STATIC_MAX_AGE}"
+
+        # 304 응답에도 캐시 헤더를 실어 보내야 브라우저/CDN 이 캐시 수명을 갱신합니다.
+        if not was_modified_since(
+            request.META.get("HTTP_IF_MODIFIED_SINCE"), stat.st_mtime
+        ):
+            response = HttpResponseNotModified()
+        else:
+            response = FileResponse(
+                open(path, "rb"),
+                content_type=content_type or "application/octet-stream",
+            )
+            if content_encoding:
+                response["Content-Encoding"] = content_encoding
+        response["Last-Modified"] = http_date(stat.st_mtime)
+        response["Vary"] = "Accept-Encoding"
+        response["Cache-Control"] = cache_control
+        return response
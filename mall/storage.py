@@ -0,0 +1,96 @@
+import hashlib
+import os
+import posixpath
+from uuid import uuid4
+
+from django.apps import apps
+from django.core.files.storage import FileSystemStorage
+from django.db import models, router, transaction
+from django.db.models import F
+from django.db.models.fields.files import ImageFieldFile
+
+
+class ContentAddressedStorage(FileSystemStorage):
+    """
+    파일 내용의 sha256 해시로 파일명을 정하는 저장소.
+
+    upload_to 디렉토리 아래 <해시 앞 2자리>/<해시><확장자> 경로에 저장하므로, 같은 내용의 파일은
+    몇 번을 저장해도 디스크에 한 번만 기록되고 썸네일도 같은 원본 이름으로 재사용됩니다.
+    참조 수는 StoredFile 테이블에서 관리해, 마지막 참조가 삭제될 때만 파일을 지웁니다.
+    내용이 바뀌면 경로도 바뀌므로, 이 경로의 파일은 브라우저/CDN 에서 기간 제한 없이 캐시할 수 있습니다.
+    """
+
+    def get_available_name(self, name, max_length=None):
+        # 같은 이름은 같은 내용이므로 덮어쓰지 않고 재사용합니다. (_save 참고)
+        return name
+
+    def get_hashed_name(self, name: str, content) -> str:
+        hasher = hashlib.sha256()
+        for chunk in content.chunks():
+            hasher.update(chunk)
+        digest = hasher.hexdigest()
+        dir_name, file_name = posixpath.split(name)
+        ext = os.path.splitext(file_name)[1].lower()
+        return posixpath.join(dir_name, digest[:2], f"{digest}{ext}")
+
+    def _save(self, name, content):
+        StoredFile = apps.get_model("mall", "StoredFile")
+        name = self.get_hashed_name(name, content)
+
+        with transaction.atomic(using=router.db_for_write(StoredFile)):
+            # 참조 수를 먼저 갱신해 row 잠금을 잡은 뒤에 파일 존재 여부를 확인하므로,
+            # 동시에 실행되는 delete() 가 방금 참조한 파일을 지우지 않습니다.
+            is_updated = StoredFile.objects.filter(name=name).update(
+                ref_count=F("ref_count") + 1
+            )
+            if not is_updated:
+                StoredFile.objects.create(name=name, size=content.size, ref_count=1)
+
+            if not self.exists(name):
+                # 같은 내용을 동시에 저장하더라도 임시 파일을 원자적으로 옮기므로 안전합니다.
+                temp_name = super()._save(
+                    posixpath.join(posixpath.dirname(name), f".{uuid4().hex}.tmp"),
+                    content,
+                )
+                os.replace(self.path(temp_name), self.path(name))
+        return name
+
+    def delete(self, name):
+        StoredFile = apps.get_model("mall", "StoredFile")
+        with transaction.atomic(using=router.db_for_write(StoredFile)):
+            is_updated = StoredFile.objects.filter(name=name, ref_count__gt=1).update(
+                ref_count=F("ref_count") - 1
+            )
+            if is_updated:
+                return
+            deleted_count, _ = StoredFile.objects.filter(name=name).delete()
+            # StoredFile 에 없는 파일(해시 저장소 도입 이전 파일)은 공유 여부를 알 수 없으므로 지우지 않습니다.
+            if deleted_count:
+                super().delete(name)
+
+
+class ContentAddressedImageFieldFile(ImageFieldFile):
+    def save(self, name, content, save=True):
+        old_name = self.name
+        super().save(name, content, save)
+        if (
+            old_name
+            and self.name == old_name
+            and isinstance(self.storage, ContentAddressedStorage)
+        ):
+            # 같은 내용을 다시 저장하면 경로가 바뀌지 않아 이전 파일의 참조를 해제하지 않으므로,
+            # _save 에서 늘린 참조를 되돌립니다.
+            self.storage.delete(self.name)
+
+
+class ContentAddressedImageField(models.ImageField):
+    """같은 인스턴스에 같은 내용의 파일을 다시 저장해도 참조 수가 늘지 않는 ImageField"""
+
+    attr_class = ContentAddressedImageFieldFile
+
+
+product_photo_storage = ContentAddressedStorage()
+
+
+def get_product_photo_storage():
+    return product_photo_storage
@@ -0,0 +1,45 @@
+from django.core.files.base import ContentFile
+from sorl.thumbnail import get_thumbnail
+from jobs.tasks import task
+from mall.catalog import product_card_store
+from mall.models import Order, OrderPayment, Product
+
+
+@task()
+def update_order_payment(payment_pk):
+    OrderPayment.objects.get(pk=payment_pk).update()
+
+
+@task()
+def update_order(order_pk):
+    Order.objects.get(pk=order_pk).update()
+
+
+@task()
+def cancel_order(order_pk, reason=""):
+    Order.objects.get(pk=order_pk).cancel(reason=reason)
+
+
+@task()
+def make_product_thumbnail(product_pk):
+    product = Product.objects.select_related("category").get(pk=product_pk)
+    if product.photo:
+        # mall/product_list.html 에서 사용하는 것과 같은 옵션으로 썸네일을 미리 생성합니다.
+        get_thumbnail(product.photo, "300x300", crop="center")
+    # 상품 목록 JSON API 가 썸네일 URL 을 바로 쓸 수 있도록 카드 캐시를 채워둡니다.
+    product_card_store.warm(product)
+
+
+@task()
+def download_product_photo(product_pk, photo_url):
+    import requests
+
+    product = Product.objects.get(pk=product_pk)
+    file_name = photo_url.rsplit("/", 1)[-1]
+    photo_data = requests.get(photo_url).content
+    product.photo.save(
+        name=file_name,
+        content=ContentFile(photo_data),
+        save=True,
+    )
+    make_product_thumbnail.delay(product_pk=product_pk)
@@ -0,0 +1,167 @@
+import logging
+import time
+from collections import defaultdict
+from contextvars import ContextVar
+from pathlib import Path
+from typing import Dict, Iterator, List, Tuple
+
+from django.conf import settings
+from django.template import TemplateSyntaxError, engines
+from django.template.backends.django import DjangoTemplates
+from django.template.base import Node, Template, TokenType
+
+
+logger = logging.getLogger(__name__)
+
+
+def iter_template_dirs(engine) -> Iterator[str]:
+    for loader in engine.template_loaders:
+        # cached.Loader 는 실제 loader 목록을 감싸고 있습니다.
+        for sub_loader in getattr(loader, "loaders", [loader]):
+            if hasattr(sub_loader, "get_dirs"):
+                yield from sub_loader.get_dirs()
+
+
+def iter_template_names(engine) -> Iterator[str]:
+    for template_dir in iter_template_dirs(engine):
+        template_dir = Path(template_dir)
+        for path in sorted(template_dir.rglob("*")):
+            if path.is_file() and path.suffix in (".html", ".txt", ".xml"):
+                yield path.relative_to(template_dir).as_posix()
+
+
+def warm_template_cache() -> int:
+    """
+    모든 템플릿을 미리 컴파일하여 cached loader 에 올려둡니다.
+    첫 요청이 템플릿 파싱 비용을 부담하지 않도록 wsgi/asgi 시작 시에 호출합니다.
+    """
+    count = 0
+    for backend in engines.all():
+        if not isinstance(backend, DjangoTemplates):
+            continue
+        for template_name in iter_template_names(backend.engine):
+            try:
+                backend.engine.get_template(template_name)
+            except TemplateSyntaxError as e:
+                logger.warning("템플릿 컴파일 실패 %s: %s", template_name, e)
+            else:
+                count += 1
+    return count
+
+
+class TemplateProfile:
+    def __init__(self):
+        # {이름: [호출수, 누적시간]}. 중첩된 템플릿/태그의 시간이 포함된 누적시간입니다.
+        self.template_dict: Dict[str, List] = defaultdict(lambda: [0, 0.0])
+        self.tag_dict: Dict[str, List] = defaultdict(lambda: [0, 0.0])
+
+    def add(self, stat_dict, name: str, elapsed: float):
+        stat = stat_dict[name]
+        stat[0] += 1
+        stat[1] += elapsed
+
+    def get_rows(self, stat_dict) -> List[Tuple[str, int, float]]:
+        return sorted(
+            ((name, count, elapsed) for name, (count, elapsed) in stat_dict.items()),
+            key=lambda row: row[2],
+            reverse=True,
+        )
+
+    def report(self, limit: int = 20) -> str:
+        line_list = []
+        for title, stat_dict in [
+            ("template", self.template_dict),
+            ("tag", self.tag_dict),
+        ]:
+            line_list.append(f"{title:<50} {'calls':>7} {'total(ms)':>10}")
+            for name, count, elapsed in self.get_rows(stat_dict)[:limit]:
+                line_list.append(f"{name:<50} {count:>7} {elapsed * 1000:>10.2f}")
+            line_list.append("")
+        return "\n".join(line_list)
+
+    def server_timing(self, limit: int = 5) -> str:
+        return ", ".join(
+            f'tpl{i};desc="{name}";dur={elapsed * 1000:.2f}'
+            for i, (name, _, elapsed) in enumerate(
+                self.get_rows(self.template_dict)[:limit]
+            )
+        )
+
+
+_current_profile: ContextVar = ContextVar("template_profile", default=None)
+_is_installed = False
+
+
+def install_profiler():
+    """
+    Template._render 와 Node.render_annotated 를 감싸 시간을 측정합니다.
+    profile() 블록 밖에서는 ContextVar 조회 외의 비용이 없습니다.
+    """
+    global _is_installed
+    if _is_installed:
+        return
+    _is_installed = True
+
+    original_template_render = Template._render
+    original_render_annotated = Node.render_annotated
+
+    def template_render(self, context):
+        profile = _current_profile.get()
+        if profile is None:
+            return original_template_render(self, context)
+        started_at = time.perf_counter()
+        try:
+            return original_template_render(self, context)
+        finally:
+            profile.add(
+                profile.template_dict,
+                self.name or "<unknown>",
+                time.perf_counter() - started_at,
+            )
+
+    def render_annotated(self, context):
+        profile = _current_profile.get()
+        token = getattr(self, "token", None)
+        if profile is None or token is None or token.token_type != TokenType.BLOCK:
+            return original_render_annotated(self, context)
+        started_at = time.perf_counter()
+        try:
+            return original_render_annotated(self, context)
+        finally:
+            tag_name = token.contents.split(maxsplit=1)[0]
+            profile.add(profile.tag_dict, tag_name, time.perf_counter() - started_at)
+
+    Template._render = template_render
+    Node.render_annotated = render_annotated
+
+
+class profile:
+    def __enter__(self) -> TemplateProfile:
+        install_profiler()
+        self.result = TemplateProfile()
+        self.token = _current_profile.set(self.result)
+        return self.result
+
+    def __exit__(self, *exc_info):
+        _current_profile.reset(self.token)
+
+
+class TemplateProfilerMiddleware:
+    """TEMPLATE_PROFILING=True 일 때 요청별 템플릿/태그 렌더링 시간을 로그와 Server-Timing 헤더로 남깁니다."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if not settings.TEMPLATE_PROFILING:
+            return self.get_response(request)
+
+        with profile() as result:
+            response = self.get_response(request)
+            if callable(getattr(response, "render", None)):
+                response.render()
+
+        if result.template_dict:
+            logger.info("%s 템플릿 렌더링 시간\n%s", request.path, result.report())
+            response["Server-Timing"] = result.server_timing()
+        return response
@@ -0,0 +1,200 @@
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Dict, Optional, Tuple
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.db import DEFAULT_DB_ALIAS
+from django.http import HttpResponseNotFound
+from django.http.request import split_domain_port
+
+DEFAULT_TENANT_SLUG = "default"
+
+
+@dataclass(frozen=True)
+class Tenant:
+    slug: str
+    host_list: Tuple[str, ...]
+    portone_shop_id: str
+    portone_api_key: str
+    portone_api_secret: str
+    portone_pg: str
+    database_alias: str = DEFAULT_DB_ALIAS
+
+    @property
+    def is_default(self) -> bool:
+        return self.slug == DEFAULT_TENANT_SLUG
+
+
+def get_tenant_database_alias(slug: str) -> str:
+    return f"tenant_{slug}"
+
+
+class TenantRegistry:
+    """
+    settings.TENANTS 로 등록한 쇼핑몰(테넌트) 목록.
+
+    호스트명으로 테넌트를 찾고, 등록되지 않은 호스트는 기본 테넌트(settings.PORTONE_* 와 default DB)로 처리합니다.
+    기본 테넌트 외의 테넌트는 전용 DB(database_url)가 필요합니다.
+    설정에서 만들어지는 값이므로 프로세스 시작 후 처음 사용할 때 한 번만 구성합니다.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._tenant_dict: Optional[Dict[str, Tenant]] = None
+        self._host_dict: Dict[str, Tenant] = {}
+
+    def build(self):
+        default = Tenant(
+            slug=DEFAULT_TENANT_SLUG,
+            host_list=(),
+            portone_shop_id=settings.PORTONE_SHOP_ID,
+            portone_api_key=settings.PORTONE_API_KEY,
+            portone_api_secret=settings.PORTONE_API_SECRET,
+            portone_pg=settings.PORTONE_PG,
+        )
+        tenant_dict = {default.slug: default}
+        host_dict = {}
+
+        for slug, config in settings.TENANTS.items():
+            if slug in tenant_dict:
+                raise ImproperlyConfigured(f"TENANTS: 사용할 수 없는 테넌트명입니다. ({slug})")
+            if not config.get("hosts"):
+                raise ImproperlyConfigured(f"TENANTS: {slug} 테넌트의 hosts 가 없습니다.")
+            if not config.get("database_url"):
+                # 상품/주문 등의 모델은 테넌트 구분 컬럼이 없으므로 DB 로 분리해야 합니다.
+                raise ImproperlyConfigured(
+                    f"TENANTS: {slug} 테넌트의 database_url 이 없습니다. "
+                    "기본 DB 를 함께 사용하면 기본 테넌트의 상품/주문이 노출됩니다."
+                )
+            tenant = Tenant(
+                slug=slug,
+                host_list=tuple(host.lower() for host in config["hosts"]),
+                portone_shop_id=config.get("portone_shop_id", ""),
+                portone_api_key=config.get("portone_api_key", ""),
+                portone_api_secret=config.get("portone_api_secret", ""),
+                portone_pg=config.get("portone_pg", settings.PORTONE_PG),
+                database_alias=get_tenant_database_alias(slug),
+            )
+            for host in tenant.host_list:
+                if host in host_dict:
+                    raise ImproperlyConfigured(f"TENANTS: 중복된 호스트입니다. ({host})")
+                host_dict[host] = tenant
+            tenant_dict[slug] = tenant
+
+        self._host_dict = host_dict
+        self._tenant_dict = tenant_dict
+
+    def _get_tenant_dict(self) -> Dict[str, Tenant]:
+        if self._tenant_dict is None:
+            with self._lock:
+                if self._tenant_dict is None:
+                    self.build()
+        return self._tenant_dict
+
+    def reset(self):
+        with self._lock:
+            self._tenant_dict = None
+            self._host_dict = {}
+
+    @property
+    def default(self) -> Tenant:
+        return self._get_tenant_dict()[DEFAULT_TENANT_SLUG]
+
+    def get(self, slug: str) -> Tenant:
+        return self._get_tenant_dict()[slug or DEFAULT_TENANT_SLUG]
+
+    def get_by_host(self, host: str) -> Optional[Tenant]:
+        self._get_tenant_dict()
+        domain, _ = split_domain_port(host)
+        return self._host_dict.get(domain)
+
+
+tenant_registry = TenantRegistry()
+
+# 요청/작업을 처리하는 동안의 테넌트. 지정되지 않았으면 기본 테넌트입니다.
+_current_tenant = ContextVar("current_tenant", default=None)
+
+
+def get_current_tenant() -> Tenant:
+    return _current_tenant.get() or tenant_registry.default
+
+
+@contextmanager
+def use_tenant(tenant: Tenant):
+    token = _current_tenant.set(tenant)
+    try:
+        yield tenant
+    finally:
+        _current_tenant.reset(token)
+
+
+class TenantMiddleware:
+    """
+    Host 헤더로 테넌트를 찾아 요청을 처리하는 동안 지정합니다. (request.tenant)
+    TENANT_STRICT_HOST 이면 등록되지 않은 호스트의 요청은 404 로 응답합니다.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        tenant = tenant_registry.get_by_host(request.get_host())
+        if tenant is None:
+            if settings.TENANT_STRICT_HOST:
+                return HttpResponseNotFound()
+            tenant = tenant_registry.default
+
+        request.tenant = tenant
+        with use_tenant(tenant):
+            return self.get_response(request)
+
+
+def make_cache_key(key, key_prefix, version):
+    """
+    CACHES 의 KEY_FUNCTION. 캐시 키에 테넌트를 포함해 상품 스냅샷/카드/목록 페이지, 인증 사용자,
+    캐시 세션 등 모든 캐시를 테넌트별로 분리합니다. 기본 테넌트는 장고 기본 형식을 그대로 사용합니다.
+    """
+    tenant = get_current_tenant()
+    if tenant.is_default:
+        return f"{key_prefix}:{version}:{key}"
+    return f"{key_prefix}:{version}:{tenant.slug}:{key}"
+
+
+class TenantRouter:
+    """
+    테넌트의 쿼리를 전용 DB(database_url)로 보냅니다.
+    기본 테넌트는 None 을 반환해 다음 라우터(ReplicaRouter)에 맡깁니다.
+    작업 테이블(settings.TENANT_SHARED_APPS)은 모든 테넌트가 default DB 에서 공유해,
+    하나의 worker 가 모든 테넌트의 작업을 처리합니다.
+    MEDIA_ROOT 처럼 테넌트가 함께 쓰는 자원의 테이블(settings.TENANT_SHARED_MODELS)도 default DB 에서 공유합니다.
+    """
+
+    def is_shared(self, app_label: str, model_name: Optional[str]) -> bool:
+        if app_label in settings.TENANT_SHARED_APPS:
+            return True
+        label_set = {label.lower() for label in settings.TENANT_SHARED_MODELS}
+        return f"{app_label}.{model_name}" in label_set
+
+    def get_database_alias(self, model) -> Optional[str]:
+        if self.is_shared(model._meta.app_label, model._meta.model_name):
+            return DEFAULT_DB_ALIAS
+        database_alias = get_current_tenant().database_alias
+        if database_alias == DEFAULT_DB_ALIAS:
+            return None
+        return database_alias
+
+    def db_for_read(self, model, **hints):
+        return self.get_database_alias(model)
+
+    def db_for_write(self, model, **hints):
+        return self.get_database_alias(model)
+
+    def allow_migrate(self, db, app_label, **hints):
+        if db.startswith("tenant_") and self.is_shared(
+            app_label, hints.get("model_name")
+        ):
+            return False
+        return None
@@ -1,3 +1,1585 @@
-from django.test import TestCase
+import gzip
+import json
+import math
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import Future
+from datetime import timedelta
+from email.utils import parsedate_to_datetime
+from io import BytesIO, StringIO
+from pathlib import Path
+from unittest import mock
+from iamport import Iamport
+from PIL import Image
+from django.conf import settings
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.core.cache import cache
+from django.core.exceptions import ImproperlyConfigured
+from django.core.files.base import ContentFile
+from django.core.management import call_command
+from django.db import OperationalError, connection, connections, transaction
+from django.db.backends.sqlite3.base import DatabaseWrapper as SQLiteDatabaseWrapper
+from django.http import HttpResponse
+from django.template import engines
+from django.test import (
+    RequestFactory,
+    TestCase,
+    TransactionTestCase,
+    override_settings,
+)
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from accounts.models import User
+from jobs.models import Job
+from mall.catalog import InvalidCursor, decode_cursor, encode_cursor
+from mall.checks import check_database_connections, check_tenants
+from mall.decorators import IPAllowList, deny_from_untrusted_hosts, get_client_ip
+from mall.forms import CartProductFormSet
+from mall.management.commands.load_test_checkout import (
+    Command as LoadTestCheckoutCommand,
+    EndpointStats,
+)
+from mall.paginators import EstimatedCountPaginator
+from mall.portone import (
+    CircuitBreaker,
+    CircuitBreakerRegistry,
+    PortoneMetrics,
+    PortoneUnavailable,
+)
+from mall.portone_client import PortoneClient
+from mall.models import (
+    CartProduct,
+    Category,
+    Order,
+    OrderedProduct,
+    OrderPayment,
+    PaymentEvent,
+    Product,
+    ProductChangeLog,
+    StoredFile,
+)
+from mall import templating
+from mall.routers import ReplicaRouter, ReplicaStickinessMiddleware, read_from_replica
+from mall.snapshots import product_snapshot_store
+from mall.staticfiles import StaticFilesMiddleware
+from mall.storage import get_product_photo_storage
+from mall.tenants import (
+    TenantRouter,
+    get_current_tenant,
+    tenant_registry,
+    use_tenant,
+)
+from reports.models import DailyOrderStatusSales
 
-# Create your tests here.
+
+class CartProductFormSetTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(
+            username="buyer", password="password", email="buyer@example.com"
+        )
+        category = Category.objects.create(name="분류")
+        cls.product_list = Product.objects.bulk_create(
+            Product(category=category, name=f"상품 {i}", price=1000) for i in range(20)
+        )
+
+    def make_data(self, cart_product_list) -> dict:
+        data = {
+            "form-TOTAL_FORMS": len(cart_product_list),
+            "form-INITIAL_FORMS": len(cart_product_list),
+        }
+        for i, cart_product in enumerate(cart_product_list):
+            data[f"form-{i}-id"] = cart_product.pk
+            # 절반은 수량 변경, 나머지 절반은 삭제합니다.
+            if i % 2:
+                data[f"form-{i}-quantity"] = cart_product.quantity
+                data[f"form-{i}-DELETE"] = "on"
+            else:
+                data[f"form-{i}-quantity"] = cart_product.quantity + 1
+        return data
+
+    def test_constant_queries(self):
+        for size in (2, 20):
+            with self.subTest(cart_size=size):
+                CartProduct.objects.all().delete()
+                cart_product_list = CartProduct.objects.bulk_create(
+                    CartProduct(user=self.user, product=product, quantity=1)
+                    for product in self.product_list[:size]
+                )
+                data = self.make_data(cart_product_list)
+
+                # 조회, SAVEPOINT, bulk_update, DELETE, RELEASE
+                with self.assertNumQueries(5):
+                    formset = CartProductFormSet(
+                        data=data, queryset=CartProduct.objects.filter(user=self.user)
+                    )
+                    self.assertTrue(formset.is_valid())
+                    formset.save()
+
+                self.assertEqual(
+                    sorted(CartProduct.objects.values_list("quantity", flat=True)),
+                    [2] * (size // 2),
+                )
+
+    def test_unknown_pk(self):
+        cart_product = CartProduct.objects.create(
+            user=self.user, product=self.product_list[0]
+        )
+        data = self.make_data([cart_product])
+        data["form-0-id"] = cart_product.pk + 1000
+        formset = CartProductFormSet(
+            data=data, queryset=CartProduct.objects.filter(user=self.user)
+        )
+        self.assertFalse(formset.is_valid())
+
+
+class ProductSnapshotStoreTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(
+            username="buyer", password="password", email="buyer@example.com"
+        )
+        category = Category.objects.create(name="분류")
+        cls.product_list = [
+            Product.objects.create(category=category, name=f"상품 {i}", price=1000)
+            for i in range(3)
+        ]
+
+    def setUp(self):
+        product_snapshot_store.clear()
+        cache.clear()
+
+    def get_version_dict(self):
+        return dict(Product.objects.values_list("pk", "updated_at"))
+
+    def test_get_many(self):
+        version_dict = self.get_version_dict()
+        with self.assertNumQueries(1):
+            snapshot_dict = product_snapshot_store.get_many(version_dict)
+        self.assertEqual(snapshot_dict[self.product_list[0].pk].price, 1000)
+
+        # 프로세스 내 LRU, 캐시 순으로 조회하므로 DB 를 조회하지 않습니다.
+        with self.assertNumQueries(0):
+            product_snapshot_store.get_many(version_dict)
+        product_snapshot_store.clear()
+        with self.assertNumQueries(0):
+            product_snapshot_store.get_many(version_dict)
+
+        # 상품이 수정되면 updated_at 이 바뀌어 새 스냅샷을 조회합니다.
+        product = self.product_list[0]
+        product.price = 2000
+        product.save()
+        snapshot_dict = product_snapshot_store.get_many(self.get_version_dict())
+        self.assertEqual(snapshot_dict[product.pk].price, 2000)
+
+    def test_list_with_snapshot_skips_deleted_product(self):
+        for product in self.product_list:
+            CartProduct.objects.create(user=self.user, product=product)
+        deleted = self.product_list[0]
+        cart_product_qs = CartProduct.objects.filter(user=self.user)
+        version_dict = {
+            cp.product_id: cp.product.updated_at
+            for cp in cart_product_qs.select_related("product")
+        }
+
+        # 장바구니 조회 직후 상품이 삭제된 경우
+        def get_many(version_dict_arg):
+            Product.objects.filter(pk=deleted.pk).delete()
+            return original_get_many(version_dict)
+
+        original_get_many = product_snapshot_store.get_many
+        with mock.patch.object(product_snapshot_store, "get_many", get_many):
+            cart_product_list = CartProduct.list_with_snapshot(cart_product_qs)
+        self.assertEqual(
+            sorted(cp.product_id for cp in cart_product_list),
+            [product.pk for product in self.product_list[1:]],
+        )
+
+
+class ProductChangeStatusTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        category = Category.objects.create(name="분류")
+        cls.product_list = [
+            Product.objects.create(category=category, name=f"상품 {i}", price=1000)
+            for i in range(5)
+        ]
+
+    def test_change_status(self):
+        Product.objects.filter(pk=self.product_list[0].pk).update(
+            status=Product.Status.ACTIVE
+        )
+        count = Product.change_status(
+            Product.objects.all(), Product.Status.ACTIVE, chunk_size=2
+        )
+        self.assertEqual(count, 4)
+        self.assertEqual(
+            sorted(ProductChangeLog.objects.values_list("product_id", flat=True)),
+            [product.pk for product in self.product_list[1:]],
+        )
+        self.assertFalse(Product.objects.exclude(status=Product.Status.ACTIVE).exists())
+
+    def test_status_changed_concurrently(self):
+        changed = self.product_list[0]
+        real_atomic = transaction.atomic
+
+        # 대상 목록을 조회한 뒤, 첫 chunk 를 처리하기 전에 다른 곳에서 먼저 상태를 바꾼 경우
+        def atomic(*args, **kwargs):
+            Product.objects.filter(pk=changed.pk).update(status=Product.Status.ACTIVE)
+            return real_atomic(*args, **kwargs)
+
+        with mock.patch("mall.models.transaction.atomic", atomic):
+            count = Product.change_status(Product.objects.all(), Product.Status.ACTIVE)
+        self.assertEqual(count, 4)
+        self.assertFalse(ProductChangeLog.objects.filter(product=changed).exists())
+
+    def test_poll_waits_for_gap(self):
+        log_list = ProductChangeLog.objects.bulk_create(
+            ProductChangeLog(product=product, status=Product.Status.ACTIVE)
+            for product in self.product_list[:3]
+        )
+        # 두번째 순번이 아직 커밋되지 않은 상황
+        log_list[1].delete()
+        first_seq = log_list[0].pk
+        self.assertEqual(
+            [log.pk for log in ProductChangeLog.poll(first_seq - 1)], [first_seq]
+        )
+        self.assertEqual(ProductChangeLog.poll(first_seq), [])
+
+        # 시간이 지나도 채워지지 않으면 롤백된 순번으로 보고 건너뜁니다.
+        ProductChangeLog.objects.filter(pk=log_list[2].pk).update(
+            created_at=timezone.now() - timedelta(minutes=10)
+        )
+        self.assertEqual(
+            [log.pk for log in ProductChangeLog.poll(first_seq)], [log_list[2].pk]
+        )
+
+
+class ReplicaRouterTest(TestCase):
+    def setUp(self):
+        self.router = ReplicaRouter()
+
+    def get_read_db(self, request):
+        @read_from_replica
+        def view(request):
+            return HttpResponse(self.router.db_for_read(Product))
+
+        middleware = ReplicaStickinessMiddleware(view)
+        return middleware(request)
+
+    def test_read_from_replica(self):
+        self.assertEqual(self.router.db_for_read(Product), "default")
+        response = self.get_read_db(RequestFactory().get("/"))
+        self.assertEqual(response.content, b"replica")
+        self.assertNotIn(ReplicaStickinessMiddleware.cookie_name, response.cookies)
+
+    def test_write_pins_primary(self):
+        def view(request):
+            self.router.db_for_write(Product)
+            return HttpResponse(self.router.db_for_read(Product))
+
+        response = ReplicaStickinessMiddleware(read_from_replica(view))(
+            RequestFactory().get("/")
+        )
+        # 쓰기 이후의 읽기는 같은 요청 안에서 primary 로 보내고, 쿠키로 다음 요청도 고정합니다.
+        self.assertEqual(response.content, b"default")
+        cookie = response.cookies[ReplicaStickinessMiddleware.cookie_name]
+
+        request = RequestFactory().get("/")
+        request.COOKIES[cookie.key] = cookie.value
+        self.assertEqual(self.get_read_db(request).content, b"default")
+
+        request.COOKIES[cookie.key] = str(time.time() - 1)
+        self.assertEqual(self.get_read_db(request).content, b"replica")
+
+
+class DatabaseConnectionCheckTest(TestCase):
+    def get_id_list(self):
+        return [message.id for message in check_database_connections(None)]
+
+    def test_default(self):
+        self.assertEqual(self.get_id_list(), [])
+
+    def test_persistent_connection(self):
+        with mock.patch.dict(connections.settings["default"], {"CONN_MAX_AGE": 60}):
+            self.assertEqual(self.get_id_list(), ["mall.I001"])
+
+    @override_settings(DATABASE_POOL=True)
+    def test_pool_unsupported(self):
+        # connection pool 은 PostgreSQL 에서만 사용할 수 있습니다.
+        self.assertEqual(self.get_id_list(), ["mall.E001"])
+
+
+class SQLiteProfileTest(TestCase):
+    def get_production_options(self) -> dict:
+        return {
+            "init_command": ";".join(
+                f"PRAGMA {name}={value}"
+                for name, value in settings.SQLITE_PRAGMAS.items()
+            ),
+            "transaction_mode": "IMMEDIATE",
+        }
+
+    def test_check(self):
+        options = self.get_production_options()
+        with mock.patch.dict(connections.settings["default"], {"OPTIONS": options}):
+            message_list = check_database_connections(None)
+        self.assertEqual([message.id for message in message_list], ["mall.I002"])
+        self.assertIn("transaction_mode=IMMEDIATE", message_list[0].msg)
+
+    def test_connection(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            settings_dict = {
+                **connections.settings["default"],
+                "NAME": str(Path(temp_dir) / "profile.sqlite3"),
+                "OPTIONS": self.get_production_options(),
+            }
+            wrapper = SQLiteDatabaseWrapper(settings_dict, alias="sqlite_profile")
+            connections["sqlite_profile"] = wrapper
+            try:
+                with wrapper.cursor() as cursor:
+                    cursor.execute("PRAGMA journal_mode")
+                    self.assertEqual(cursor.fetchone()[0], "wal")
+                    cursor.execute("PRAGMA busy_timeout")
+                    self.assertEqual(
+                        cursor.fetchone()[0], settings.SQLITE_PRAGMAS["busy_timeout"]
+                    )
+                with CaptureQueriesContext(wrapper) as ctx:
+                    with transaction.atomic(using="sqlite_profile"):
+                        pass
+            finally:
+                wrapper.close()
+                del connections["sqlite_profile"]
+        self.assertIn(
+            "BEGIN IMMEDIATE", [query["sql"] for query in ctx.captured_queries]
+        )
+
+    def test_bench_command(self):
+        out = StringIO()
+        call_command(
+            "bench_sqlite_concurrency",
+            writers=2,
+            readers=1,
+            seconds=0.2,
+            stdout=out,
+        )
+        line_dict = {
+            line.split()[0]: line.split() for line in out.getvalue().splitlines()
+        }
+        # 운영 프로필에서는 잠금 오류도, 유실된 갱신도 없어야 합니다.
+        self.assertEqual(line_dict["production"][-2:], ["0", "0"])
+
+
+class IPAllowListTest(TestCase):
+    def test_contains(self):
+        allow_list = IPAllowList(["10.0.0.1", "192.168.0.0/16", "2001:db8::/32"])
+        for ip in ["10.0.0.1", "192.168.10.20", "2001:db8::1"]:
+            self.assertIn(ip, allow_list)
+        for ip in ["10.0.0.2", "192.169.0.1", "2001:db9::1", "잘못된 IP", None]:
+            self.assertNotIn(ip, allow_list)
+
+    def test_get_client_ip(self):
+        request = RequestFactory().get(
+            "/", REMOTE_ADDR="10.0.0.1", HTTP_X_FORWARDED_FOR="1.1.1.1, 2.2.2.2"
+        )
+        self.assertEqual(get_client_ip(request), "10.0.0.1")
+        self.assertEqual(get_client_ip(request, 1), "2.2.2.2")
+        self.assertEqual(get_client_ip(request, 2), "1.1.1.1")
+        # 신뢰하는 프록시 수보다 hop 이 적으면 위조된 헤더로 봅니다.
+        self.assertIsNone(get_client_ip(request, 3))
+
+    def test_decorator(self):
+        view = deny_from_untrusted_hosts(["10.0.0.0/8"], trusted_proxy_count=0)(
+            lambda request: HttpResponse("ok")
+        )
+        factory = RequestFactory()
+        self.assertEqual(
+            view(factory.get("/", REMOTE_ADDR="10.1.2.3")).status_code, 200
+        )
+        self.assertEqual(
+            view(
+                factory.get("/", REMOTE_ADDR="1.1.1.1", HTTP_X_FORWARDED_FOR="10.1.2.3")
+            ).status_code,
+            403,
+        )
+
+
+class FakePortoneApi:
+    """merchant_uid 별로 지정한 결제내역을 반환합니다. 지정하지 않은 결제는 PortOne 의 404 응답입니다."""
+
+    def __init__(self, response_dict=None):
+        self.response_dict = response_dict or {}
+        self.find_list = []
+
+    def find(self, merchant_uid):
+        self.find_list.append(merchant_uid)
+        if merchant_uid not in self.response_dict:
+            raise Iamport.HttpError(404, "Not Found")
+        return self.response_dict[merchant_uid]
+
+    def is_paid(self, amount, response):
+        return response["status"] == "paid" and response["amount"] == amount
+
+
+def create_order(user: User, price: int = 1000) -> Order:
+    product = Product.objects.create(
+        category=Category.objects.get_or_create(name="분류")[0],
+        name="상품",
+        price=price,
+        status=Product.Status.ACTIVE,
+    )
+    CartProduct.objects.create(user=user, product=product)
+    order = Order.create_from_cart(user, CartProduct.objects.filter(user=user))
+    CartProduct.objects.filter(user=user).delete()
+    return order
+
+
+class OrderPaymentCleanupTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(
+            username="buyer", password="password", email="buyer@example.com"
+        )
+
+    def create_stale_payment(self, order: Order) -> OrderPayment:
+        payment = OrderPayment.create_by_order(order)
+        OrderPayment.objects.filter(pk=payment.pk).update(
+            created_at=timezone.now() - timedelta(days=2)
+        )
+        return payment
+
+    def cleanup(self, api: FakePortoneApi, *args) -> str:
+        stdout = StringIO()
+        with mock.patch.object(OrderPayment, "api", property(lambda payment: api)):
+            call_command("cleanup_order_payments", *args, stdout=stdout)
+        return stdout.getvalue()
+
+    def test_get_or_create_by_order(self):
+        order = create_order(self.user)
+        payment = OrderPayment.get_or_create_by_order(order)
+        self.assertEqual(OrderPayment.get_or_create_by_order(order), payment)
+
+        # 오래된 결제 시도는 재사용하지 않습니다.
+        stale_payment = self.create_stale_payment(create_order(self.user))
+        self.assertNotEqual(
+            OrderPayment.get_or_create_by_order(stale_payment.order), stale_payment
+        )
+
+    def test_cleanup(self):
+        abandoned = self.create_stale_payment(create_order(self.user))
+        failed = self.create_stale_payment(create_order(self.user))
+        paid = self.create_stale_payment(create_order(self.user))
+        pending = self.create_stale_payment(create_order(self.user))
+        recent = OrderPayment.create_by_order(create_order(self.user))
+        api = FakePortoneApi(
+            {
+                failed.merchant_uid: {
+                    "merchant_uid": failed.merchant_uid,
+                    "status": "failed",
+                },
+                paid.merchant_uid: {
+                    "merchant_uid": paid.merchant_uid,
+                    "status": "paid",
+                    "amount": paid.desired_amount,
+                },
+                pending.merchant_uid: {
+                    "merchant_uid": pending.merchant_uid,
+                    "status": "ready",
+                },
+            }
+        )
+
+        self.cleanup(api, "--dry-run")
+        self.assertEqual(OrderPayment.objects.count(), 5)
+
+        self.cleanup(api)
+        # PortOne 에서 결제되지 않은 것이 확인된 시도만 삭제합니다.
+        self.assertEqual(
+            set(OrderPayment.objects.values_list("pk", flat=True)),
+            {paid.pk, pending.pk, recent.pk},
+        )
+        paid.refresh_from_db()
+        self.assertTrue(paid.is_paid_ok)
+        self.assertEqual(paid.order.status, Order.Status.PAID)
+        self.assertNotIn(recent.merchant_uid, api.find_list)
+        self.assertNotIn(
+            abandoned.pk, OrderPayment.objects.values_list("pk", flat=True)
+        )
+
+    def test_cleanup_portone_error(self):
+        payment = self.create_stale_payment(create_order(self.user))
+        api = FakePortoneApi()
+        api.find = mock.Mock(side_effect=Iamport.ResponseError(-1, "인증 실패"))
+
+        output = self.cleanup(api)
+        # 결제되지 않았음이 확인되지 않았으므로 삭제하지 않습니다.
+        self.assertTrue(OrderPayment.objects.filter(pk=payment.pk).exists())
+        self.assertIn("확인 실패 1개", output)
+
+    def test_cleanup_skip_portone(self):
+        order = create_order(self.user)
+        stale = self.create_stale_payment(order)
+        other = self.create_stale_payment(create_order(self.user))
+        paid = OrderPayment.create_by_order(order)
+        OrderPayment.objects.filter(pk=paid.pk).update(
+            is_paid_ok=True, pay_status=OrderPayment.PayStatus.PAID
+        )
+
+        api = FakePortoneApi()
+        self.cleanup(api, "--skip-portone")
+        # 결제완료된 다른 결제가 있는 주문의 시도만 삭제합니다.
+        self.assertFalse(OrderPayment.objects.filter(pk=stale.pk).exists())
+        self.assertTrue(OrderPayment.objects.filter(pk=other.pk).exists())
+        self.assertEqual(api.find_list, [])
+
+
+class OrderPaymentUpdateTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(
+            username="buyer", password="password", email="buyer@example.com"
+        )
+
+    def pay(self, payment: OrderPayment):
+        response = {
+            "merchant_uid": payment.merchant_uid,
+            "status": "paid",
+            "amount": payment.desired_amount,
+        }
+        api = FakePortoneApi({payment.merchant_uid: response})
+        with mock.patch.object(OrderPayment, "api", property(lambda payment: api)):
+            payment.update(response=response)
+
+    def test_transition_cas(self):
+        order = create_order(self.user)
+        stale_order = Order.objects.get(pk=order.pk)
+        self.assertTrue(order.transition(Order.Status.CANCELLED))
+        # 그 사이 다른 요청이 상태를 바꿨으면 덮어쓰지 않습니다.
+        self.assertFalse(stale_order.transition(Order.Status.PAID))
+        self.assertFalse(order.transition(Order.Status.PAID))
+        order.refresh_from_db()
+        self.assertEqual(order.status, Order.Status.CANCELLED)
+
+    def test_paid(self):
+        order = create_order(self.user)
+        unpaid = OrderPayment.create_by_order(order)
+        payment = OrderPayment.create_by_order(order)
+        self.pay(payment)
+
+        order.refresh_from_db()
+        self.assertEqual(order.status, Order.Status.PAID)
+        self.assertFalse(OrderPayment.objects.filter(pk=unpaid.pk).exists())
+
+    def test_paid_with_stale_order(self):
+        order = create_order(self.user)
+        payment = OrderPayment.create_by_order(order)
+        Order.objects.get(pk=order.pk).transition(Order.Status.FAILED_PAYMENT)
+
+        # 메모리의 주문 상태가 오래되었으면 다시 읽어 재시도합니다.
+        self.pay(payment)
+        order.refresh_from_db()
+        self.assertEqual(order.status, Order.Status.PAID)
+
+    def test_paid_on_cancelled_order(self):
+        order = create_order(self.user)
+        unpaid = OrderPayment.create_by_order(order)
+        payment = OrderPayment.create_by_order(order)
+        Order.objects.get(pk=order.pk).transition(Order.Status.CANCELLED)
+
+        with self.assertLogs("mall.models", "ERROR") as cm:
+            self.pay(payment)
+        self.assertIn("결제완료로 변경하지 못했습니다", cm.output[0])
+        order.refresh_from_db()
+        self.assertEqual(order.status, Order.Status.CANCELLED)
+        # 주문이 결제완료되지 않았으므로 다른 결제 시도를 삭제하지 않습니다.
+        self.assertTrue(OrderPayment.objects.filter(pk=unpaid.pk).exists())
+
+    def test_duplicate_payment(self):
+        order = create_order(self.user)
+        first = OrderPayment.create_by_order(order)
+        self.pay(first)
+        # 같은 결제의 웹훅/결제확인이 중복된 것은 오류가 아닙니다.
+        with self.assertNoLogs("mall.models", "ERROR"):
+            self.pay(first)
+
+        # 결제완료 전에 열어둔 다른 결제창에서 결제된 경우
+        second = OrderPayment.create_by_order(order)
+        with self.assertLogs("mall.models", "ERROR") as cm:
+            self.pay(second)
+        self.assertIn("중복 결제", cm.output[0])
+        self.assertTrue(OrderPayment.objects.filter(pk=first.pk).exists())
+
+
+class PortoneCircuitBreakerTest(TestCase):
+    def test_open_and_half_open(self):
+        breaker = CircuitBreaker(failure_threshold=2, reset_timeout=30)
+        breaker.record_failure()
+        self.assertTrue(breaker.allow_request())
+        breaker.record_failure()
+        self.assertTrue(breaker.is_open())
+        self.assertFalse(breaker.allow_request())
+
+        # reset_timeout 이 지나면 시험 호출 1회만 허용합니다.
+        breaker.opened_at -= 30
+        self.assertTrue(breaker.allow_request())
+        self.assertFalse(breaker.allow_request())
+        breaker.record_success()
+        self.assertFalse(breaker.is_open())
+
+    def test_metrics_export(self):
+        metrics = PortoneMetrics()
+        metrics.observe("default", "find", 0.07)
+        metrics.add_error("shop2", "find", "timeout")
+        circuit_breakers = CircuitBreakerRegistry(1, 30)
+        circuit_breakers.get("default")
+        circuit_breakers.get("shop2").record_failure()
+        text = metrics.export(circuit_breakers)
+        self.assertIn(
+            'portone_request_duration_seconds_bucket{tenant="default",endpoint="find",le="0.05"} 0',
+            text,
+        )
+        self.assertIn(
+            'portone_request_duration_seconds_bucket{tenant="default",endpoint="find",le="0.1"} 1',
+            text,
+        )
+        self.assertIn(
+            'portone_request_errors_total{tenant="shop2",endpoint="find",kind="timeout"} 1',
+            text,
+        )
+        self.assertIn('portone_circuit_open{tenant="default"} 0', text)
+        self.assertIn('portone_circuit_open{tenant="shop2"} 1', text)
+
+    def test_client_call(self):
+        import requests
+
+        circuit_breakers = CircuitBreakerRegistry(failure_threshold=1, reset_timeout=30)
+        with mock.patch("mall.portone_client.circuit_breakers", circuit_breakers):
+            client = PortoneClient(imp_key="key", imp_secret="secret")
+            other_client = PortoneClient(
+                imp_key="key2", imp_secret="secret2", tenant_slug="shop2"
+            )
+        breaker = client.circuit_breaker
+
+        def timeout():
+            raise requests.Timeout("timeout")
+
+        def not_found():
+            raise Iamport.HttpError(404, "Not Found")
+
+        # 4xx 는 PortOne 이 정상 응답한 것이므로 circuit breaker 를 열지 않습니다.
+        with self.assertRaises(Iamport.HttpError):
+            client.call("find", not_found)
+        self.assertFalse(breaker.is_open())
+
+        with self.assertRaises(PortoneUnavailable):
+            client.call("find", timeout)
+        self.assertTrue(breaker.is_open())
+
+        func = mock.Mock()
+        with self.assertRaises(PortoneUnavailable):
+            client.call("find", func)
+        func.assert_not_called()
+
+        # 다른 테넌트의 호출은 차단하지 않습니다.
+        self.assertFalse(other_client.circuit_breaker.is_open())
+        other_client.call("find", func)
+        func.assert_called_once()
+
+
+class EstimatedCountPaginatorTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        category = Category.objects.create(name="분류")
+        Product.objects.bulk_create(
+            Product(category=category, name=f"상품 {i}", price=1000) for i in range(5)
+        )
+        # 통계(MAX(rowid))와 실제 row 수가 다른 상황
+        Product.objects.filter(pk=Product.objects.order_by("pk")[0].pk).delete()
+
+    def test_count(self):
+        paginator = EstimatedCountPaginator(Product.objects.order_by("pk"), 2)
+        self.assertEqual(paginator.count, 4)
+
+        with mock.patch.object(EstimatedCountPaginator, "exact_count_threshold", 1):
+            paginator = EstimatedCountPaginator(Product.objects.order_by("pk"), 2)
+            self.assertEqual(paginator.count, 5)
+            # 필터가 있으면 정확한 COUNT(*) 를 사용합니다.
+            paginator = EstimatedCountPaginator(
+                Product.objects.filter(price=1000).order_by("pk"), 2
+            )
+            self.assertEqual(paginator.count, 4)
+
+    def test_admin_changelist(self):
+        user = User.objects.create_superuser(
+            username="admin", password="password", email="admin@example.com"
+        )
+        self.client.force_login(user)
+        order = create_order(user)
+        for url_name in [
+            "admin:mall_order_changelist",
+            "admin:mall_orderedproduct_changelist",
+        ]:
+            response = self.client.get(reverse(url_name))
+            self.assertEqual(response.status_code, 200)
+            self.assertContains(response, f">{order.pk}<")
+
+
+class TemplatingTest(TestCase):
+    def test_warm_template_cache(self):
+        self.assertGreaterEqual(templating.warm_template_cache(), 6)
+
+    def test_profile(self):
+        template = engines["django"].from_string(
+            "{% for i in items %}{% if i %}{{ i }}{% endif %}{% endfor %}"
+        )
+        with templating.profile() as result:
+            self.assertEqual(template.render({"items": [0, 1, 2]}), "12")
+
+        self.assertEqual(result.template_dict["<unknown>"][0], 1)
+        self.assertEqual(result.tag_dict["for"][0], 1)
+        self.assertEqual(result.tag_dict["if"][0], 3)
+        self.assertIn("for", result.report())
+
+        # profile() 블록 밖에서는 기록하지 않습니다.
+        template.render({"items": [1]})
+        self.assertEqual(result.tag_dict["for"][0], 1)
+
+    def test_middleware(self):
+        url = reverse("product_list")
+        response = self.client.get(url)
+        self.assertNotIn("Server-Timing", response)
+
+        with override_settings(TEMPLATE_PROFILING=True):
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('desc="mall/product_list.html"', response["Server-Timing"])
+
+
+class ConditionalGetTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(
+            username="buyer", password="password", email="buyer@example.com"
+        )
+        category = Category.objects.create(name="분류")
+        cls.product_list = [
+            Product.objects.create(
+                category=category,
+                name=f"상품 {i}",
+                price=1000,
+                status=Product.Status.ACTIVE,
+            )
+            for i in range(3)
+        ]
+
+    def test_product_list(self):
+        url = reverse("product_list")
+        # 첫 응답에서 발급된 CSRF 쿠키도 ETag 에 포함됩니다.
+        self.client.get(url)
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertIn("Cookie", response["Vary"])
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=response["ETag"])
+        self.assertEqual(response.status_code, 304)
+
+        # 가장 최근에 수정된 상품을 숨겨도 Last-Modified 가 뒤로 가지 않습니다.
+        Product.objects.exclude(pk=self.product_list[-1].pk).update(
+            updated_at=timezone.now() - timedelta(hours=1)
+        )
+        response = self.client.get(url)
+        etag, last_modified = response["ETag"], response["Last-Modified"]
+        Product.change_status(
+            Product.objects.filter(pk=self.product_list[-1].pk),
+            Product.Status.INACTIVE,
+        )
+        response = self.client.get(
+            url, HTTP_IF_NONE_MATCH=etag, HTTP_IF_MODIFIED_SINCE=last_modified
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response["ETag"], etag)
+        self.assertGreaterEqual(
+            parsedate_to_datetime(response["Last-Modified"]),
+            parsedate_to_datetime(last_modified),
+        )
+
+    def test_product_list_per_user(self):
+        url = reverse("product_list")
+        self.client.get(url)
+        anonymous_etag = self.client.get(url)["ETag"]
+
+        self.client.force_login(self.user)
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=anonymous_etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response["ETag"], anonymous_etag)
+
+    def test_order_detail(self):
+        self.client.force_login(self.user)
+        order = create_order(self.user)
+        url = reverse("order_detail", args=[order.pk])
+
+        self.client.get(url)
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertIn("Cookie", response["Vary"])
+        etag = response["ETag"]
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+        self.assertTrue(order.transition(Order.Status.CANCELLED))
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+
+
+class ProductListApiTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        category = Category.objects.create(name="분류")
+        cls.product_list = [
+            Product.objects.create(
+                category=category,
+                name=f"상품 {i}",
+                price=1000 * i,
+                status=Product.Status.ACTIVE,
+            )
+            for i in range(5)
+        ]
+
+    def setUp(self):
+        cache.clear()
+
+    def test_cursor(self):
+        self.assertEqual(decode_cursor(encode_cursor(12345)), 12345)
+        for cursor in ["!!", "YWJj", "가나"]:
+            with self.assertRaises(InvalidCursor):
+                decode_cursor(cursor)
+
+    def test_paging(self):
+        url = reverse("product_list_api")
+        pk_list = []
+        cursor = ""
+        while True:
+            response = self.client.get(
+                url, {"limit": 2, "cursor": cursor, "fields": "id,name,unknown"}
+            )
+            self.assertEqual(response.status_code, 200)
+            data = response.json()
+            for row in data["results"]:
+                self.assertEqual(set(row), {"id", "name"})
+            pk_list.extend(row["id"] for row in data["results"])
+            cursor = data["next_cursor"]
+            if cursor is None:
+                break
+
+        expected = sorted((product.pk for product in self.product_list), reverse=True)
+        self.assertEqual(pk_list, expected)
+
+    def test_invalid_cursor(self):
+        response = self.client.get(reverse("product_list_api"), {"cursor": "!!"})
+        self.assertEqual(response.status_code, 400)
+
+    def test_cache(self):
+        url = reverse("product_list_api")
+        response = self.client.get(url)
+        self.assertEqual(len(response.json()["results"]), 5)
+        self.assertEqual(response["Cache-Control"], "public, max-age=10")
+
+        # 캐시된 응답 본문을 사용하므로 목록 버전 조회 1회만 실행합니다.
+        with self.assertNumQueries(1):
+            self.assertEqual(self.client.get(url).content, response.content)
+
+        # 상품이 수정되면 목록 버전이 바뀌어 새로 렌더링합니다.
+        product = self.product_list[0]
+        product.name = "변경된 상품"
+        product.save()
+        data = self.client.get(url).json()
+        self.assertIn("변경된 상품", [row["name"] for row in data["results"]])
+
+
+class LoadTestEndpointStatsTest(TestCase):
+    def test_request(self):
+        client = mock.Mock()
+        client.get.side_effect = [
+            HttpResponse("ok"),
+            HttpResponse(status=404),
+            ValueError("boom"),
+            OperationalError("database table is locked"),
+            ValueError("boom"),
+            KeyError("key"),
+        ]
+        stats = EndpointStats()
+        result_list = [stats.request(client, "order_new", "get", "/") for _ in range(6)]
+
+        self.assertEqual(result_list[0].status_code, 200)
+        self.assertEqual(result_list[1:], [None] * 5)
+        self.assertEqual(len(stats.duration_dict["order_new"]), 6)
+        self.assertEqual(stats.error_dict["order_new"], 4)
+        self.assertEqual(stats.lock_error_dict["order_new"], 1)
+        self.assertEqual(
+            stats.exception_dict["order_new"], {"ValueError": 2, "KeyError": 1}
+        )
+
+
+class LoadTestTeardownTest(TestCase):
+    def test_teardown_data(self):
+        category = Category.objects.create(name="분류")
+        product = Product.objects.create(
+            category=category, name="상품", price=1000, status=Product.Status.ACTIVE
+        )
+        buyer = User.objects.create_user(username="buyer", email="buyer@example.com")
+        CartProduct.objects.create(user=buyer, product=product)
+        Order.create_from_cart(buyer, CartProduct.objects.filter(user=buyer))
+        rollup = list(
+            DailyOrderStatusSales.objects.values_list("date", "status", "order_count")
+        )
+
+        command = LoadTestCheckoutCommand(stdout=StringIO())
+        command.options = {"scenario": "flash-sale", "users": 2}
+        user_list, product_list = command.setup_data()
+        for user in user_list:
+            CartProduct.objects.create(user=user, product=product_list[0])
+            Order.create_from_cart(user, CartProduct.objects.filter(user=user))
+        command.teardown_data(user_list, product_list)
+
+        # 테스트 주문이 집계에 남긴 수치는 되돌리고 다른 주문의 집계는 유지합니다.
+        self.assertEqual(
+            list(
+                DailyOrderStatusSales.objects.exclude(order_count=0).values_list(
+                    "date", "status", "order_count"
+                )
+            ),
+            rollup,
+        )
+
+
+def make_png(color: str) -> bytes:
+    buffer = BytesIO()
+    Image.new("RGB", (2, 2), color).save(buffer, "PNG")
+    return buffer.getvalue()
+
+
+class ProductPhotoStorageTest(TestCase):
+    def setUp(self):
+        temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(temp_dir.cleanup)
+        media_root = override_settings(MEDIA_ROOT=temp_dir.name)
+        media_root.enable()
+        self.addCleanup(media_root.disable)
+        self.category = Category.objects.create(name="분류")
+
+    def create_product(self, content: bytes) -> Product:
+        with self.captureOnCommitCallbacks(execute=True):
+            return Product.objects.create(
+                category=self.category,
+                name="상품",
+                price=1000,
+                photo=ContentFile(content, "photo.png"),
+            )
+
+    def get_ref_count_dict(self) -> dict:
+        return dict(StoredFile.objects.values_list("name", "ref_count"))
+
+    def test_shared_file(self):
+        first = self.create_product(make_png("red"))
+        second = self.create_product(make_png("red"))
+        name = first.photo.name
+        self.assertEqual(second.photo.name, name)
+        self.assertEqual(self.get_ref_count_dict(), {name: 2})
+
+        with self.captureOnCommitCallbacks(execute=True):
+            first.delete()
+        self.assertEqual(self.get_ref_count_dict(), {name: 1})
+        self.assertTrue(second.photo.storage.exists(name))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            second.delete()
+        self.assertEqual(self.get_ref_count_dict(), {})
+        self.assertFalse(second.photo.storage.exists(name))
+
+    @override_settings(
+        TENANTS={
+            "shop2": {"hosts": ["shop2.example.com"], "database_url": "sqlite://"}
+        },
+        DATABASE_ROUTERS=["mall.tenants.TenantRouter"],
+    )
+    def test_shared_between_tenants(self):
+        tenant_registry.reset()
+        self.addCleanup(tenant_registry.reset)
+        storage = get_product_photo_storage()
+        name = storage.save(
+            "mall/product/photo/photo.png", ContentFile(make_png("red"))
+        )
+        with use_tenant(tenant_registry.get("shop2")):
+            self.assertEqual(
+                storage.save(
+                    "mall/product/photo/photo.png", ContentFile(make_png("red"))
+                ),
+                name,
+            )
+        self.assertEqual(self.get_ref_count_dict(), {name: 2})
+
+        # 같은 파일을 참조하는 다른 테넌트가 있으므로 파일을 지우지 않습니다.
+        with use_tenant(tenant_registry.get("shop2")):
+            storage.delete(name)
+        self.assertEqual(self.get_ref_count_dict(), {name: 1})
+        self.assertTrue(storage.exists(name))
+
+    def test_save_same_content(self):
+        product = Product.objects.get(pk=self.create_product(make_png("red")).pk)
+        name = product.photo.name
+
+        with self.captureOnCommitCallbacks(execute=True):
+            product.photo.save("other.png", ContentFile(make_png("red")))
+        with self.captureOnCommitCallbacks(execute=True):
+            product.photo = ContentFile(make_png("red"), "other.png")
+            product.save()
+        self.assertEqual(product.photo.name, name)
+        self.assertEqual(self.get_ref_count_dict(), {name: 1})
+
+    def test_replace(self):
+        product = self.create_product(make_png("red"))
+        old_name = product.photo.name
+
+        with self.captureOnCommitCallbacks(execute=True):
+            product.photo.save("photo.png", ContentFile(make_png("blue")))
+        self.assertEqual(self.get_ref_count_dict(), {product.photo.name: 1})
+        self.assertFalse(product.photo.storage.exists(old_name))
+
+    def test_save_without_photo_query(self):
+        product = Product.objects.get(pk=self.create_product(make_png("red")).pk)
+        # 조회 시점의 사진 경로와 비교하므로 사진을 다시 조회하지 않습니다.
+        with self.assertNumQueries(1):
+            product.save()
+        with self.assertNumQueries(1):
+            product.save(update_fields=["name"])
+
+
+class LazyImportTest(TestCase):
+    code = """
+import sys
+import django
+django.setup()
+from django.urls import get_resolver
+get_resolver().url_patterns
+import mall.tasks, mall.views
+print(",".join(name for name in ["iamport", "requests", "debug_toolbar"] if name in sys.modules))
+"""
+
+    def get_imported_list(self, debug_toolbar: bool) -> list:
+        env = {
+            **os.environ,
+            "DJANGO_SETTINGS_MODULE": "mysite.settings",
+            "DEBUG_TOOLBAR": str(debug_toolbar),
+        }
+        result = subprocess.run(
+            [sys.executable, "-c", self.code],
+            cwd=settings.BASE_DIR,
+            env=env,
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+        return [name for name in result.stdout.strip().split(",") if name]
+
+    def test_lazy_imports(self):
+        # PortOne 클라이언트(iamport/requests)는 처음 사용할 때 import 합니다.
+        self.assertEqual(self.get_imported_list(debug_toolbar=False), [])
+        self.assertEqual(self.get_imported_list(debug_toolbar=True), ["debug_toolbar"])
+
+    def test_importtime_command(self):
+        stdout = StringIO()
+        call_command("importtime", "mall.views", repeat=1, limit=3, stdout=stdout)
+        self.assertIn("django.setup() 까지 소요시간", stdout.getvalue())
+        self.assertIn("django", stdout.getvalue())
+
+
+class StaticFilesTest(TestCase):
+    def setUp(self):
+        temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(temp_dir.cleanup)
+        static_settings = override_settings(
+            STATIC_ROOT=temp_dir.name,
+            STORAGES={
+                **settings.STORAGES,
+                "staticfiles": {
+                    "BACKEND": "mall.staticfiles.CompressedManifestStaticFilesStorage"
+                },
+            },
+        )
+        static_settings.enable()
+        self.addCleanup(static_settings.disable)
+        call_command("collectstatic", interactive=False, verbosity=0)
+
+        self.middleware = StaticFilesMiddleware(lambda request: HttpResponse("app"))
+        self.name = "admin/css/base.css"
+        self.hashed_name = staticfiles_storage.stored_name(self.name)
+
+    def get(self, name, **extra):
+        request = RequestFactory().get(f"/static/{name}", **extra)
+        return self.middleware(request)
+
+    def test_collectstatic(self):
+        self.assertNotEqual(self.hashed_name, self.name)
+        self.assertTrue(staticfiles_storage.exists(self.hashed_name + ".gz"))
+        with staticfiles_storage.open(self.hashed_name) as f:
+            data = f.read()
+        with staticfiles_storage.open(self.hashed_name + ".gz") as f:
+            self.assertEqual(gzip.decompress(f.read()), data)
+
+    def test_serve(self):
+        response = self.get(self.hashed_name, HTTP_ACCEPT_ENCODING="gzip, br")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["Content-Type"], "text/css")
+        self.assertEqual(response["Content-Encoding"], "gzip")
+        self.assertEqual(response["Vary"], "Accept-Encoding")
+        self.assertEqual(
+            response["Cache-Control"], StaticFilesMiddleware.immutable_cache_control
+        )
+        with staticfiles_storage.open(self.hashed_name) as f:
+            self.assertEqual(
+                gzip.decompress(b"".join(response.streaming_content)), f.read()
+            )
+        response.close()
+        last_modified = response["Last-Modified"]
+
+        response = self.get(self.name)
+        self.assertNotIn("Content-Encoding", response)
+        self.assertEqual(
+            response["Cache-Control"], f"public, max-age={settings.STATIC_MAX_AGE}"
+        )
+        response.close()
+
+        # 같은 파일(.gz)의 Last-Modified 로 조건부 요청을 보내야 304 가 보장됩니다.
+        response = self.get(
+            self.hashed_name,
+            HTTP_ACCEPT_ENCODING="gzip, br",
+            HTTP_IF_MODIFIED_SINCE=last_modified,
+        )
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response["Vary"], "Accept-Encoding")
+        self.assertEqual(
+            response["Cache-Control"], StaticFilesMiddleware.immutable_cache_control
+        )
+
+    def test_not_found(self):
+        for name in ["admin/css/unknown.css", "../settings.py", "admin/css/"]:
+            self.assertEqual(self.get(name).status_code, 404)
+        # STATIC_URL 밖의 요청은 다음 미들웨어로 넘깁니다.
+        request = RequestFactory().get("/")
+        self.assertEqual(self.middleware(request).content, b"app")
+
+
+class CartToOrderQueryCountTest(TestCase):
+    """
+    장바구니 -> 주문 -> 결제 생성의 쿼리 수가 장바구니 크기와 무관하게 일정한지 확인합니다.
+    N+1 조회가 다시 생기면 큰 장바구니에서 쿼리 수가 달라져 실패합니다.
+    """
+
+    cart_size_list = [1, 10, 100, 1000]
+    # 장바구니 크기별 허용 시간(초). 쿼리 수 회귀를 잡는 것이 목적이므로 여유 있게 둡니다.
+    max_seconds = {1: 1, 10: 1, 100: 2, 1000: 5}
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(
+            username="buyer", password="password", email="buyer@example.com"
+        )
+        category = Category.objects.create(name="분류")
+        cls.product_list = Product.objects.bulk_create(
+            Product(
+                category=category,
+                name=f"상품 {i}",
+                price=1000 + i,
+                status=Product.Status.ACTIVE,
+            )
+            for i in range(max(cls.cart_size_list))
+        )
+
+    def reset(self, size: int):
+        # 매 측정을 같은 조건(캐시 미스, 빈 집계 테이블)에서 시작합니다.
+        CartProduct.objects.all().delete()
+        OrderPayment.objects.all().delete()
+        Order.objects.all().delete()
+        DailyOrderStatusSales.objects.all().delete()
+        product_snapshot_store.clear()
+        cache.clear()
+
+        CartProduct.objects.bulk_create(
+            CartProduct(user=self.user, product=product, quantity=2)
+            for product in self.product_list[:size]
+        )
+
+    def get_extra_insert_count(self, size: int) -> int:
+        """DB 의 최대 파라미터 수 때문에 bulk_create 가 나눠서 INSERT 하는 추가 쿼리 수"""
+        field_list = [
+            field
+            for field in OrderedProduct._meta.concrete_fields
+            if not field.primary_key
+        ]
+        batch_size = connection.ops.bulk_batch_size(field_list, [None] * size)
+        return math.ceil(size / batch_size) - 1
+
+    def assert_constant_queries(self, num: int, func, prepare=None):
+        for size in self.cart_size_list:
+            with self.subTest(cart_size=size):
+                self.reset(size)
+                if prepare is None:
+                    arg = None
+                    num_queries = num + self.get_extra_insert_count(size)
+                else:
+                    # 준비 단계(주문 생성)는 측정하지 않습니다.
+                    arg = prepare()
+                    num_queries = num
+                started_at = time.perf_counter()
+                with self.assertNumQueries(num_queries):
+                    func(arg)
+                self.assertLess(
+                    time.perf_counter() - started_at, self.max_seconds[size]
+                )
+                # 주문 상품 수로 장바구니 크기만큼 처리되었는지 확인합니다.
+                self.assertEqual(OrderedProduct.objects.count(), size)
+
+    def create_order(self) -> Order:
+        cart_product_qs = CartProduct.objects.filter(user=self.user)
+        return Order.create_from_cart(self.user, cart_product_qs)
+
+    def test_create_from_cart(self):
+        # 장바구니+상품 버전 조회, 스냅샷 조회, SAVEPOINT, 주문 INSERT, 주문상품 INSERT,
+        # 일별 상태 집계(SAVEPOINT, UPDATE, SAVEPOINT, INSERT, RELEASE x2), RELEASE
+        self.assert_constant_queries(12, lambda _: self.create_order())
+
+    def test_order_new(self):
+        self.client.force_login(self.user)
+
+        def order_new(_):
+            response = self.client.get(reverse("order_new"))
+            self.assertEqual(response.status_code, 302)
+
+        # 세션, 사용자, SAVEPOINT, 주문 생성(12), 장바구니 DELETE, RELEASE SAVEPOINT
+        self.assert_constant_queries(17, order_new)
+
+    def test_create_from_cart_rollback(self):
+        self.reset(2)
+        # 매출 집계가 실패하면 주문도 함께 롤백되어 집계와 주문 테이블이 어긋나지 않습니다.
+        with mock.patch(
+            "reports.signals.apply_order_transition", side_effect=ValueError("집계 실패")
+        ):
+            with self.assertRaises(ValueError):
+                self.create_order()
+        self.assertFalse(Order.objects.exists())
+        self.assertFalse(OrderedProduct.objects.exists())
+
+    def test_create_by_order(self):
+        # 주문 생성 직후에는 name 계산에 필요한 값이 채워져 있어 INSERT 만 실행됩니다.
+        self.assert_constant_queries(
+            1, lambda order: OrderPayment.create_by_order(order), self.create_order
+        )
+
+    def test_create_by_order_name(self):
+        for size in self.cart_size_list:
+            with self.subTest(cart_size=size):
+                self.reset(size)
+                order = self.create_order()
+                expected_name = f"상품 {size - 1}" + (
+                    f" 외 {size - 1}건" if size > 1 else ""
+                )
+                self.assertEqual(
+                    OrderPayment.create_by_order(order).name, expected_name
+                )
+
+                order_qs = Order.annotate_name(Order.objects.select_related("user"))
+                order = order_qs.get(pk=order.pk)
+                with self.assertNumQueries(1):
+                    payment = OrderPayment.create_by_order(order)
+                self.assertEqual(payment.name, expected_name)
+
+    def test_order_pay(self):
+        self.client.force_login(self.user)
+
+        def order_pay(order):
+            response = self.client.get(reverse("order_pay", args=[order.pk]))
+            self.assertEqual(response.status_code, 200)
+
+        # 세션, 사용자, 주문(+name 서브쿼리), 재사용할 결제 조회, 결제 INSERT
+        self.assert_constant_queries(5, order_pay, self.create_order)
+
+
+@override_settings(
+    TENANTS={
+        "shop2": {
+            "hosts": ["shop2.example.com"],
+            "portone_shop_id": "imp2",
+            "database_url": "sqlite://:memory:",
+        }
+    },
+    ALLOWED_HOSTS=["testserver", "shop2.example.com"],
+)
+class TenantTest(TestCase):
+    def setUp(self):
+        tenant_registry.reset()
+        self.addCleanup(tenant_registry.reset)
+        cache.clear()
+
+    def test_resolve_by_host(self):
+        self.assertIsNone(tenant_registry.get_by_host("testserver"))
+        tenant = tenant_registry.get_by_host("SHOP2.example.com:8000")
+        self.assertEqual(tenant.slug, "shop2")
+        self.assertEqual(tenant.portone_shop_id, "imp2")
+
+        response = self.client.get(
+            reverse("product_list"), HTTP_HOST="shop2.example.com"
+        )
+        self.assertEqual(response.wsgi_request.tenant, tenant)
+        self.assertTrue(get_current_tenant().is_default)
+
+    @override_settings(TENANT_STRICT_HOST=True)
+    def test_strict_host(self):
+        self.assertEqual(self.client.get(reverse("product_list")).status_code, 404)
+
+    def test_cache_key(self):
+        cache.set("key", "default")
+        with use_tenant(tenant_registry.get("shop2")):
+            self.assertIsNone(cache.get("key"))
+            cache.set("key", "shop2")
+        self.assertEqual(cache.get("key"), "default")
+
+    def test_router(self):
+        router = TenantRouter()
+        self.assertIsNone(router.db_for_read(Product))
+        with use_tenant(tenant_registry.get("shop2")):
+            self.assertEqual(router.db_for_read(Product), "tenant_shop2")
+            self.assertEqual(router.db_for_write(Order), "tenant_shop2")
+            # 작업 테이블과 저장 파일 참조 수는 모든 테넌트가 default DB 에서 공유합니다.
+            self.assertEqual(router.db_for_write(Job), "default")
+            self.assertEqual(router.db_for_write(StoredFile), "default")
+        self.assertFalse(router.allow_migrate("tenant_shop2", "jobs"))
+        self.assertFalse(
+            router.allow_migrate("tenant_shop2", "mall", model_name="storedfile")
+        )
+        self.assertIsNone(
+            router.allow_migrate("tenant_shop2", "mall", model_name="product")
+        )
+
+    def test_check(self):
+        id_list = [message.id for message in check_tenants(None)]
+        # PortOne 인증정보가 없습니다.
+        self.assertEqual(id_list, ["mall.E004", "mall.I003"])
+
+        # 전용 DB 없이 기본 DB 를 함께 사용할 수 없습니다.
+        tenant_dict = {"shop3": {"hosts": ["shop3.example.com"]}}
+        with override_settings(TENANTS=tenant_dict):
+            message_list = check_tenants(None)
+            self.assertEqual([message.id for message in message_list], ["mall.E003"])
+            self.assertIn("database_url", message_list[0].msg)
+            with self.assertRaises(ImproperlyConfigured):
+                tenant_registry.get("shop3")
+
+
+class PaymentEventTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        user = User.objects.create_user(
+            username="buyer", password="password", email="buyer@example.com"
+        )
+        product = Product.objects.create(
+            category=Category.objects.create(name="분류"),
+            name="상품",
+            price=1000,
+            status=Product.Status.ACTIVE,
+        )
+        CartProduct.objects.create(user=user, product=product, quantity=1)
+        order = Order.create_from_cart(user, CartProduct.objects.filter(user=user))
+        cls.payment = OrderPayment.create_by_order(order)
+
+    def test_webhook(self):
+        payload = {"merchant_uid": self.payment.merchant_uid, "status": "paid"}
+        with mock.patch("mall.views.update_order_payment.delay") as delay:
+            response = self.client.post(
+                reverse("webhook"),
+                json.dumps(payload),
+                content_type="application/json",
+                REMOTE_ADDR=settings.PORTONE_WEBHOOK_IPS[0],
+            )
+        self.assertEqual(response.status_code, 200)
+        delay.assert_called_once_with(payment_pk=self.payment.pk)
+
+        event = PaymentEvent.objects.get()
+        self.assertEqual(event.kind, PaymentEvent.Kind.WEBHOOK)
+        self.assertEqual(event.payload, payload)
+        with self.assertRaises(ValueError):
+            event.save()
+
+    def test_replay_response(self):
+        merchant_uid = self.payment.merchant_uid
+        response = {"merchant_uid": merchant_uid, "status": "paid", "amount": 1000}
+        PaymentEvent.record(PaymentEvent.Kind.WEBHOOK, {**response, "amount": None})
+        PaymentEvent.record(PaymentEvent.Kind.RESPONSE, response)
+        get_response = PaymentEvent.get_replay_response_dict
+        self.assertEqual(get_response([merchant_uid]), {merchant_uid: response})
+
+        # 저장된 응답 이후에 다른 상태의 웹훅을 받았다면 PortOne 을 다시 조회해야 합니다.
+        PaymentEvent.record(
+            PaymentEvent.Kind.WEBHOOK, {**response, "status": "cancelled"}
+        )
+        self.assertEqual(get_response([merchant_uid]), {merchant_uid: None})
+
+    def test_record_invalid_payload(self):
+        payload = {
+            "merchant_uid": "m" * 100,
+            "imp_uid": 12345,
+            "status": "s" * 100,
+            "amount": 2**40,
+        }
+        event = PaymentEvent.record(PaymentEvent.Kind.WEBHOOK, payload)
+        event.refresh_from_db()
+        # 조회용 컬럼은 길이에 맞게 자르고, 원본은 그대로 보존합니다.
+        self.assertEqual(event.merchant_uid, "m" * 40)
+        self.assertEqual(event.imp_uid, "12345")
+        self.assertEqual(event.status, "s" * 20)
+        self.assertIsNone(event.amount)
+        self.assertEqual(event.payload, payload)
+
+
+class SequentialThreadExecutor:
+    """
+    제출한 작업을 새 스레드에서 바로 끝까지 실행합니다. 작업 스레드는 자신의 DB 연결을 닫으므로
+    별도 스레드가 필요하고, 테스트 DB(SQLite 메모리 DB)에서 잠금 오류가 나지 않도록 동시에 실행하지 않습니다.
+    """
+
+    def __init__(self, max_workers):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        pass
+
+    def submit(self, func, *args):
+        future = Future()
+
+        def run():
+            try:
+                future.set_result(func(*args))
+            except Exception as e:
+                future.set_exception(e)
+
+        thread = threading.Thread(target=run)
+        thread.start()
+        thread.join()
+        return future
+
+
+@mock.patch(
+    "mall.management.commands.replay_payment_events.ThreadPoolExecutor",
+    SequentialThreadExecutor,
+)
+class ReplayPaymentEventsTest(TransactionTestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username="buyer", password="password", email="buyer@example.com"
+        )
+        self.payment_list = [
+            OrderPayment.create_by_order(create_order(self.user)) for _ in range(3)
+        ]
+
+    def record(self, payment: OrderPayment, kind: str, status: str) -> PaymentEvent:
+        return PaymentEvent.record(
+            kind,
+            {
+                "merchant_uid": payment.merchant_uid,
+                "status": status,
+                "amount": payment.desired_amount,
+            },
+        )
+
+    def replay(self, *args, api=None) -> str:
+        stdout = StringIO()
+        api = api or FakePortoneApi()
+        with mock.patch.object(OrderPayment, "api", property(lambda payment: api)):
+            with mock.patch.object(
+                OrderPayment, "update", autospec=True, side_effect=OrderPayment.update
+            ) as update:
+                call_command("replay_payment_events", *args, stdout=stdout)
+        self.update_list = [call.args[0].merchant_uid for call in update.call_args_list]
+        return stdout.getvalue()
+
+    def get_order_status_list(self):
+        return [
+            Order.objects.get(pk=payment.order_id).status
+            for payment in self.payment_list
+        ]
+
+    def test_replay(self):
+        first, second, third = self.payment_list
+        Kind = PaymentEvent.Kind
+        self.record(first, Kind.WEBHOOK, "paid")
+        self.record(first, Kind.RESPONSE, "paid")
+        self.record(second, Kind.RESPONSE, "failed")
+        self.record(first, Kind.WEBHOOK, "paid")
+        self.record(third, Kind.RESPONSE, "cancelled")
+        PaymentEvent.record(Kind.WEBHOOK, {"merchant_uid": "unknown"})
+
+        output = self.replay("--batch-size=2")
+        # 여러 배치에 걸친 같은 결제는 한 번만 처리합니다.
+        self.assertEqual(
+            sorted(self.update_list),
+            sorted(payment.merchant_uid for payment in self.payment_list),
+        )
+        self.assertIn("저장된 응답으로 처리: 3건", output)
+        self.assertIn("결제 없음: 1건", output)
+        self.assertIn(f"다음 offset: {PaymentEvent.objects.last().pk + 1}", output)
+        self.assertEqual(
+            self.get_order_status_list(),
+            [Order.Status.PAID, Order.Status.FAILED_PAYMENT, Order.Status.CANCELLED],
+        )
+
+    def test_offset_until(self):
+        first, second, third = self.payment_list
+        Kind = PaymentEvent.Kind
+        self.record(first, Kind.RESPONSE, "paid")
+        start = self.record(second, Kind.RESPONSE, "paid")
+        end = self.record(third, Kind.RESPONSE, "paid")
+        self.record(second, Kind.RESPONSE, "paid")
+
+        output = self.replay(f"--offset={start.pk}", f"--until={end.pk}")
+        self.assertEqual(
+            sorted(self.update_list), sorted([second.merchant_uid, third.merchant_uid])
+        )
+        self.assertIn(f"다음 offset: {end.pk + 1}", output)
+
+    def test_offline_and_dry_run(self):
+        first, second, _ = self.payment_list
+        Kind = PaymentEvent.Kind
+        self.record(first, Kind.RESPONSE, "paid")
+        # 저장된 응답 없이 웹훅만 받은 결제는 PortOne 을 다시 조회해야 합니다.
+        self.record(second, Kind.WEBHOOK, "paid")
+        api = FakePortoneApi(
+            {
+                second.merchant_uid: {
+                    "merchant_uid": second.merchant_uid,
+                    "status": "paid",
+                    "amount": second.desired_amount,
+                }
+            }
+        )
+
+        output = self.replay("--dry-run", api=api)
+        self.assertIn("저장된 응답으로 처리: 1건, PortOne 조회 후 처리: 1건", output)
+        self.assertEqual(self.update_list, [])
+        self.assertEqual(api.find_list, [])
+
+        output = self.replay("--offline", api=api)
+        self.assertIn("건너뜀: 1건", output)
+        self.assertEqual(self.update_list, [first.merchant_uid])
+        self.assertEqual(api.find_list, [])
+
+        output = self.replay(api=api)
+        self.assertIn("PortOne 조회 후 처리: 1건", output)
+        self.assertEqual(api.find_list, [second.merchant_uid])
+        self.assertEqual(
+            self.get_order_status_list()[:2], [Order.Status.PAID, Order.Status.PAID]
+        )
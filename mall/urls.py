@@ -4,6 +4,7 @@ from mall import views
 
 urlpatterns = [
     path("", views.product_list, name="product_list"),
+    path("api/products/", views.product_list_api, name="product_list_api"),
     path("cart/", views.cart_detail, name="cart_detail"),
     path("cart/<int:product_pk>/add/", views.add_to_cart, name="add_to_cart"),
     path("orders/", views.order_list, name="order_list"),
@@ -16,4 +17,5 @@ urlpatterns = [
     ),
     path("orders/<int:pk>/", views.order_detail, name="order_detail"),
     path("webhook/", views.portone_webhook, name="webhook"),
+    path("metrics/portone/", views.portone_metrics, name="portone_metrics"),
 ]
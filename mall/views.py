@@ -1,36 +1,138 @@
+import hashlib
 import json
+from typing import Optional
+from uuid import UUID
 from django.conf import settings
-from django.forms import modelformset_factory
+from django.core.paginator import Paginator
 from django.shortcuts import render
 from django.urls import reverse
-from mall.models import Product, CartProduct, Order, OrderPayment
+from mall.models import Product, CartProduct, Order, OrderPayment, PaymentEvent
+from archive.models import ArchivedOrder
 from django.views.generic import ListView
 from django.contrib.auth.decorators import login_required
 from django.views.decorators.csrf import csrf_exempt
 from django.shortcuts import get_object_or_404, redirect
 from django.contrib import messages
-from mall.forms import CartProductForm
-from django.views.decorators.http import require_POST
-from django.http import HttpResponse
+from mall.forms import CartProductFormSet
+from django.views.decorators.http import require_POST, condition
+from django.db import router, transaction
+from django.db.models import Count, Max, Q
+from django.http import HttpResponse, JsonResponse
+from django.views.decorators.cache import cache_control
+from django.views.decorators.vary import vary_on_cookie
 from mall.decorators import deny_from_untrusted_hosts
+from mall.catalog import InvalidCursor, product_page_cache
+from mall.routers import read_from_replica
+from mall.tasks import update_order_payment
+from mall import portone
+from mall.portone import PortoneUnavailable
+import logging
+
+
+logger = logging.getLogger(__name__)
+
+
+def make_etag(request, *parts) -> Optional[str]:
+    """
+    상품/주문 정보뿐 아니라 base.html 의 공통 영역(로그인 사용자, CSRF 토큰)이 바뀌어도 ETag 가 바뀌도록 합니다.
+    표시할 메시지가 남아있으면 반드시 렌더링해야 하므로 ETag 를 만들지 않습니다.
+    """
+    if len(messages.get_messages(request)) > 0:
+        return None
+    value = "|".join(
+        str(part)
+        for part in (
+            request.get_full_path(),
+            request.user.pk,
+            request.COOKIES.get(settings.CSRF_COOKIE_NAME, ""),
+            *parts,
+        )
+    )
+    return hashlib.md5(value.encode(), usedforsecurity=False).hexdigest()
+
+
+def get_product_list_stats(request) -> dict:
+    # etag_func 와 last_modified_func 에서 함께 사용하므로 요청당 1회만 조회합니다.
+    if not hasattr(request, "_product_list_stats"):
+        # 최종 수정 시각은 판매중인 상품만이 아닌 전체 상품에서 구합니다. 판매중이던 상품이 숨겨지거나
+        # 검색어와 맞지 않게 바뀌어도 그 상품의 updated_at 이 반영되어 Last-Modified 가 뒤로 가지 않습니다.
+        # 상품 삭제는 count 가 바뀌므로 ETag 로 감지합니다.
+        active_q = Q(status=Product.Status.ACTIVE)
+        query = request.GET.get("query", "")
+        if query:
+            active_q &= Q(name__icontains=query)
+        request._product_list_stats = Product.objects.aggregate(
+            last_modified=Max("updated_at"), count=Count("pk", filter=active_q)
+        )
+    return request._product_list_stats
+
+
+def product_list_etag(request, *args, **kwargs):
+    stats = get_product_list_stats(request)
+    return make_etag(request, stats["last_modified"], stats["count"])
+
+
+def product_list_last_modified(request, *args, **kwargs):
+    return get_product_list_stats(request)["last_modified"]
 
 
 class ProductListView(ListView):
     model = Product
-    queryset = Product.objects.filter(status=Product.Status.ACTIVE).select_related(
-        "category"
-    )
     paginate_by = 4
 
     def get_queryset(self):
-        qs = super().get_queryset()
-        query = self.request.GET.get("query", "")
-        if query:
-            qs = qs.filter(name__icontains=query)
-        return qs
+        return Product.get_active_qs(self.request.GET.get("query", ""))
 
 
-product_list = ProductListView.as_view()
+# 응답이 로그인 사용자에 따라 다르므로, 공유 캐시가 다른 사용자의 응답을 재사용하지 않도록 Vary: Cookie 를 지정합니다.
+product_list = read_from_replica(
+    vary_on_cookie(
+        condition(
+            etag_func=product_list_etag,
+            last_modified_func=product_list_last_modified,
+        )(ProductListView.as_view())
+    )
+)
+
+
+def product_list_api_etag(request, *args, **kwargs):
+    # 사용자별 정보가 없는 응답이므로 사용자/CSRF 쿠키는 ETag 에 포함하지 않습니다.
+    stats = get_product_list_stats(request)
+    value = f"{request.get_full_path()}|{stats['last_modified']}|{stats['count']}"
+    return hashlib.md5(value.encode(), usedforsecurity=False).hexdigest()
+
+
+@read_from_replica
+@cache_control(public=True, max_age=10)
+@condition(
+    etag_func=product_list_api_etag,
+    last_modified_func=product_list_last_modified,
+)
+def product_list_api(request):
+    """
+    무한 스크롤용 상품 목록 JSON API. ProductListView 와 같은 queryset 을 사용합니다.
+    ?cursor=<next_cursor>&limit=<개수>&fields=id,name,price 형식으로 요청합니다.
+    """
+    query = request.GET.get("query", "")
+    try:
+        limit = int(request.GET.get("limit", settings.PRODUCT_API_PAGE_SIZE))
+    except ValueError:
+        limit = settings.PRODUCT_API_PAGE_SIZE
+    limit = min(max(limit, 1), settings.PRODUCT_API_MAX_PAGE_SIZE)
+
+    stats = get_product_list_stats(request)
+    try:
+        payload = product_page_cache.get_payload(
+            Product.get_active_qs(query),
+            list_version=(stats["last_modified"], stats["count"]),
+            query=query,
+            cursor=request.GET.get("cursor", ""),
+            limit=limit,
+            fields=request.GET.get("fields", ""),
+        )
+    except InvalidCursor:
+        return JsonResponse({"error": "잘못된 cursor 입니다."}, status=400)
+    return HttpResponse(payload, content_type="application/json")
 
 
 @login_required
@@ -41,14 +143,8 @@ def cart_detail(request):
         .order_by("product__name")
     )
 
-    CartProductFormset = modelformset_factory(
-        model=CartProduct,
-        form=CartProductForm,
-        can_delete=True,
-        extra=0,
-    )
     if request.method == "POST":
-        formset = CartProductFormset(
+        formset = CartProductFormSet(
             data=request.POST,
             queryset=cart_product_qs,
         )
@@ -57,7 +153,7 @@ def cart_detail(request):
             messages.success(request, "장바구니를 업데이트했습니다.")
             return redirect("cart_detail")
     else:
-        formset = CartProductFormset(queryset=cart_product_qs)
+        formset = CartProductFormSet(queryset=cart_product_qs)
 
     return render(
         request,
@@ -94,13 +190,38 @@ def add_to_cart(request, product_pk):
 
 
 @login_required
+@read_from_replica
 def order_list(request):
-    order_qs = Order.objects.all().filter(user=request.user)
+    # 보관된 주문도 같은 목록에 주문번호 역순으로 보여줍니다.
+    # 두 테이블의 pk 를 UNION 해 DB 에서 정렬/페이징하고, 현재 페이지의 주문만 조회합니다.
+    pk_qs = (
+        Order.objects.filter(user=request.user)
+        .order_by()
+        .values_list("pk", flat=True)
+        .union(
+            ArchivedOrder.objects.filter(user=request.user)
+            .order_by()
+            .values_list("pk", flat=True),
+            all=True,
+        )
+        .order_by("-pk")
+    )
+    page_obj = Paginator(pk_qs, settings.ORDER_LIST_PAGE_SIZE).get_page(
+        request.GET.get("page")
+    )
+    pk_list = list(page_obj)
+    order_dict = Order.annotate_name(Order.objects.all()).in_bulk(pk_list)
+    missing_pk_list = [pk for pk in pk_list if pk not in order_dict]
+    if missing_pk_list:
+        order_dict.update(ArchivedOrder.objects.in_bulk(missing_pk_list))
+    # 두 조회 사이에 삭제된 주문은 건너뜁니다.
+    order_list = [order_dict[pk] for pk in pk_list if pk in order_dict]
     return render(
         request,
         "mall/order_list.html",
         {
-            "order_list": order_qs,
+            "order_list": order_list,
+            "page_obj": page_obj,
         },
     )
 
@@ -108,21 +229,25 @@ def order_list(request):
 @login_required
 def order_new(request):
     cart_product_qs = CartProduct.objects.filter(user=request.user)
-    order = Order.create_from_cart(request.user, cart_product_qs)
-    cart_product_qs.delete()
+    # 주문/주문상품/매출 집계와 장바구니 비우기를 한 트랜잭션으로 커밋합니다.
+    with transaction.atomic(using=router.db_for_write(Order)):
+        order = Order.create_from_cart(request.user, cart_product_qs)
+        cart_product_qs.delete()
     return redirect("order_pay", order.pk)
 
 
 @login_required
 def order_pay(request, pk):
-    order = get_object_or_404(Order, pk=pk, user=request.user)
+    # 결제 생성 시 사용하는 order.name, order.user 를 추가 쿼리 없이 계산합니다.
+    order_qs = Order.annotate_name(Order.objects.select_related("user"))
+    order = get_object_or_404(order_qs, pk=pk, user=request.user)
 
     if not order.can_pay():
         messages.error(request, "결제할 수 없는 주문입니다.")
         return redirect(order)  # get_absolute_url()을 호출합니다.
         # return redirect("order_detail", order.pk)
 
-    payment = OrderPayment.create_by_order(order)
+    payment = OrderPayment.get_or_create_by_order(order)
 
     check_url = reverse("order_check", args=[order.pk, payment.pk])
 
@@ -139,7 +264,7 @@ def order_pay(request, pk):
         request,
         "mall/order_pay.html",
         {
-            "portone_shop_id": settings.PORTONE_SHOP_ID,
+            "portone_shop_id": request.tenant.portone_shop_id,
             "payment_props": payment_props,
             "next_url": check_url,
         },
@@ -149,14 +274,49 @@ def order_pay(request, pk):
 @login_required
 def order_check(request, order_pk, payment_pk):
     payment = get_object_or_404(OrderPayment, pk=payment_pk, order__pk=order_pk)
-    payment.update()
+    try:
+        payment.update()
+    except PortoneUnavailable as e:
+        # 결제 확인은 포트원 웹훅에서 처리되도록 미룹니다.
+        logger.warning("포트원 결제 확인 지연: %s", e)
+        messages.warning(request, "결제 확인이 지연되고 있습니다. 잠시 후 주문내역을 확인해주세요.")
     return redirect(payment.order)  # get_absolute_url()을 호출합니다.
     # return redirect("order_detail", order_pk)
 
 
+def get_order_updated_at(request, pk):
+    if not hasattr(request, "_order_updated_at"):
+        for model_cls in (Order, ArchivedOrder):
+            request._order_updated_at = (
+                model_cls.objects.filter(pk=pk, user=request.user)
+                .values_list("updated_at", flat=True)
+                .first()
+            )
+            if request._order_updated_at is not None:
+                break
+    return request._order_updated_at
+
+
+def order_detail_etag(request, pk):
+    updated_at = get_order_updated_at(request, pk)
+    return updated_at and make_etag(request, updated_at)
+
+
+def order_detail_last_modified(request, pk):
+    return get_order_updated_at(request, pk)
+
+
 @login_required
+@read_from_replica
+@vary_on_cookie
+@condition(
+    etag_func=order_detail_etag,
+    last_modified_func=order_detail_last_modified,
+)
 def order_detail(request, pk):
-    order = get_object_or_404(Order, pk=pk, user=request.user)
+    order = Order.objects.filter(pk=pk, user=request.user).first()
+    if order is None:
+        order = get_object_or_404(ArchivedOrder, pk=pk, user=request.user)
     return render(
         request,
         "mall/order_detail.html",
@@ -172,16 +332,36 @@ def order_detail(request, pk):
 def portone_webhook(request):
     if request.META["CONTENT_TYPE"] == "application/json":
         payload = json.loads(request.body)
-        merchant_uid = payload.get("merchant_uid")
     else:
-        merchant_uid = request.POST.get("merchant_uid")
+        payload = request.POST.dict()
+    merchant_uid = payload.get("merchant_uid")
 
     if not merchant_uid:
         return HttpResponse("merchant_uid 인자가 누락되었습니다.", status=400)
     elif merchant_uid == "merchant_123456789":
         return HttpResponse("test ok")
 
-    payment = get_object_or_404(OrderPayment, merchant_uid=merchant_uid)
-    payment.update()
+    # 처리 결과와 무관하게 먼저 기록해, 잘못 처리된 웹훅을 replay_payment_events 명령으로 다시 처리합니다.
+    PaymentEvent.record(PaymentEvent.Kind.WEBHOOK, payload)
+
+    try:
+        uid = UUID(str(merchant_uid))
+    except ValueError:
+        return HttpResponse("결제내역을 찾을 수 없습니다.", status=404)
+    # merchant_uid 는 uid 필드의 property 이므로 uid 로 조회합니다.
+    payment = get_object_or_404(OrderPayment, uid=uid)
+    try:
+        update_order_payment.delay(payment_pk=payment.pk)
+    except PortoneUnavailable:
+        # 포트원이 웹훅을 재전송하도록 실패 응답을 보냅니다.
+        return HttpResponse("포트원 결제내역을 확인할 수 없습니다.", status=503)
 
     return HttpResponse("ok")
+
+
+@deny_from_untrusted_hosts(settings.METRICS_ALLOWED_IPS)
+def portone_metrics(request):
+    return HttpResponse(
+        portone.metrics.export(portone.circuit_breakers),
+        content_type="text/plain; version=0.0.4",
+    )
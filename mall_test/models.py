@@ -1,8 +1,7 @@
 from django.db import models
 from uuid import uuid4
 from django.core.validators import MinValueValidator
-from iamport import Iamport
-from django.conf import settings
+from mall.tenants import get_current_tenant
 
 
 class Payment(models.Model):
@@ -32,9 +31,12 @@ class Payment(models.Model):
         return self.uid.hex
 
     def portone_check(self, commit=True):
+        from iamport import Iamport
+
+        tenant = get_current_tenant()
         api = Iamport(
-            imp_key=settings.PORTONE_API_KEY,
-            imp_secret=settings.PORTONE_API_SECRET,
+            imp_key=tenant.portone_api_key,
+            imp_secret=tenant.portone_api_secret,
         )
         meta = api.find(merchant_uid=self.merchant_uid)
         self.status = meta["status"]
@@ -2,7 +2,6 @@ from django.shortcuts import render, redirect, get_object_or_404
 from django.urls import reverse
 from mall_test.forms import PaymentForm
 from mall_test.models import Payment
-from django.conf import settings
 
 
 def payment_view(request):
@@ -25,13 +24,13 @@ def payment_view(request):
 def payment_pay(request, pk):
     payment = get_object_or_404(Payment, pk=pk)
     payment_props = {
-        "pg": settings.PORTONE_PG,
+        "pg": request.tenant.portone_pg,
         "merchant_uid": payment.merchant_uid,
         "name": payment.name,
         "amount": payment.amount,
     }
     payment_check_url = reverse("payment_check", args=[payment.pk])
-    portone_shop_id = settings.PORTONE_SHOP_ID
+    portone_shop_id = request.tenant.portone_shop_id
     return render(
         request,
         "mall_test/payment_pay.html",
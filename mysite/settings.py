@@ -51,18 +51,21 @@ INSTALLED_APPS = [
     "django.contrib.messages",
     "django.contrib.staticfiles",
     # Third-party
-    "debug_toolbar",
     "django_bootstrap5",
     "sorl.thumbnail",
     "widget_tweaks",
     # Local
     "accounts",
+    "archive",
+    "jobs",
     "mall",
     "mall_test",
+    "reports",
 ]
 
 MIDDLEWARE = [
-    "debug_toolbar.middleware.DebugToolbarMiddleware",
+    "mall.tenants.TenantMiddleware",
+    "mall.routers.ReplicaStickinessMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
@@ -70,6 +73,7 @@ MIDDLEWARE = [
     "django.contrib.auth.middleware.AuthenticationMiddleware",
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
+    "mall.templating.TemplateProfilerMiddleware",
 ]
 
 ROOT_URLCONF = "mysite.urls"
@@ -92,6 +96,23 @@ TEMPLATES = [
     },
 ]
 
+# 운영 모드에서는 cached loader 를 명시적으로 사용하고, wsgi/asgi 시작 시 모든 템플릿을 미리 컴파일합니다.
+TEMPLATE_PRODUCTION_MODE = env.bool("TEMPLATE_PRODUCTION_MODE", default=not DEBUG)
+if TEMPLATE_PRODUCTION_MODE:
+    TEMPLATES[0]["APP_DIRS"] = False
+    TEMPLATES[0]["OPTIONS"]["loaders"] = [
+        (
+            "django.template.loaders.cached.Loader",
+            [
+                "django.template.loaders.filesystem.Loader",
+                "django.template.loaders.app_directories.Loader",
+            ],
+        ),
+    ]
+
+# 템플릿/태그별 렌더링 시간을 로그와 Server-Timing 헤더로 남깁니다. (mall.templating)
+TEMPLATE_PROFILING = env.bool("TEMPLATE_PROFILING", default=False)
+
 WSGI_APPLICATION = "mysite.wsgi.application"
 
 
@@ -102,6 +123,128 @@ DATABASES = {
     "default": env.db("DATABASE_URL", default=f"sqlite:///{BASE_DIR / 'db.sqlite3'}"),
 }
 
+# 읽기 전용 카탈로그/이력 뷰(mall.routers.read_from_replica)의 쿼리를 보낼 replica.
+# DATABASE_REPLICA_URL 없이 DATABASE_REPLICA=True 이면 로컬 테스트용으로 두번째 SQLite 파일을 사용합니다.
+# (복제되지 않으므로 db.sqlite3 를 복사하거나 migrate --database=replica 로 준비합니다.)
+DATABASE_REPLICA_URL = env.str("DATABASE_REPLICA_URL", default="")
+DATABASE_REPLICA_ALIAS = "replica"
+DATABASE_REPLICA_STICKY_SECONDS = env.int("DATABASE_REPLICA_STICKY_SECONDS", default=5)
+DATABASE_ROUTERS = []
+
+if DATABASE_REPLICA_URL or env.bool("DATABASE_REPLICA", default=False):
+    DATABASES[DATABASE_REPLICA_ALIAS] = env.db_url_config(
+        DATABASE_REPLICA_URL or f"sqlite:///{BASE_DIR / 'db.replica.sqlite3'}"
+    )
+    DATABASES[DATABASE_REPLICA_ALIAS]["TEST"] = {"MIRROR": "default"}
+    DATABASE_ROUTERS.append("mall.routers.ReplicaRouter")
+
+# 멀티 테넌트 (mall.tenants)
+# 하나의 배포에서 여러 쇼핑몰을 운영합니다. Host 헤더로 테넌트를 찾고, 캐시 키와 PortOne 인증정보,
+# DB 를 테넌트별로 사용합니다. 등록되지 않은 호스트는 기본 테넌트(PORTONE_* 설정과 default DB)입니다.
+# TENANTS 환경변수에 JSON 으로 지정합니다. 각 테넌트는 database_url 로 지정한 전용 DB(tenant_<이름>)를 사용하며,
+# migrate --database=tenant_<이름> 으로 테이블을 생성합니다. (database_url 이 없으면 mall.E003)
+#   {"shop2": {"hosts": ["shop2.example.com"], "portone_shop_id": "...", "portone_api_key": "...",
+#              "portone_api_secret": "...", "portone_pg": "...", "database_url": "sqlite:///shop2.sqlite3"}}
+TENANTS = env.json("TENANTS", default={})
+TENANT_STRICT_HOST = env.bool("TENANT_STRICT_HOST", default=False)
+# 모든 테넌트가 default DB 에서 공유하는 앱
+TENANT_SHARED_APPS = ["jobs"]
+# 모든 테넌트가 default DB 에서 공유하는 모델
+# 상품 사진은 모든 테넌트가 같은 MEDIA_ROOT 의 내용 해시 경로를 사용하므로, 참조 수도 한 곳에서 관리해야
+# 한 테넌트의 상품 삭제가 다른 테넌트가 참조하는 파일을 지우지 않습니다. (mall.storage)
+TENANT_SHARED_MODELS = ["mall.StoredFile"]
+
+for tenant_slug, tenant_config in TENANTS.items():
+    if tenant_config.get("database_url"):
+        DATABASES[f"tenant_{tenant_slug}"] = env.db_url_config(
+            tenant_config["database_url"]
+        )
+
+if any(alias.startswith("tenant_") for alias in DATABASES):
+    DATABASE_ROUTERS.insert(0, "mall.tenants.TenantRouter")
+
+# Persistent connections / Connection pool
+# https://docs.djangoproject.com/en/5.1/ref/databases/#persistent-connections
+# https://docs.djangoproject.com/en/5.1/ref/databases/#connection-pool
+# 적용된 설정은 mall.checks 에서 시스템 체크(runserver, check) 시에 출력합니다.
+DATABASE_POOL = env.bool("DATABASE_POOL", default=False)
+
+for db_config in DATABASES.values():
+    db_config["CONN_HEALTH_CHECKS"] = env.bool("CONN_HEALTH_CHECKS", default=False)
+    if DATABASE_POOL and db_config["ENGINE"] == "django.db.backends.postgresql":
+        # psycopg[pool] 필요. pool 과 persistent connection 은 함께 사용할 수 없습니다.
+        db_config["CONN_MAX_AGE"] = 0
+        db_config.setdefault("OPTIONS", {})["pool"] = {
+            "min_size": env.int("DATABASE_POOL_MIN_SIZE", default=2),
+            "max_size": env.int("DATABASE_POOL_MAX_SIZE", default=10),
+            "timeout": env.int("DATABASE_POOL_TIMEOUT", default=10),
+        }
+    else:
+        db_config["CONN_MAX_AGE"] = env.int("CONN_MAX_AGE", default=0)
+
+# SQLite 운영 프로필
+# https://docs.djangoproject.com/en/5.1/ref/databases/#sqlite-transaction-behavior
+# WAL 모드에서는 읽기와 쓰기가 서로를 막지 않고, busy_timeout 동안 잠금 해제를 기다립니다.
+# 쓰기 트랜잭션(atomic)은 BEGIN IMMEDIATE 로 시작해, 읽은 뒤 쓰기 잠금으로 올리다가
+# 즉시 "database is locked" 가 발생하는 상황을 막습니다. (bench_sqlite_concurrency 명령으로 비교)
+# synchronous=NORMAL 등 내구성 설정이 바뀌므로 환경변수로 명시적으로 켤 때만 적용합니다.
+SQLITE_PRODUCTION_PROFILE = env.bool("SQLITE_PRODUCTION_PROFILE", default=False)
+SQLITE_PRAGMAS = {
+    "journal_mode": "WAL",
+    "synchronous": "NORMAL",
+    "busy_timeout": env.int("SQLITE_BUSY_TIMEOUT", default=5000),  # 밀리초
+    "mmap_size": env.int("SQLITE_MMAP_SIZE", default=128 * 1024 * 1024),
+    "cache_size": env.int("SQLITE_CACHE_SIZE", default=-20000),  # 음수는 KiB 단위
+    "temp_store": "MEMORY",
+}
+
+if SQLITE_PRODUCTION_PROFILE:
+    for db_config in DATABASES.values():
+        if db_config["ENGINE"] == "django.db.backends.sqlite3":
+            db_config.setdefault("OPTIONS", {}).update(
+                {
+                    "init_command": ";".join(
+                        f"PRAGMA {name}={value}"
+                        for name, value in SQLITE_PRAGMAS.items()
+                    ),
+                    "transaction_mode": "IMMEDIATE",
+                }
+            )
+
+
+# Cache
+# https://docs.djangoproject.com/en/5.1/topics/cache/
+
+CACHES = {
+    "default": env.cache("CACHE_URL", default="locmemcache://"),
+}
+# 캐시 키에 테넌트를 포함합니다. (mall.tenants.make_cache_key)
+CACHES["default"]["KEY_FUNCTION"] = "mall.tenants.make_cache_key"
+
+# mall.snapshots 상품 스냅샷의 프로세스 내 LRU 크기와 TTL(초)
+PRODUCT_SNAPSHOT_MAXSIZE = env.int("PRODUCT_SNAPSHOT_MAXSIZE", default=1024)
+PRODUCT_SNAPSHOT_TIMEOUT = env.int("PRODUCT_SNAPSHOT_TIMEOUT", default=300)
+
+# mall.models.ProductChangeLog.poll: 커밋되지 않은 앞 순번을 기다리는 최대 시간(초). 롤백된 순번은 이후 건너뜁니다.
+PRODUCT_CHANGE_FEED_GAP_TIMEOUT = env.int("PRODUCT_CHANGE_FEED_GAP_TIMEOUT", default=30)
+
+# mall.catalog 상품 목록 JSON API: 상품 카드/페이지 응답 캐시 TTL(초)과 페이지 크기
+PRODUCT_CARD_TIMEOUT = env.int("PRODUCT_CARD_TIMEOUT", default=3600)
+PRODUCT_API_CACHE_TIMEOUT = env.int("PRODUCT_API_CACHE_TIMEOUT", default=60)
+PRODUCT_API_PAGE_SIZE = env.int("PRODUCT_API_PAGE_SIZE", default=12)
+PRODUCT_API_MAX_PAGE_SIZE = env.int("PRODUCT_API_MAX_PAGE_SIZE", default=48)
+
+# mall.views.order_list: 주문 목록(보관된 주문 포함) 페이지 크기
+ORDER_LIST_PAGE_SIZE = env.int("ORDER_LIST_PAGE_SIZE", default=20)
+
+
+# Sessions
+# https://docs.djangoproject.com/en/5.1/topics/http/sessions/#using-cached-sessions
+
+# SESSION_CACHE=True 이면 세션을 캐시에서 먼저 읽고, 캐시 미스일 때만 DB를 조회합니다.
+if env.bool("SESSION_CACHE", default=False):
+    SESSION_ENGINE = "django.contrib.sessions.backends.cached_db"
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.1/ref/settings/#auth-password-validators
@@ -124,6 +267,18 @@ AUTH_PASSWORD_VALIDATORS = [
 
 AUTH_USER_MODEL = "accounts.User"
 
+# 세션의 user id로 User를 조회할 때 캐시를 사용합니다. 0이면 매 요청마다 DB를 조회합니다.
+# 다중 프로세스 환경에서는 CACHE_URL로 공유 캐시(redis/memcached)를 지정해야
+# User 변경 시의 캐시 무효화가 모든 프로세스에 반영됩니다.
+AUTH_USER_CACHE_TIMEOUT = env.int("AUTH_USER_CACHE_TIMEOUT", default=0)
+# 세션에는 로그인한 인증 백엔드 경로가 저장되므로, 기존 세션이 유지되도록 ModelBackend 는 항상 남겨둡니다.
+# 캐시를 사용할 때는 새로 로그인하는 세션부터 CachedModelBackend 를 사용합니다.
+AUTHENTICATION_BACKENDS = [
+    "django.contrib.auth.backends.ModelBackend",
+]
+if AUTH_USER_CACHE_TIMEOUT > 0:
+    AUTHENTICATION_BACKENDS.insert(0, "accounts.backends.CachedModelBackend")
+
 
 # Internationalization
 # https://docs.djangoproject.com/en/5.1/topics/i18n/
@@ -146,8 +301,35 @@ STATICFILES_DIRS = [
     BASE_DIR / "static",
 ]
 
+# STATIC_PIPELINE: collectstatic 시 해시 파일명(manifest)과 .gz/.br 압축본을 생성합니다. (mall.staticfiles)
+# brotli 압축본은 brotli 패키지가 설치된 경우에만 생성합니다.
+# 켜면 collectstatic 으로 manifest 를 만들어 두어야 하므로(없으면 static 태그가 ValueError) 명시적으로 켭니다.
+STATIC_PIPELINE = env.bool("STATIC_PIPELINE", default=False)
+# STATIC_SERVE: 별도 웹서버 없이 앱에서 STATIC_ROOT 파일을 압축본/장기 캐시 헤더와 함께 응답합니다.
+STATIC_SERVE = env.bool("STATIC_SERVE", default=False)
+# 해시 파일명이 아닌 파일의 Cache-Control max-age(초)
+STATIC_MAX_AGE = env.int("STATIC_MAX_AGE", default=3600)
+
+STORAGES = {
+    "default": {
+        "BACKEND": "django.core.files.storage.FileSystemStorage",
+    },
+    "staticfiles": {
+        "BACKEND": (
+            "mall.staticfiles.CompressedManifestStaticFilesStorage"
+            if STATIC_PIPELINE
+            else "django.contrib.staticfiles.storage.StaticFilesStorage"
+        ),
+    },
+}
+
+if STATIC_SERVE:
+    MIDDLEWARE.insert(0, "mall.staticfiles.StaticFilesMiddleware")
+
 MEDIA_URL = "media/"
 MEDIA_ROOT = env.str("MEDIA_ROOT", default=BASE_DIR / "mediafiles")
+# 상품 사진은 내용 해시 경로(mall/product/photo/<2자리>/<sha256>.<ext>)에 저장되므로 (mall.storage)
+# 웹서버에서 해당 경로에 Cache-Control: public, max-age=31536000, immutable 을 지정할 수 있습니다.
 
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.1/ref/settings/#default-auto-field
@@ -155,8 +337,18 @@ MEDIA_ROOT = env.str("MEDIA_ROOT", default=BASE_DIR / "mediafiles")
 DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 
 # django-debug-toolbar
+# 사용할 때만 앱/미들웨어/URL 을 등록해, 운영 환경과 관리 명령 실행 시 import 비용이 없도록 합니다.
+DEBUG_TOOLBAR = env.bool("DEBUG_TOOLBAR", default=DEBUG)
 INTERNAL_IPS = env.list("INTERNAL_IPS", default=["127.0.0.1"])
 
+if DEBUG_TOOLBAR:
+    INSTALLED_APPS.insert(INSTALLED_APPS.index("django_bootstrap5"), "debug_toolbar")
+    MIDDLEWARE.insert(0, "debug_toolbar.middleware.DebugToolbarMiddleware")
+
+
+# 마지막 변경 후 지정 일수가 지난 배송완료/주문취소 주문을 보관 테이블로 옮깁니다. (archive_orders 명령)
+ORDER_ARCHIVE_AFTER_DAYS = env.int("ORDER_ARCHIVE_AFTER_DAYS", default=180)
+
 
 # Portone
 PORTONE_PG_PROVIDER = env.str("PORTONE_PG_PROVIDER", default="")
@@ -165,9 +357,34 @@ PORTONE_SHOP_ID = env.str("PORTONE_SHOP_ID", default="")
 PORTONE_API_KEY = env.str("PORTONE_API_KEY", default="")
 PORTONE_API_SECRET = env.str("PORTONE_API_SECRET", default="")
 
+# PortOne 호출 timeout(초)과 circuit breaker 설정 (mall.portone)
+PORTONE_TIMEOUT = env.float("PORTONE_TIMEOUT", default=5.0)
+PORTONE_CIRCUIT_FAILURE_THRESHOLD = env.int(
+    "PORTONE_CIRCUIT_FAILURE_THRESHOLD", default=5
+)
+PORTONE_CIRCUIT_RESET_TIMEOUT = env.int("PORTONE_CIRCUIT_RESET_TIMEOUT", default=30)
+
 PORTONE_WEBHOOK_IPS = env.list(
     "PORTONE_WEBHOOK_IPS", default=["52.78.100.19", "52.78.48.223", "52.78.5.241"]
 )
 
+# order_pay 에서 READY 상태의 결제를 재사용할 수 있는 시간(초)
+ORDER_PAYMENT_READY_TIMEOUT = env.int("ORDER_PAYMENT_READY_TIMEOUT", default=60 * 30)
+
+# jobs
+# True 이면 PortOne 호출, 상품 사진 다운로드/썸네일 생성 등을 작업 테이블에 등록하고
+# run_worker 명령에서 실행합니다. False 이면 요청 처리 중에 즉시 실행합니다.
+JOBS_ASYNC = env.bool("JOBS_ASYNC", default=False)
+JOBS_VISIBILITY_TIMEOUT = env.int("JOBS_VISIBILITY_TIMEOUT", default=300)
+
+# Prometheus 포맷의 PortOne 호출 지표(/mall/metrics/portone/)를 조회할 수 있는 IP/CIDR
+METRICS_ALLOWED_IPS = env.list("METRICS_ALLOWED_IPS", default=["127.0.0.1"])
+
+# IP allowlist (mall.decorators)
+# 앞단의 신뢰하는 프록시(로드밸런서, CDN 등) 수. 0 이면 X-Forwarded-For 를 무시하고 REMOTE_ADDR 을 사용합니다.
+TRUSTED_PROXY_COUNT = env.int("TRUSTED_PROXY_COUNT", default=0)
+# IPAllowListMiddleware 에서 사용할 {경로 prefix: 허용 IP/CIDR 목록}
+IP_ALLOWLIST_PATHS = {}
+
 # csrf
 CSRF_TRUSTED_ORIGINS = env.list("CSRF_TRUSTED_ORIGINS", default=[])
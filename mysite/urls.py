@@ -13,8 +13,10 @@ urlpatterns = [
     path("", TemplateView.as_view(template_name="root.html"), name="root"),
 ]
 
-if settings.DEBUG:
+if settings.DEBUG_TOOLBAR:
     urlpatterns += [
         path("__debug__/", include("debug_toolbar.urls")),
     ]
+
+if settings.DEBUG:
     urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
@@ -0,0 +1,54 @@
+from django.contrib import admin
+from django.db.models import Sum
+from reports.models import DailyCategorySales, DailyOrderStatusSales, DailyProductSales
+
+
+class RollupAdmin(admin.ModelAdmin):
+    """집계 테이블만 조회하는 읽기 전용 대시보드. 합계도 집계 테이블에서 계산합니다."""
+
+    date_hierarchy = "date"
+    change_list_template = "admin/reports/change_list.html"
+    summary_fields = ["quantity", "amount"]
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def has_delete_permission(self, request, obj=None):
+        return False
+
+    def changelist_view(self, request, extra_context=None):
+        response = super().changelist_view(request, extra_context)
+        context_data = getattr(response, "context_data", None)
+        if context_data and "cl" in context_data:
+            summary = context_data["cl"].queryset.aggregate(
+                **{name: Sum(name) for name in self.summary_fields}
+            )
+            context_data["rollup_summary"] = [
+                (self.model._meta.get_field(name).verbose_name, summary[name] or 0)
+                for name in self.summary_fields
+            ]
+        return response
+
+
+@admin.register(DailyProductSales)
+class DailyProductSalesAdmin(RollupAdmin):
+    list_display = ["date", "product", "quantity", "amount"]
+    list_select_related = ["product"]
+    search_fields = ["product__name"]
+
+
+@admin.register(DailyCategorySales)
+class DailyCategorySalesAdmin(RollupAdmin):
+    list_display = ["date", "category", "quantity", "amount"]
+    list_select_related = ["category"]
+    list_filter = ["category"]
+
+
+@admin.register(DailyOrderStatusSales)
+class DailyOrderStatusSalesAdmin(RollupAdmin):
+    list_display = ["date", "status", "order_count", "amount"]
+    list_filter = ["status"]
+    summary_fields = ["order_count", "amount"]
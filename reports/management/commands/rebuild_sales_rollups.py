@@ -0,0 +1,13 @@
+from django.core.management import BaseCommand
+from reports import rollups
+
+
+class Command(BaseCommand):
+    help = "주문 내역으로부터 일별 매출 집계 테이블을 다시 만듭니다."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=1000)
+
+    def handle(self, *args, **options):
+        rollups.rebuild(batch_size=options["batch_size"])
+        self.stdout.write(self.style.SUCCESS("매출 집계 테이블을 다시 만들었습니다."))
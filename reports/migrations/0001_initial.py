@@ -0,0 +1,132 @@
+# Generated by Django 5.1 on 2026-10-19 13:26
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ("mall", "0010_orderpayment_created_at"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="DailyOrderStatusSales",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("date", models.DateField(db_index=True, verbose_name="주문일")),
+                (
+                    "status",
+                    models.CharField(
+                        choices=[
+                            ("requested", "주문요청"),
+                            ("failed_payment", "결제실패"),
+                            ("paid", "결제완료"),
+                            ("prepared_product", "상품준비중"),
+                            ("shipped", "배송중"),
+                            ("delivered", "배송완료"),
+                            ("cancelled", "주문취소"),
+                        ],
+                        max_length=20,
+                        verbose_name="진행상태",
+                    ),
+                ),
+                ("order_count", models.IntegerField(default=0, verbose_name="주문수")),
+                ("amount", models.BigIntegerField(default=0, verbose_name="주문금액")),
+            ],
+            options={
+                "verbose_name": "일별 주문상태 집계",
+                "verbose_name_plural": "일별 주문상태 집계",
+                "ordering": ["-date", "status"],
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("date", "status"),
+                        name="unique_daily_order_status_sales",
+                    )
+                ],
+            },
+        ),
+        migrations.CreateModel(
+            name="DailyCategorySales",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("date", models.DateField(db_index=True, verbose_name="주문일")),
+                ("quantity", models.IntegerField(default=0, verbose_name="판매수량")),
+                ("amount", models.BigIntegerField(default=0, verbose_name="매출액")),
+                (
+                    "category",
+                    models.ForeignKey(
+                        db_constraint=False,
+                        on_delete=django.db.models.deletion.DO_NOTHING,
+                        related_name="+",
+                        to="mall.category",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "일별 분류 매출",
+                "verbose_name_plural": "일별 분류 매출",
+                "ordering": ["-date", "-amount"],
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("date", "category"), name="unique_daily_category_sales"
+                    )
+                ],
+            },
+        ),
+        migrations.CreateModel(
+            name="DailyProductSales",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("date", models.DateField(db_index=True, verbose_name="주문일")),
+                ("quantity", models.IntegerField(default=0, verbose_name="판매수량")),
+                ("amount", models.BigIntegerField(default=0, verbose_name="매출액")),
+                (
+                    "product",
+                    models.ForeignKey(
+                        db_constraint=False,
+                        on_delete=django.db.models.deletion.DO_NOTHING,
+                        related_name="+",
+                        to="mall.product",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "일별 상품 매출",
+                "verbose_name_plural": "일별 상품 매출",
+                "ordering": ["-date", "-amount"],
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("date", "product"), name="unique_daily_product_sales"
+                    )
+                ],
+            },
+        ),
+    ]
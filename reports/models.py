@@ -0,0 +1,68 @@
+from django.db import models
+from django.db.models import UniqueConstraint
+from mall.models import Category, Order, Product
+
+
+class DailyProductSales(models.Model):
+    date = models.DateField("주문일", db_index=True)
+    product = models.ForeignKey(
+        Product,
+        on_delete=models.DO_NOTHING,
+        db_constraint=False,
+        related_name="+",
+    )
+    quantity = models.IntegerField("판매수량", default=0)
+    amount = models.BigIntegerField("매출액", default=0)
+
+    class Meta:
+        verbose_name = verbose_name_plural = "일별 상품 매출"
+        ordering = ["-date", "-amount"]
+        constraints = [
+            UniqueConstraint(
+                fields=["date", "product"],
+                name="unique_daily_product_sales",
+            ),
+        ]
+
+
+class DailyCategorySales(models.Model):
+    date = models.DateField("주문일", db_index=True)
+    category = models.ForeignKey(
+        Category,
+        on_delete=models.DO_NOTHING,
+        db_constraint=False,
+        related_name="+",
+    )
+    quantity = models.IntegerField("판매수량", default=0)
+    amount = models.BigIntegerField("매출액", default=0)
+
+    class Meta:
+        verbose_name = verbose_name_plural = "일별 분류 매출"
+        ordering = ["-date", "-amount"]
+        constraints = [
+            UniqueConstraint(
+                fields=["date", "category"],
+                name="unique_daily_category_sales",
+            ),
+        ]
+
+
+class DailyOrderStatusSales(models.Model):
+    date = models.DateField("주문일", db_index=True)
+    status = models.CharField(
+        "진행상태",
+        max_length=20,
+        choices=Order.Status.choices,
+    )
+    order_count = models.IntegerField("주문수", default=0)
+    amount = models.BigIntegerField("주문금액", default=0)
+
+    class Meta:
+        verbose_name = verbose_name_plural = "일별 주문상태 집계"
+        ordering = ["-date", "status"]
+        constraints = [
+            UniqueConstraint(
+                fields=["date", "status"],
+                name="unique_daily_order_status_sales",
+            ),
+        ]
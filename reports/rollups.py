@@ -0,0 +1,183 @@
+from collections import defaultdict
+from datetime import date
+from typing import List, Optional, Tuple
+from django.db import IntegrityError, router, transaction
+from django.db.models import Count, F, Sum
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+from archive.models import ArchivedOrder, ArchivedOrderedProduct
+from mall.models import Order, OrderedProduct
+from reports.models import DailyCategorySales, DailyOrderStatusSales, DailyProductSales
+
+
+# 결제 이후의 상태는 모두 매출로 집계합니다.
+REVENUE_STATUS_SET = {
+    Order.Status.PAID,
+    Order.Status.PREPARED_PRODUCT,
+    Order.Status.SHIPPED,
+    Order.Status.DELIVERED,
+}
+
+
+def increment(model_cls, key_dict, **delta_dict):
+    """key_dict 에 해당하는 집계 row 의 값에 delta 를 더합니다. row 가 없으면 생성합니다."""
+    update_dict = {name: F(name) + delta for name, delta in delta_dict.items()}
+    if model_cls.objects.filter(**key_dict).update(**update_dict):
+        return
+    try:
+        with transaction.atomic(using=router.db_for_write(model_cls)):
+            model_cls.objects.create(**key_dict, **delta_dict)
+    except IntegrityError:
+        # 동시에 다른 요청이 먼저 생성한 경우
+        model_cls.objects.filter(**key_dict).update(**update_dict)
+
+
+def apply_order_transition(order: Order, old_status: Optional[str], new_status: str):
+    apply_order_transition_list([(order, old_status, new_status)])
+
+
+def apply_order_transition_list(
+    transition_list: List[Tuple[Order, Optional[str], str]]
+):
+    """
+    [(order, old_status, new_status), ...] 를 (날짜, 상태/상품/분류) 별로 먼저 합산한 뒤 반영하므로,
+    일괄 전이에서도 집계 쿼리 수는 주문 수가 아니라 집계 키 수에 비례합니다.
+    """
+    status_dict = defaultdict(lambda: [0, 0])
+    sign_dict = {}
+    for order, old_status, new_status in transition_list:
+        if old_status == new_status:
+            continue
+        date = timezone.localdate(order.created_at)
+        if old_status is not None:
+            status_dict[(date, old_status)][0] -= 1
+            status_dict[(date, old_status)][1] -= order.total_amount
+        status_dict[(date, new_status)][0] += 1
+        status_dict[(date, new_status)][1] += order.total_amount
+
+        sign = int(new_status in REVENUE_STATUS_SET) - int(
+            old_status in REVENUE_STATUS_SET
+        )
+        if sign != 0:
+            sign_dict[order.pk] = (date, sign)
+
+    product_dict = defaultdict(lambda: [0, 0])
+    category_dict = defaultdict(lambda: [0, 0])
+    if sign_dict:
+        ordered_product_qs = OrderedProduct.objects.filter(
+            order__in=list(sign_dict)
+        ).values_list(
+            "order_id", "product_id", "product__category_id", "price", "quantity"
+        )
+        for order_id, product_id, category_id, price, quantity in ordered_product_qs:
+            date, sign = sign_dict[order_id]
+            for key, total_dict in [
+                ((date, product_id), product_dict),
+                ((date, category_id), category_dict),
+            ]:
+                total_dict[key][0] += sign * quantity
+                total_dict[key][1] += sign * price * quantity
+
+    with transaction.atomic(using=router.db_for_write(DailyOrderStatusSales)):
+        for (date, status), (order_count, amount) in status_dict.items():
+            if order_count or amount:
+                increment(
+                    DailyOrderStatusSales,
+                    {"date": date, "status": status},
+                    order_count=order_count,
+                    amount=amount,
+                )
+        for (date, product_id), (quantity, amount) in product_dict.items():
+            increment(
+                DailyProductSales,
+                {"date": date, "product_id": product_id},
+                quantity=quantity,
+                amount=amount,
+            )
+        for (date, category_id), (quantity, amount) in category_dict.items():
+            increment(
+                DailyCategorySales,
+                {"date": date, "category_id": category_id},
+                quantity=quantity,
+                amount=amount,
+            )
+
+
+def rebuild(batch_size: int = 1000, date_list: Optional[List[date]] = None):
+    """
+    주문/주문상품 테이블과 보관 테이블 전체로부터 집계 테이블을 다시 만듭니다.
+    date_list 를 지정하면 해당 주문일의 집계만 다시 만듭니다.
+    """
+    status_dict = defaultdict(lambda: [0, 0])
+    product_dict = defaultdict(lambda: [0, 0])
+    category_dict = defaultdict(lambda: [0, 0])
+    sales_values = dict(
+        total_quantity=Sum("quantity"), total_amount=Sum(F("price") * F("quantity"))
+    )
+
+    for order_cls, ordered_product_cls in [
+        (Order, OrderedProduct),
+        (ArchivedOrder, ArchivedOrderedProduct),
+    ]:
+        order_qs = order_cls.objects.annotate(date=TruncDate("created_at"))
+        if date_list is not None:
+            order_qs = order_qs.filter(date__in=date_list)
+        for row in (
+            order_qs.order_by()
+            .values("date", "status")
+            .annotate(order_count=Count("pk"), total_amount=Sum("total_amount"))
+        ):
+            status_dict[(row["date"], row["status"])][0] += row["order_count"]
+            status_dict[(row["date"], row["status"])][1] += row["total_amount"]
+
+        ordered_product_qs = ordered_product_cls.objects.filter(
+            order__status__in=REVENUE_STATUS_SET
+        ).annotate(date=TruncDate("order__created_at"))
+        if date_list is not None:
+            ordered_product_qs = ordered_product_qs.filter(date__in=date_list)
+        for key_name, total_dict in [
+            ("product_id", product_dict),
+            ("product__category_id", category_dict),
+        ]:
+            for row in (
+                ordered_product_qs.order_by()
+                .values("date", key_name)
+                .annotate(**sales_values)
+            ):
+                total_dict[(row["date"], row[key_name])][0] += row["total_quantity"]
+                total_dict[(row["date"], row[key_name])][1] += row["total_amount"]
+
+    with transaction.atomic(using=router.db_for_write(DailyOrderStatusSales)):
+        for model_cls in [DailyOrderStatusSales, DailyProductSales, DailyCategorySales]:
+            rollup_qs = model_cls.objects.all()
+            if date_list is not None:
+                rollup_qs = rollup_qs.filter(date__in=date_list)
+            rollup_qs.delete()
+
+        DailyOrderStatusSales.objects.bulk_create(
+            (
+                DailyOrderStatusSales(
+                    date=date, status=status, order_count=order_count, amount=amount
+                )
+                for (date, status), (order_count, amount) in status_dict.items()
+            ),
+            batch_size=batch_size,
+        )
+        DailyProductSales.objects.bulk_create(
+            (
+                DailyProductSales(
+                    date=date, product_id=product_id, quantity=quantity, amount=amount
+                )
+                for (date, product_id), (quantity, amount) in product_dict.items()
+            ),
+            batch_size=batch_size,
+        )
+        DailyCategorySales.objects.bulk_create(
+            (
+                DailyCategorySales(
+                    date=date, category_id=category_id, quantity=quantity, amount=amount
+                )
+                for (date, category_id), (quantity, amount) in category_dict.items()
+            ),
+            batch_size=batch_size,
+        )
@@ -0,0 +1,13 @@
+from django.dispatch import receiver
+from mall.signals import order_status_bulk_changed, order_status_changed
+from reports.rollups import apply_order_transition, apply_order_transition_list
+
+
+@receiver(order_status_changed)
+def on_order_status_changed(sender, order, old_status, new_status, **kwargs):
+    apply_order_transition(order, old_status, new_status)
+
+
+@receiver(order_status_bulk_changed)
+def on_order_status_bulk_changed(sender, transition_list, **kwargs):
+    apply_order_transition_list(transition_list)
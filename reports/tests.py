@@ -0,0 +1,99 @@
+from datetime import timedelta
+from django.test import TestCase
+from django.utils import timezone
+from accounts.models import User
+from mall.models import CartProduct, Category, Order, Product
+from reports import rollups
+from reports.models import DailyCategorySales, DailyOrderStatusSales, DailyProductSales
+
+
+class SalesRollupTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(
+            username="buyer", password="password", email="buyer@example.com"
+        )
+        category = Category.objects.create(name="분류")
+        cls.product_list = [
+            Product.objects.create(
+                category=category,
+                name=f"상품 {i}",
+                price=1000 * (i + 1),
+                status=Product.Status.ACTIVE,
+            )
+            for i in range(2)
+        ]
+
+    def create_order(self, quantity: int) -> Order:
+        for product in self.product_list:
+            CartProduct.objects.create(
+                user=self.user, product=product, quantity=quantity
+            )
+        cart_product_qs = CartProduct.objects.filter(user=self.user)
+        order = Order.create_from_cart(self.user, cart_product_qs)
+        cart_product_qs.delete()
+        return order
+
+    def get_rollup(self) -> dict:
+        return {
+            "status": sorted(
+                DailyOrderStatusSales.objects.exclude(
+                    order_count=0, amount=0
+                ).values_list("date", "status", "order_count", "amount")
+            ),
+            "product": sorted(
+                DailyProductSales.objects.exclude(quantity=0, amount=0).values_list(
+                    "date", "product_id", "quantity", "amount"
+                )
+            ),
+            "category": sorted(
+                DailyCategorySales.objects.exclude(quantity=0, amount=0).values_list(
+                    "date", "category_id", "quantity", "amount"
+                )
+            ),
+        }
+
+    def test_incremental_matches_rebuild(self):
+        paid = self.create_order(1)
+        cancelled = self.create_order(2)
+        self.create_order(3)
+        paid.transition(Order.Status.PAID)
+        cancelled.transition(Order.Status.PAID)
+        cancelled.transition(Order.Status.CANCELLED)
+        Order.bulk_transition(
+            Order.objects.filter(pk=paid.pk), Order.Status.PREPARED_PRODUCT
+        )
+
+        rollup = self.get_rollup()
+        self.assertEqual(
+            [row[1:] for row in rollup["status"]],
+            [
+                (Order.Status.CANCELLED, 1, 6000),
+                (Order.Status.PREPARED_PRODUCT, 1, 3000),
+                (Order.Status.REQUESTED, 1, 9000),
+            ],
+        )
+        # 결제 후 취소된 주문은 매출에서 빠집니다.
+        self.assertEqual([row[2:] for row in rollup["product"]], [(1, 1000), (1, 2000)])
+        self.assertEqual([row[2:] for row in rollup["category"]], [(2, 3000)])
+
+        rollups.rebuild()
+        self.assertEqual(self.get_rollup(), rollup)
+
+    def test_rebuild_date_list(self):
+        old = self.create_order(1)
+        Order.objects.filter(pk=old.pk).update(
+            created_at=timezone.now() - timedelta(days=1)
+        )
+        rollups.rebuild()
+        self.create_order(2)
+        yesterday = timezone.localdate() - timedelta(days=1)
+        rollup = {
+            key: [row for row in row_list if row[0] == yesterday]
+            for key, row_list in self.get_rollup().items()
+        }
+
+        # 지정한 날짜만 다시 집계하므로 전날 주문을 지워도 전날 집계는 그대로입니다.
+        Order.objects.all().delete()
+        rollups.rebuild(date_list=[timezone.localdate()])
+        self.assertEqual(self.get_rollup(), rollup)